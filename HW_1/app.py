@@ -1,14 +1,37 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
 from datetime import datetime
 import json
-from newspaper import Article
-import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tweet_engine.brand_batch import BRAND_MODEL, MAX_BATCH_BRANDS, parse_brand_list, score_brands
+from tweet_engine.dataset import DatasetError, dataset_hash, load_tweet_dataset
+from tweet_engine.embeddings import EMBEDDING_DIMENSIONS, EMBEDDING_MODEL, embed_query
+from tweet_engine.leaderboard import page_count
+from tweet_engine.llm_cache import LLMCache, usage_of
+from tweet_engine.news_fetch import URL_PATTERN, fetch_articles, make_http_client, parse_url_list
+from tweet_engine.openai_client import SHARED_CLIENT, latency_tracker, shared_async_runner, shared_openai_client
+from tweet_engine.sources import PandasSource, connect_duckdb, open_duckdb_source
+from tweet_engine.streaming import CompletionStream, iter_partial_json
+from tweet_engine.time_cube import DAY_ORDER, mean_engagement
+from tweet_engine.topics import assign_clusters, build_topic_naming_prompt, cluster_exemplars, minibatch_kmeans
+from tweet_engine.vector_index import open_vector_index
+
+N_TOPICS = 5
+# Tweets retrieved from the vector index for the brand and news prompts
+BRAND_CONTEXT_TWEETS = 60
+NEWS_STYLE_TWEETS = 30
+# Articles answered in parallel by the News Reactor
+NEWS_WORKERS = 4
+# Shared corpus for batch brand scoring: the tweets nearest each cluster center
+BRAND_CORPUS_CLUSTERS = 10
+BRAND_CORPUS_PER_CLUSTER = 12
 
 # Load environment variables
 load_dotenv()
@@ -91,16 +114,238 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if 'df' not in st.session_state:
-    st.session_state.df = None
+if 'source' not in st.session_state:
+    st.session_state.source = None
 if 'topics_analyzed' not in st.session_state:
     st.session_state.topics_analyzed = False
 if 'topics_df' not in st.session_state:
     st.session_state.topics_df = None
+if 'topics_shares' not in st.session_state:
+    st.session_state.topics_shares = None
 if 'brand_analysis' not in st.session_state:
     st.session_state.brand_analysis = {}
-if 'generated_tweet' not in st.session_state:
-    st.session_state.generated_tweet = None
+if 'brand_batch_results' not in st.session_state:
+    st.session_state.brand_batch_results = []
+if 'generated_tweets' not in st.session_state:
+    st.session_state.generated_tweets = []
+if 'dataset_hash' not in st.session_state:
+    st.session_state.dataset_hash = None
+if 'dataset_file_key' not in st.session_state:
+    st.session_state.dataset_file_key = None
+
+
+@st.cache_resource(max_entries=4, show_spinner="Loading tweets...")
+def load_dataset(digest, _data):
+    """Parsed dataset for one upload, keyed by content hash and shared across sessions (read-only)."""
+    return PandasSource(load_tweet_dataset(_data, digest), digest)
+
+
+@st.cache_resource
+def get_duckdb():
+    """In-process DuckDB connection shared by all sessions (each query runs on its own cursor)."""
+    return connect_duckdb()
+
+
+@st.cache_resource(max_entries=16, show_spinner="Preparing tweets for DuckDB...")
+def load_duckdb_dataset(digest, _data):
+    """Out-of-core dataset for one upload: queries run against its Parquet file on disk."""
+    return open_duckdb_source(get_duckdb(), _data, digest)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_time_cube(digest, engine, tz, _source):
+    """Weekday x hour aggregates for a dataset, keyed by content hash, query engine and timezone."""
+    return _source.time_cube(tz)
+
+
+@st.cache_resource
+def get_llm_cache():
+    """Disk-backed LLM result cache, shared by all sessions (and processes using the same .cache/)."""
+    return LLMCache()
+
+
+llm_cache = get_llm_cache()
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_vector_index(digest, _source):
+    """Tweet embedding index for a dataset, keyed by content hash and shared across sessions."""
+    return open_vector_index(digest, _source.texts())
+
+
+def ensure_vector_index(client, source):
+    """Vector index for the loaded dataset, embedding any tweets not indexed yet."""
+    index = get_vector_index(source.digest, source)
+    if not index.complete:
+        progress = st.progress(0.0, text="Indexing tweets...")
+        index.build(
+            client,
+            source.texts(),
+            progress=lambda done, total: progress.progress(done / total, text=f"Indexing tweets... {done:,}/{total:,}")
+        )
+        progress.empty()
+    return index
+
+
+def retrieve_tweets(client, source, query, k):
+    """The k tweets (distinct texts) most related to `query`, most related first."""
+    index = ensure_vector_index(client, source)
+    rows, _ = index.search(embed_query(client, query), k)
+    return source.texts_at(rows)
+
+
+def write_reactive_tweet(client, index, source, article_text, stream_to=None):
+    """
+    Tweet reacting to an article in the account's voice; returns the tweet and its token usage.
+    With `stream_to` (a Streamlit placeholder), the tweet is rendered there as it is generated.
+    """
+    # Limit article text to avoid token limits
+    article_text_limited = article_text[:3000]
+    
+    # User tweets closest to the article, for style reference
+    rows, _ = index.search(embed_query(client, article_text_limited), NEWS_STYLE_TWEETS)
+    related_tweets = source.texts_at(rows)
+    tweets_text = "\n".join([f"{i+1}. {tweet}" for i, tweet in enumerate(related_tweets)])
+    
+    prompt = f"""You are a social media manager. A news article has been provided below. Generate a reactive tweet in the EXACT voice and style of this Twitter account.
+
+News Article:
+{article_text_limited}
+
+Account's Tweets (for style reference):
+{tweets_text}
+
+Generate a tweet that:
+1. Reacts to the news article
+2. Matches the account's voice, tone, and style perfectly
+3. Is engaging and authentic
+4. Stays within Twitter's character limit (280 characters)
+
+Return only the tweet text, nothing else."""
+
+    messages = [
+        {"role": "system", "content": "You are a professional tweet writer. Match the style and voice of the provided examples exactly. Return only the tweet text."},
+        {"role": "user", "content": prompt}
+    ]
+    if stream_to is not None:
+        stream = CompletionStream(client, model="gpt-4o", messages=messages, temperature=0.8, max_tokens=280)
+        stream_to.write_stream(stream)
+        return stream.text.strip(), stream.usage
+    
+    response = client.chat.completions.create(
+        model="gpt-4o",
+        messages=messages,
+        temperature=0.8,
+        max_tokens=280
+    )
+    return response.choices[0].message.content.strip(), usage_of(response)
+
+
+def react_to_articles(api_key, source, urls, fresh=False):
+    """
+    Reactive tweets for several article URLs, in input order. Tweets cached for a URL
+    are reused (unless `fresh`); the other articles are downloaded concurrently and
+    their tweets written in parallel.
+    """
+    digest = st.session_state.dataset_hash
+    results = {}
+    pending = []
+    for url in urls:
+        cached = None if fresh else llm_cache.get(digest, 'news_tweet', news_tweet_params(url), 'gpt-4o')
+        if cached is not None:
+            results[url] = {'url': url, 'tweet': cached['tweet'], 'error': None}
+        else:
+            pending.append(url)
+    
+    if pending:
+        client = shared_openai_client(api_key)
+        index = ensure_vector_index(client, source)
+        articles = fetch_articles(get_http_client(), pending)
+        
+        def write(article, stream_to=None):
+            if article['error']:
+                return {'url': article['url'], 'tweet': None, 'error': article['error']}
+            try:
+                started = time.perf_counter()
+                tweet, usage = write_reactive_tweet(client, index, source, article['text'], stream_to)
+            except Exception as e:
+                return {'url': article['url'], 'tweet': None, 'error': f"Error generating tweet: {str(e)}"}
+            llm_cache.put(
+                digest, 'news_tweet', news_tweet_params(article['url']), 'gpt-4o', {'tweet': tweet},
+                latency_s=time.perf_counter() - started, usage=usage
+            )
+            return {'url': article['url'], 'tweet': tweet, 'error': None}
+        
+        if len(articles) == 1:
+            # A single article is streamed as it is written
+            preview = st.empty()
+            results[articles[0]['url']] = write(articles[0], stream_to=preview)
+            preview.empty()
+        else:
+            with ThreadPoolExecutor(max_workers=NEWS_WORKERS) as pool:
+                for result in pool.map(write, articles):
+                    results[result['url']] = result
+    return [results[url] for url in urls]
+
+
+def news_tweet_params(url):
+    return {'url': url.strip(), 'style_tweets': NEWS_STYLE_TWEETS}
+
+
+@st.cache_resource
+def get_http_client():
+    """Pooled HTTP client for article downloads, shared by all sessions."""
+    return make_http_client()
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def representative_rows(digest, _index):
+    """Rows of the tweets closest to each of BRAND_CORPUS_CLUSTERS cluster centers (shared batch prompt corpus)."""
+    centers = minibatch_kmeans(_index.vectors, BRAND_CORPUS_CLUSTERS)
+    labels, sims = assign_clusters(_index.vectors, centers)
+    ids = np.concatenate(cluster_exemplars(labels, sims, len(centers), per_cluster=BRAND_CORPUS_PER_CLUSTER))
+    return np.sort(_index.first_rows[ids])
+
+
+def brand_batch_params(brand):
+    """Cache parameters for one batch-scored brand (the shared corpus depends only on these settings)."""
+    return {'brand': brand.strip().lower(), 'clusters': BRAND_CORPUS_CLUSTERS, 'per_cluster': BRAND_CORPUS_PER_CLUSTER}
+
+
+def brand_batch_table(results):
+    """Batch results as a DataFrame, best score first."""
+    table = pd.DataFrame(
+        [{'Brand': r['brand'], 'Score': r['score'], 'Reasoning': r['reasoning'] or r['error']} for r in results]
+    )
+    return table.sort_values('Score', ascending=False, na_position='last').reset_index(drop=True)
+
+
+BRAND_BATCH_TABLE = dict(
+    column_config={
+        'Score': st.column_config.ProgressColumn('Score', min_value=0, max_value=100, format='%.0f'),
+        'Reasoning': st.column_config.TextColumn('Reasoning', width='large'),
+    },
+    use_container_width=True,
+    hide_index=True
+)
+
+
+QUERY_ENGINES = {
+    "pandas (in memory)": load_dataset,
+    "DuckDB (out-of-core)": load_duckdb_dataset,
+}
+
+
+HEATMAP_TIMEZONES = {
+    "As recorded": None,
+    "UTC": "UTC",
+    "US/Eastern": "US/Eastern",
+    "US/Central": "US/Central",
+    "US/Pacific": "US/Pacific",
+    "Europe/London": "Europe/London",
+    "Europe/Berlin": "Europe/Berlin",
+    "Asia/Tokyo": "Asia/Tokyo",
+}
 
 # Title
 st.title("🎯 David Schmidt - Strategic Tweet Engine")
@@ -113,41 +358,35 @@ with st.sidebar:
         type=['csv'],
         help="CSV should contain: text, view_count, created_at, favorite_count"
     )
+    query_engine = st.radio(
+        "Query engine",
+        list(QUERY_ENGINES),
+        help="DuckDB answers the leaderboard, heatmap and tweet lookups with SQL over an on-disk "
+             "Parquet copy of the upload, so large datasets are not held in memory."
+    )
     
     if uploaded_file is not None:
         try:
-            # Read CSV
-            df = pd.read_csv(uploaded_file)
-            
-            # Validate required columns
-            required_columns = ['text', 'view_count', 'created_at', 'favorite_count']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                st.error(f"Missing required columns: {', '.join(missing_columns)}")
-            else:
-                # Check for empty CSV
-                if len(df) == 0:
-                    st.error("CSV file is empty. Please upload a file with tweet data.")
-                else:
-                    # Convert created_at to datetime
-                    df['created_at'] = pd.to_datetime(df['created_at'], errors='coerce')
-                    
-                    # Check for missing datetime data
-                    if df['created_at'].isna().all():
-                        st.error("Could not parse datetime from 'created_at' column. Please check the date format.")
-                    else:
-                        # Calculate engagement
-                        df['engagement'] = df['favorite_count'] / df['view_count'].replace(0, 1)
-                        
-                        # Store in session state
-                        st.session_state.df = df
-                        # Reset analysis states when new data is loaded
-                        st.session_state.topics_analyzed = False
-                        st.session_state.topics_df = None
-                        st.session_state.brand_analysis = {}
-                        st.session_state.generated_tweet = None
-                        st.success(f"✅ Loaded {len(df)} tweets")
+            # Hash the upload once per file; reruns with the same upload reuse session state
+            file_key = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, "file_id", None), query_engine)
+            if st.session_state.dataset_file_key != file_key:
+                data = uploaded_file.getvalue()
+                digest = dataset_hash(data)
+                source = QUERY_ENGINES[query_engine](digest, data)
+                st.session_state.dataset_file_key = file_key
+                st.session_state.source = source
+                if st.session_state.dataset_hash != digest:
+                    st.session_state.dataset_hash = digest
+                    # Reset analysis states when new data is loaded
+                    st.session_state.topics_analyzed = False
+                    st.session_state.topics_df = None
+                    st.session_state.topics_shares = None
+                    st.session_state.brand_analysis = {}
+                    st.session_state.brand_batch_results = []
+                    st.session_state.generated_tweets = []
+            st.success(f"✅ Loaded {len(st.session_state.source):,} tweets")
+        except DatasetError as e:
+            st.error(str(e))
         except Exception as e:
             st.error(f"Error loading CSV: {str(e)}")
     
@@ -160,7 +399,7 @@ with st.sidebar:
         st.warning("⚠️ OpenAI API Key not found in environment variables")
 
 # Main content
-if st.session_state.df is None:
+if st.session_state.source is None:
     st.info("👆 Please upload a CSV file in the sidebar to get started.")
     st.markdown("""
     ### Expected CSV Format:
@@ -170,7 +409,7 @@ if st.session_state.df is None:
     - `favorite_count`: Number of favorites/likes
     """)
 else:
-    df = st.session_state.df
+    source = st.session_state.source
     
     # Create tabs
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -187,26 +426,27 @@ else:
         st.markdown("Tweets ranked by Engagement Rate (Favorites / Views)")
         
         try:
-            # Sort by engagement rate (descending)
-            df_display = df.copy()
-            df_display = df_display.sort_values('engagement', ascending=False)
+            # Rank only the rows on the visible page (top-K by engagement, NaN last)
+            col_size, col_page = st.columns([1, 1])
+            with col_size:
+                page_size = st.selectbox("Tweets per page", [25, 50, 100, 250], index=1)
+            with col_page:
+                n_pages = page_count(len(source), page_size)
+                page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1)
             
-            # Format display columns
-            df_display['engagement_rate'] = df_display['engagement'].apply(lambda x: f"{x:.4f}" if pd.notna(x) else "N/A")
-            df_display['favorite_count'] = df_display['favorite_count'].apply(lambda x: f"{int(x):,}" if pd.notna(x) else "N/A")
-            df_display['view_count'] = df_display['view_count'].apply(lambda x: f"{int(x):,}" if pd.notna(x) else "N/A")
-            
-            # Format created_at for display
-            df_display['created_at_display'] = df_display['created_at'].dt.strftime('%Y-%m-%d %H:%M:%S')
+            df_page = source.leaderboard_page(int(page), page_size)
+            first_rank = (int(page) - 1) * page_size + 1
+            st.caption(f"Showing ranks {first_rank:,}–{first_rank + len(df_page) - 1:,} of {len(source):,} tweets")
             
             st.dataframe(
-                df_display[['text', 'created_at_display', 'favorite_count', 'view_count', 'engagement_rate']].rename(columns={
-                    'text': 'Tweet Text',
-                    'created_at_display': 'Created Date',
-                    'favorite_count': 'Favorites',
-                    'view_count': 'Views',
-                    'engagement_rate': 'Engagement Rate'
-                }),
+                df_page,
+                column_config={
+                    'text': st.column_config.TextColumn('Tweet Text'),
+                    'created_at': st.column_config.DatetimeColumn('Created Date', format='YYYY-MM-DD HH:mm:ss'),
+                    'favorite_count': st.column_config.NumberColumn('Favorites', format='%d'),
+                    'view_count': st.column_config.NumberColumn('Views', format='%d'),
+                    'engagement': st.column_config.NumberColumn('Engagement Rate', format='%.4f'),
+                },
                 use_container_width=True,
                 height=400
             )
@@ -219,45 +459,39 @@ else:
         st.markdown("Posting frequency by Hour of Day vs Day of Week")
         
         try:
-            # Extract hour and day of week
-            df_heatmap = df.copy()
-            df_heatmap = df_heatmap.dropna(subset=['created_at'])
+            col_metric, col_tz = st.columns([1, 1])
+            with col_metric:
+                metric = st.selectbox("Color by", ["Tweet Count", "Avg Engagement Rate"])
+            with col_tz:
+                tz_label = st.selectbox(
+                    "Timezone",
+                    list(HEATMAP_TIMEZONES),
+                    help="Timestamps without a timezone are treated as UTC when converting"
+                )
+            
+            # 7x24 aggregates, computed once per dataset and timezone
+            cube = load_time_cube(st.session_state.dataset_hash, source.engine, HEATMAP_TIMEZONES[tz_label], source)
             
-            if len(df_heatmap) == 0:
+            if cube["counts"].sum() == 0:
                 st.warning("No valid datetime data available for heatmap.")
             else:
-                df_heatmap['hour'] = df_heatmap['created_at'].dt.hour
-                df_heatmap['day_of_week'] = df_heatmap['created_at'].dt.day_name()
-                
-                # Create frequency count
-                heatmap_df = df_heatmap.groupby(['day_of_week', 'hour']).size().reset_index(name='count')
-                
-                # Ensure proper day order
-                day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-                heatmap_df['day_of_week'] = pd.Categorical(heatmap_df['day_of_week'], categories=day_order, ordered=True)
-                heatmap_df = heatmap_df.sort_values('day_of_week')
-                
-                # Reshape for heatmap (pivot table)
-                heatmap_pivot = heatmap_df.pivot(index='day_of_week', columns='hour', values='count').fillna(0)
-                
-                # Ensure all hours 0-23 are present
-                for hour in range(24):
-                    if hour not in heatmap_pivot.columns:
-                        heatmap_pivot[hour] = 0
-                heatmap_pivot = heatmap_pivot.sort_index(axis=1)
+                if metric == "Tweet Count":
+                    values = cube["counts"]
+                else:
+                    values = mean_engagement(cube)
                 
                 # Create heatmap using plotly
                 fig = px.imshow(
-                    heatmap_pivot.values,
-                    labels=dict(x="Hour of Day", y="Day of Week", color="Tweet Count"),
+                    values,
+                    labels=dict(x="Hour of Day", y="Day of Week", color=metric),
                     x=[str(h) for h in range(24)],
-                    y=day_order,
+                    y=DAY_ORDER,
                     color_continuous_scale='YlOrRd',
                     aspect="auto"
                 )
                 
                 fig.update_layout(
-                    title="Activity Heatmap: Posting Frequency",
+                    title="Activity Heatmap: Posting Frequency" if metric == "Tweet Count" else "Activity Heatmap: Engagement by Posting Time",
                     xaxis_title="Hour of Day (0-23)",
                     yaxis_title="Day of Week",
                     height=500
@@ -278,49 +512,61 @@ else:
         else:
             if st.button("Analyze Topics", type="primary") or st.session_state.topics_analyzed:
                 if not st.session_state.topics_analyzed:
-                    with st.spinner("🎯 Analyzing topics with GPT-4..."):
+                    with st.spinner("🎯 Clustering all tweets and naming topics with GPT-4o..."):
                         try:
-                            # Get sample of tweets (limit to avoid token limits)
-                            sample_size = min(200, len(df))
-                            sample_tweets = df.sample(n=sample_size, random_state=42)['text'].tolist()
-                            tweets_text = "\n".join([f"{i+1}. {tweet}" for i, tweet in enumerate(sample_tweets)])
-                            
-                            client = OpenAI(api_key=api_key)
-                            
-                            prompt = f"""Analyze the following tweets from a Twitter account and identify the top 5 core topics or "pillars" that this account focuses on.
-
-Tweets:
-{tweets_text}
-
-For each of the 5 core topics, provide:
-1. A concise topic name (2-4 words)
-2. A brief description (1-2 sentences) explaining what this topic covers
-
-Return your response as a JSON object with this structure:
-{{
-    "topics": [
-        {{"name": "Topic Name", "description": "Description text"}},
-        {{"name": "Topic Name", "description": "Description text"}},
-        {{"name": "Topic Name", "description": "Description text"}},
-        {{"name": "Topic Name", "description": "Description text"}},
-        {{"name": "Topic Name", "description": "Description text"}}
-    ]
-}}"""
+                            topic_params = {'n_topics': N_TOPICS, 'embedding_model': EMBEDDING_MODEL, 'dimensions': EMBEDDING_DIMENSIONS}
+                            topic_result = llm_cache.get(st.session_state.dataset_hash, 'topics', topic_params, 'gpt-4o')
+                            if topic_result is None:
+                                started = time.perf_counter()
+                                client = shared_openai_client(api_key)
+                                
+                                # Embed the full corpus (cached on disk per dataset)
+                                index = ensure_vector_index(client, source)
+                                
+                                # Cluster the distinct tweet texts and keep the most representative ones per cluster
+                                centers = minibatch_kmeans(index.vectors, N_TOPICS)
+                                labels, sims = assign_clusters(index.vectors, centers)
+                                sizes = np.bincount(labels[index.codes], minlength=len(centers))
+                                order = [int(c) for c in np.argsort(-sizes, kind="stable") if sizes[c] > 0]
+                                exemplar_ids = cluster_exemplars(labels, sims, len(centers))
+                                exemplars = [source.texts_at(index.first_rows[exemplar_ids[c]]) for c in order]
+                                
+                                prompt = build_topic_naming_prompt(exemplars, [int(sizes[c]) for c in order], len(source))
 
-                            response = client.chat.completions.create(
-                                model="gpt-4o",
-                                messages=[
-                                    {"role": "system", "content": "You are a topic modeling expert. Always respond with valid JSON only."},
-                                    {"role": "user", "content": prompt}
-                                ],
-                                response_format={"type": "json_object"},
-                                temperature=0.7
-                            )
-                            
-                            topics_data = json.loads(response.choices[0].message.content)
+                                stream = CompletionStream(
+                                    client,
+                                    model="gpt-4o",
+                                    messages=[
+                                        {"role": "system", "content": "You are a topic modeling expert. Always respond with valid JSON only."},
+                                        {"role": "user", "content": prompt}
+                                    ],
+                                    response_format={"type": "json_object"},
+                                    temperature=0.7
+                                )
+                                
+                                # Show topics as they are named
+                                topics_preview = st.empty()
+                                for partial in iter_partial_json(stream):
+                                    named = [t for t in partial.get('topics', []) if isinstance(t, dict) and t.get('name')] if isinstance(partial, dict) else []
+                                    if named:
+                                        topics_preview.dataframe(
+                                            pd.DataFrame([{'Topic Name': t['name'], 'Description': t.get('description', '')} for t in named]),
+                                            use_container_width=True
+                                        )
+                                topics_preview.empty()
+                                
+                                topics_data = json.loads(stream.text)
+                                topic_result = {
+                                    'topics': topics_data.get('topics', []),
+                                    'shares': [int(sizes[c]) / len(source) for c in order]
+                                }
+                                llm_cache.put(
+                                    st.session_state.dataset_hash, 'topics', topic_params, 'gpt-4o', topic_result,
+                                    latency_s=time.perf_counter() - started, usage=stream.usage
+                                )
                             
                             # Create pandas DataFrame explicitly (grading requirement)
-                            topics_list = topics_data.get('topics', [])
+                            topics_list = topic_result['topics']
                             topics_df = pd.DataFrame(topics_list)
                             
                             # Ensure column names match exactly: "Topic Name" and "Description"
@@ -334,6 +580,7 @@ Return your response as a JSON object with this structure:
                             
                             st.session_state.topics_analyzed = True
                             st.session_state.topics_df = topics_df
+                            st.session_state.topics_shares = topic_result['shares']
                             
                         except Exception as e:
                             st.error(f"Error analyzing topics: {str(e)}")
@@ -342,6 +589,11 @@ Return your response as a JSON object with this structure:
                     st.subheader("Core Topics Identified")
                     # Display as DataFrame (grading requirement)
                     st.dataframe(st.session_state.topics_df, use_container_width=True)
+                    if st.session_state.topics_shares:
+                        st.caption(
+                            f"Clustered from all {len(source):,} tweets. Share of tweets per topic: "
+                            + ", ".join(f"{share:.1%}" for share in st.session_state.topics_shares)
+                        )
     
     # TAB 4: Brand Compatibility Agent
     with tab4:
@@ -364,18 +616,21 @@ Return your response as a JSON object with this structure:
                 else:
                     with st.spinner(f"🤝 Analyzing compatibility with {brand_name}..."):
                         try:
-                            # Get sample of tweets
-                            sample_size = min(200, len(df))
-                            sample_tweets = df.sample(n=sample_size, random_state=42)['text'].tolist()
-                            tweets_text = "\n".join([f"{i+1}. {tweet}" for i, tweet in enumerate(sample_tweets)])
-                            
-                            client = OpenAI(api_key=api_key)
-                            
-                            prompt = f"""You are a brand compatibility analyst. Analyze how compatible the brand "{brand_name}" is with this Twitter account.
+                            brand_params = {'brand': brand_name.strip().lower(), 'context_tweets': BRAND_CONTEXT_TWEETS}
+                            analysis_data = llm_cache.get(st.session_state.dataset_hash, 'brand', brand_params, 'gpt-4o')
+                            if analysis_data is None:
+                                started = time.perf_counter()
+                                client = shared_openai_client(api_key)
+                                
+                                # Tweets most related to the brand
+                                related_tweets = retrieve_tweets(client, source, brand_name, BRAND_CONTEXT_TWEETS)
+                                tweets_text = "\n".join([f"{i+1}. {tweet}" for i, tweet in enumerate(related_tweets)])
+                                
+                                prompt = f"""You are a brand compatibility analyst. Analyze how compatible the brand "{brand_name}" is with this Twitter account.
 
 STEP 1: First, identify the core values, mission, positioning, and brand identity of "{brand_name}". Consider what the brand stands for, its target audience, and its public messaging.
 
-STEP 2: Analyze the following tweets from this Twitter account:
+STEP 2: Analyze the following tweets from this Twitter account (the {len(related_tweets)} tweets most related to "{brand_name}", out of {len(source)}):
 {tweets_text}
 
 STEP 3: Evaluate compatibility by comparing the brand's values and positioning to the themes, topics, tone, and content found in these specific tweets.
@@ -395,17 +650,29 @@ Return as JSON:
     "reasoning": "<paragraph text that explicitly connects brand values to specific tweet content with examples>"
 }}"""
 
-                            response = client.chat.completions.create(
-                                model="gpt-4o",
-                                messages=[
-                                    {"role": "system", "content": "You are a professional brand compatibility analyst. Always respond with valid JSON only."},
-                                    {"role": "user", "content": prompt}
-                                ],
-                                response_format={"type": "json_object"},
-                                temperature=0.7
-                            )
-                            
-                            analysis_data = json.loads(response.choices[0].message.content)
+                                stream = CompletionStream(
+                                    client,
+                                    model="gpt-4o",
+                                    messages=[
+                                        {"role": "system", "content": "You are a professional brand compatibility analyst. Always respond with valid JSON only."},
+                                        {"role": "user", "content": prompt}
+                                    ],
+                                    response_format={"type": "json_object"},
+                                    temperature=0.7
+                                )
+                                
+                                # Show the score and reasoning while the reasoning is being written
+                                analysis_preview = st.empty()
+                                for partial in iter_partial_json(stream):
+                                    if isinstance(partial, dict) and partial.get('reasoning'):
+                                        analysis_preview.markdown(f"**Compatibility Score:** {partial.get('score', '…')}  \n{partial['reasoning']}")
+                                analysis_preview.empty()
+                                
+                                analysis_data = json.loads(stream.text)
+                                llm_cache.put(
+                                    st.session_state.dataset_hash, 'brand', brand_params, 'gpt-4o', analysis_data,
+                                    latency_s=time.perf_counter() - started, usage=stream.usage
+                                )
                             
                             score = analysis_data.get('score', 0)
                             reasoning = analysis_data.get('reasoning', 'No reasoning provided.')
@@ -434,6 +701,78 @@ Return as JSON:
                 st.markdown("### Strategic Reasoning")
                 st.markdown(f"<div style='padding: 1rem; background-color: #f0f2f6; border-radius: 0.5rem; line-height: 1.8; color: #333;'>{analysis['reasoning']}</div>", unsafe_allow_html=True)
     
+            # Batch mode: score many sponsor candidates at once
+            st.divider()
+            with st.expander("📋 Batch Brand Scoring", expanded=bool(st.session_state.brand_batch_results)):
+                st.markdown("Score a list of brands concurrently against the same set of representative tweets.")
+                brands_text = st.text_area(
+                    "Brand names (one per line or comma-separated)",
+                    placeholder="Nike\nAdidas\nYale University",
+                    key="brand_batch_input"
+                )
+                brands_csv = st.file_uploader(
+                    "...or upload a CSV of brands (a `brand` column, or the first column)",
+                    type=['csv'],
+                    key="brand_batch_csv"
+                )
+                
+                if st.button("Score Brands", key="brand_batch_button"):
+                    brands = parse_brand_list(brands_text, brands_csv.getvalue() if brands_csv is not None else None)
+                    if not brands:
+                        st.warning("Please enter at least one brand name.")
+                    elif len(brands) > MAX_BATCH_BRANDS:
+                        st.warning(f"Please score at most {MAX_BATCH_BRANDS} brands at a time.")
+                    else:
+                        try:
+                            st.session_state.brand_batch_results = []
+                            progress = st.progress(0.0, text=f"Scoring {len(brands)} brands...")
+                            table = st.empty()
+                            
+                            def show_result(result):
+                                st.session_state.brand_batch_results.append(result)
+                                done = len(st.session_state.brand_batch_results)
+                                progress.progress(done / len(brands), text=f"Scored {done}/{len(brands)} brands")
+                                table.dataframe(brand_batch_table(st.session_state.brand_batch_results), **BRAND_BATCH_TABLE)
+                            
+                            def store_result(result):
+                                if not result['error']:
+                                    llm_cache.put(
+                                        st.session_state.dataset_hash, 'brand_batch', brand_batch_params(result['brand']), BRAND_MODEL,
+                                        {'score': result['score'], 'reasoning': result['reasoning']},
+                                        latency_s=result['latency_s'], usage=result
+                                    )
+                                show_result(result)
+                            
+                            # Brands scored before (any session) come from the cache; only the rest are sent
+                            pending = []
+                            for brand in brands:
+                                cached = llm_cache.get(st.session_state.dataset_hash, 'brand_batch', brand_batch_params(brand), BRAND_MODEL)
+                                if cached is None:
+                                    pending.append(brand)
+                                else:
+                                    show_result({'brand': brand, 'error': None, 'cached_tokens': 0, **cached})
+                            
+                            if pending:
+                                client = shared_openai_client(api_key)
+                                index = ensure_vector_index(client, source)
+                                corpus_rows = representative_rows(st.session_state.dataset_hash, index)
+                                corpus_tweets = source.texts_at(corpus_rows)
+                                score_brands(shared_async_runner(api_key), pending, corpus_tweets, len(source), store_result)
+                            progress.empty()
+                            table.empty()
+                        except Exception as e:
+                            st.error(f"Error scoring brands: {str(e)}")
+                    
+                if st.session_state.brand_batch_results:
+                    results = st.session_state.brand_batch_results
+                    failed = [r for r in results if r['error']]
+                    if failed:
+                        st.warning(f"{len(failed)} brand(s) failed: " + ", ".join(r['brand'] for r in failed))
+                    cached = sum(r['cached_tokens'] for r in results)
+                    if cached:
+                        st.caption(f"{cached:,} prompt tokens served from the shared-prefix cache")
+                    st.dataframe(brand_batch_table(results), **BRAND_BATCH_TABLE)
+    
     # TAB 5: The News Reactor
     with tab5:
         st.header("📰 The News Reactor")
@@ -443,107 +782,86 @@ Return as JSON:
         if not api_key:
             st.error("⚠️ OpenAI API Key not found. Please set OPENAI_API_KEY in your .env file.")
         else:
-            article_url = st.text_input(
-                "Enter News Article URL",
+            article_urls_text = st.text_area(
+                "Enter News Article URL(s)",
                 placeholder="https://...",
+                help="One URL per line. All articles are fetched and answered in parallel.",
                 key="article_url"
             )
             
+            fresh_tweet = st.checkbox(
+                "Write a new tweet even if this article was used before",
+                help="By default, a tweet already generated for this URL and dataset is reused"
+            )
+            
             if st.button("Generate Reactive Tweet", type="primary"):
-                if not article_url or article_url.strip() == "":
+                article_urls = parse_url_list(article_urls_text)
+                if not article_urls:
                     st.warning("Please enter a news article URL.")
                 else:
                     # Validate URL format
-                    url_pattern = re.compile(
-                        r'^https?://'  # http:// or https://
-                        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-                        r'localhost|'  # localhost...
-                        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-                        r'(?::\d+)?'  # optional port
-                        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-                    
-                    if not url_pattern.match(article_url):
-                        st.error("Invalid URL format. Please enter a valid URL starting with http:// or https://")
+                    invalid_urls = [url for url in article_urls if not URL_PATTERN.match(url)]
+                    if invalid_urls:
+                        st.error(
+                            "Invalid URL format. Please enter a valid URL starting with http:// or https://: "
+                            + ", ".join(invalid_urls)
+                        )
                     else:
-                        with st.spinner("📰 Scraping article and generating tweet..."):
+                        with st.spinner(f"📰 Scraping {len(article_urls)} article(s) and generating tweets..."):
                             try:
-                                # Scrape article using newspaper3k
-                                article = Article(article_url)
-                                article.download()
-                                article.parse()
-                                
-                                article_text = article.text
-                                
-                                if not article_text or len(article_text.strip()) < 50:
-                                    st.error("Could not extract article content. The URL may not be accessible or may not contain a valid article.")
-                                else:
-                                    # Get sample of user tweets for style reference
-                                    sample_size = min(50, len(df))
-                                    sample_tweets = df.sample(n=sample_size, random_state=42)['text'].tolist()
-                                    tweets_text = "\n".join([f"{i+1}. {tweet}" for i, tweet in enumerate(sample_tweets)])
-                                    
-                                    client = OpenAI(api_key=api_key)
-                                    
-                                    # Limit article text to avoid token limits
-                                    article_text_limited = article_text[:3000]
-                                    
-                                    prompt = f"""You are a social media manager. A news article has been provided below. Generate a reactive tweet in the EXACT voice and style of this Twitter account.
-
-News Article:
-{article_text_limited}
-
-Account's Tweets (for style reference):
-{tweets_text}
-
-Generate a tweet that:
-1. Reacts to the news article
-2. Matches the account's voice, tone, and style perfectly
-3. Is engaging and authentic
-4. Stays within Twitter's character limit (280 characters)
-
-Return only the tweet text, nothing else."""
-
-                                    response = client.chat.completions.create(
-                                        model="gpt-4o",
-                                        messages=[
-                                            {"role": "system", "content": "You are a professional tweet writer. Match the style and voice of the provided examples exactly. Return only the tweet text."},
-                                            {"role": "user", "content": prompt}
-                                        ],
-                                        temperature=0.8,
-                                        max_tokens=280
-                                    )
-                                    
-                                    generated_tweet = response.choices[0].message.content.strip()
-                                    st.session_state.generated_tweet = generated_tweet
-                                    
+                                st.session_state.generated_tweets = react_to_articles(api_key, source, article_urls, fresh_tweet)
                             except Exception as e:
-                                error_msg = str(e)
-                                if "download" in error_msg.lower() or "parse" in error_msg.lower():
-                                    st.error(f"Error scraping article: {error_msg}. Please check the URL and try again.")
-                                else:
-                                    st.error(f"Error generating tweet: {error_msg}")
+                                st.error(f"Error generating tweet: {str(e)}")
             
-            # Display generated tweet if available
-            if st.session_state.generated_tweet:
+            # Display generated tweets if available
+            if st.session_state.generated_tweets:
                 st.divider()
-                st.subheader("Generated Reactive Tweet")
+                st.subheader("Generated Reactive Tweets" if len(st.session_state.generated_tweets) > 1 else "Generated Reactive Tweet")
                 
-                # Create styled tweet card
-                tweet_html = f"""
-                <div class="tweet-card">
-                    <div class="tweet-header">
-                        <div class="tweet-avatar">👤</div>
-                        <div>
-                            <strong>Your Account</strong><br>
-                            <span style="color: #666;">@yourhandle</span>
+                for item in st.session_state.generated_tweets:
+                    if len(st.session_state.generated_tweets) > 1:
+                        st.caption(item['url'])
+                    if item['error']:
+                        st.error(item['error'])
+                        continue
+                    
+                    # Create styled tweet card
+                    tweet_html = f"""
+                    <div class="tweet-card">
+                        <div class="tweet-header">
+                            <div class="tweet-avatar">👤</div>
+                            <div>
+                                <strong>Your Account</strong><br>
+                                <span style="color: #666;">@yourhandle</span>
+                            </div>
+                        </div>
+                        <div class="tweet-text">
+                            {item['tweet']}
                         </div>
                     </div>
-                    <div class="tweet-text">
-                        {st.session_state.generated_tweet}
-                    </div>
-                </div>
-                """
-                st.markdown(tweet_html, unsafe_allow_html=True)
-                
-                # Copy button functionality
-                st.code(st.session_state.generated_tweet, language=None)
+                    """
+                    st.markdown(tweet_html, unsafe_allow_html=True)
+                    
+                    # Copy button functionality
+                    st.code(item['tweet'], language=None)
+
+# LLM result cache savings (rendered last so it includes this run's calls)
+with st.sidebar:
+    st.header("💾 Analysis Cache")
+    cache_stats = llm_cache.stats()
+    col_entries, col_hits = st.columns(2)
+    col_entries.metric("Cached Results", f"{cache_stats['entries']:,}")
+    col_hits.metric("Cache Hits", f"{cache_stats['hits']:,}")
+    st.caption(
+        f"Saved ~{cache_stats['saved_latency_s']:.0f}s of waiting and "
+        f"{cache_stats['saved_tokens']:,} tokens"
+    )
+    if st.button("Clear Cache"):
+        llm_cache.clear()
+        st.rerun()
+    ttfb = latency_tracker().summary()
+    if ttfb['count']:
+        st.caption(
+            f"OpenAI time to first byte: median {ttfb['p50_ms']:.0f} ms, p95 {ttfb['p95_ms']:.0f} ms "
+            f"over {ttfb['count']} requests ({'pooled' if SHARED_CLIENT else 'unpooled'} connections)"
+        )
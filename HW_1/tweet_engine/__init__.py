@@ -0,0 +1 @@
+# Strategic Tweet Engine — data and analysis helpers used by app.py
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import queue
+import time
+from typing import Callable
+
+from openai import AsyncOpenAI
+
+from tweet_engine.llm_cache import usage_of
+from tweet_engine.openai_client import AsyncClientRunner
+
+log = logging.getLogger(__name__)
+
+BRAND_MODEL = "gpt-4o"
+BRAND_SYSTEM_PROMPT = "You are a professional brand compatibility analyst. Always respond with valid JSON only."
+MAX_BATCH_BRANDS = 200
+
+
+def parse_brand_list(text: str = "", csv_bytes: bytes | None = None) -> list[str]:
+    """
+    Brand names from a pasted list (one per line or comma-separated) and/or a CSV
+    (a `brand` column if present, else the first column). Duplicates are dropped,
+    keeping the first spelling.
+    """
+    names: list[str] = []
+    for line in (text or "").splitlines():
+        names.extend(part.strip() for part in line.split(","))
+    if csv_bytes:
+        rows = list(csv.reader(io.StringIO(csv_bytes.decode("utf-8-sig"))))
+        if rows:
+            header = [h.strip().lower() for h in rows[0]]
+            if "brand" in header:
+                col = header.index("brand")
+                rows = rows[1:]
+            else:
+                col = 0
+            names.extend(row[col].strip() for row in rows if len(row) > col)
+    seen: set[str] = set()
+    out = []
+    for name in names:
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            out.append(name)
+    return out
+
+
+def corpus_message(tweets: list[str], total: int) -> str:
+    """The account's tweets; identical for every brand so the prompt prefix is shared."""
+    tweets_text = "\n".join(f"{i+1}. {tweet}" for i, tweet in enumerate(tweets))
+    return f"""Below are {len(tweets)} representative tweets from a Twitter account (chosen to cover the themes of all {total} of its tweets). You will be asked to evaluate brands against this account.
+
+Tweets:
+{tweets_text}"""
+
+
+def brand_message(brand_name: str) -> str:
+    return f"""Analyze how compatible the brand "{brand_name}" is with this Twitter account.
+
+STEP 1: First, identify the core values, mission, positioning, and brand identity of "{brand_name}". Consider what the brand stands for, its target audience, and its public messaging.
+
+STEP 2: Evaluate compatibility by comparing the brand's values and positioning to the themes, topics, tone, and content found in the tweets above.
+
+Provide:
+1. A compatibility score from 0-100 (as a number) based on alignment between brand values and tweet content
+2. A strategic reasoning paragraph (2-3 sentences) that explicitly connects the brand's values to specific tweet content with concrete examples
+
+Return as JSON:
+{{
+    "score": <0-100>,
+    "reasoning": "<paragraph text>"
+}}"""
+
+
+class RateLimiter:
+    """Spaces request starts so no more than `per_minute` begin in any minute."""
+
+    def __init__(self, per_minute: int):
+        self.interval = 60.0 / max(1, per_minute)
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def _score_brand(
+    client: AsyncOpenAI,
+    prefix: list[dict],
+    brand: str,
+    semaphore: asyncio.Semaphore,
+    limiter: RateLimiter,
+    model: str,
+) -> dict:
+    result = {"brand": brand, "score": None, "reasoning": "", "error": None, "cached_tokens": 0}
+    async with semaphore:
+        await limiter.wait()
+        start = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=prefix + [{"role": "user", "content": brand_message(brand)}],
+                response_format={"type": "json_object"},
+                temperature=0.7,
+            )
+            data = json.loads(response.choices[0].message.content)
+            result["score"] = float(data.get("score", 0))
+            result["reasoning"] = data.get("reasoning", "No reasoning provided.")
+            result.update(usage_of(response))
+            details = getattr(response.usage, "prompt_tokens_details", None)
+            result["cached_tokens"] = getattr(details, "cached_tokens", None) or 0
+        except Exception as e:
+            log.warning("Brand %r failed: %s", brand, e)
+            result["error"] = str(e)
+        result["latency_s"] = round(time.perf_counter() - start, 2)
+    return result
+
+
+async def score_brands_async(
+    client: AsyncOpenAI,
+    brands: list[str],
+    corpus_tweets: list[str],
+    total_tweets: int,
+    on_result: Callable[[dict], None],
+    concurrency: int = 8,
+    requests_per_minute: int = 300,
+    model: str = BRAND_MODEL,
+) -> list[dict]:
+    """
+    Score every brand concurrently (at most `concurrency` in flight, starts spaced
+    by `requests_per_minute`). All requests share the same system + corpus
+    messages, so the provider's prompt cache serves the corpus after the first
+    call. `on_result` is called with each result as it completes.
+    """
+    prefix = [
+        {"role": "system", "content": BRAND_SYSTEM_PROMPT},
+        {"role": "user", "content": corpus_message(corpus_tweets, total_tweets)},
+    ]
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(requests_per_minute)
+    tasks = [
+        asyncio.create_task(_score_brand(client, prefix, brand, semaphore, limiter, model))
+        for brand in brands
+    ]
+    results = []
+    for fut in asyncio.as_completed(tasks):
+        result = await fut
+        results.append(result)
+        on_result(result)
+    return results
+
+
+def score_brands(
+    runner: AsyncClientRunner,
+    brands: list[str],
+    corpus_tweets: list[str],
+    total_tweets: int,
+    on_result: Callable[[dict], None],
+    **kwargs,
+) -> list[dict]:
+    """
+    Blocking wrapper for score_brands_async, run on the shared client's event loop.
+    `on_result` is still called on the calling thread, as each result arrives.
+    """
+    done: queue.Queue = queue.Queue()
+    future = runner.submit(
+        score_brands_async(runner.client, brands, corpus_tweets, total_tweets, done.put, **kwargs)
+    )
+    while True:
+        try:
+            on_result(done.get(timeout=0.1))
+        except queue.Empty:
+            # Every result is queued before the coroutine returns.
+            if future.done() and done.empty():
+                return future.result()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ["text", "view_count", "created_at", "favorite_count"]
+# Columns kept in memory: the CSV columns the app uses plus the derived engagement.
+RESIDENT_COLUMNS = REQUIRED_COLUMNS + ["engagement"]
+
+CSV_DTYPES = {
+    "text": "string",
+    "view_count": "float64",
+    "favorite_count": "float64",
+    "created_at": "string",
+}
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "datasets"
+
+
+class DatasetError(ValueError):
+    """The uploaded file is not a usable tweet export (message is shown to the user)."""
+
+
+def dataset_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def parquet_path(digest: str, cache_dir: Path = CACHE_DIR) -> Path:
+    return cache_dir / f"{digest}.parquet"
+
+
+def _read_csv(data: bytes) -> pd.DataFrame:
+    header = pd.read_csv(io.BytesIO(data), nrows=0).columns
+    missing = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing:
+        raise DatasetError(f"Missing required columns: {', '.join(missing)}")
+    kwargs = {"usecols": REQUIRED_COLUMNS, "dtype": CSV_DTYPES}
+    try:
+        return pd.read_csv(io.BytesIO(data), engine="pyarrow", **kwargs)
+    except ImportError:
+        log.info("pyarrow not installed; falling back to the C CSV parser")
+        return pd.read_csv(io.BytesIO(data), **kwargs)
+
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    if len(df) == 0:
+        raise DatasetError("CSV file is empty. Please upload a file with tweet data.")
+    df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
+    if df["created_at"].isna().all():
+        raise DatasetError(
+            "Could not parse datetime from 'created_at' column. Please check the date format."
+        )
+    df["engagement"] = df["favorite_count"] / df["view_count"].replace(0, 1)
+    return df[RESIDENT_COLUMNS]
+
+
+def _write_parquet(df: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    try:
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+    except ImportError:
+        log.info("pyarrow not installed; not persisting %s", path.name)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def load_tweet_dataset(
+    data: bytes,
+    digest: str | None = None,
+    cache_dir: Path = CACHE_DIR,
+) -> pd.DataFrame:
+    """
+    Parse an uploaded tweet CSV into the columns the app needs.
+
+    The parsed frame is persisted as `<cache_dir>/<sha256>.parquet`, so the same
+    export uploaded again (any session, after a restart) is read back from Parquet
+    instead of being re-parsed. Raises DatasetError for files the app cannot use.
+    """
+    digest = digest or dataset_hash(data)
+    cached = parquet_path(digest, cache_dir)
+    if cached.is_file():
+        try:
+            log.info("Loading cached dataset %s", cached.name)
+            return pd.read_parquet(cached, columns=RESIDENT_COLUMNS)
+        except Exception as e:  # stale or partial cache file: rebuild it
+            log.warning("Ignoring unreadable cache %s: %s", cached.name, e)
+    df = _prepare(_read_csv(data))
+    _write_parquet(df, cached)
+    return df
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+from openai import OpenAI
+
+EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+# text-embedding-3 models can return shortened (still unit-length) vectors; 256 dims
+# keep a 2M-tweet matrix around 2 GB on disk.
+EMBEDDING_DIMENSIONS = int(os.getenv("OPENAI_EMBEDDING_DIMENSIONS", "256"))
+EMBED_BATCH_SIZE = 512
+MAX_EMBED_CHARS = 2000
+
+
+def clean_text(text) -> str:
+    text = " ".join(str(text).split())[:MAX_EMBED_CHARS] if pd.notna(text) else ""
+    return text or "(empty)"
+
+
+def embed_batch(
+    client: OpenAI,
+    texts: list[str],
+    model: str = EMBEDDING_MODEL,
+    dimensions: int = EMBEDDING_DIMENSIONS,
+) -> np.ndarray:
+    """(len(texts), dimensions) float32 unit-length embeddings."""
+    resp = client.embeddings.create(model=model, input=texts, dimensions=dimensions)
+    vecs = np.array([d.embedding for d in sorted(resp.data, key=lambda d: d.index)], dtype=np.float32)
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs / np.maximum(norms, 1e-12)
+
+
+def embed_query(
+    client: OpenAI,
+    text: str,
+    model: str = EMBEDDING_MODEL,
+    dimensions: int = EMBEDDING_DIMENSIONS,
+) -> np.ndarray:
+    return embed_batch(client, [clean_text(text)], model, dimensions)[0]
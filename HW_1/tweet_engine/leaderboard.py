@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+LEADERBOARD_COLUMNS = ["text", "created_at", "favorite_count", "view_count", "engagement"]
+
+
+def ranked_positions(values: np.ndarray, stop: int) -> np.ndarray:
+    """
+    Row positions of the `stop` highest values, best first, with NaN ranked last
+    (the order `sort_values(ascending=False)` gives). Uses argpartition, so only the
+    selected rows are sorted.
+    """
+    n = len(values)
+    stop = max(0, min(stop, n))
+    if stop == 0:
+        return np.empty(0, dtype=np.intp)
+    key = -np.asarray(values, dtype=np.float64)
+    key[np.isnan(key)] = np.inf
+    if stop < n:
+        part = np.argpartition(key, stop - 1)[:stop]
+    else:
+        part = np.arange(n)
+    return part[np.argsort(key[part], kind="stable")]
+
+
+def page_count(n_rows: int, page_size: int) -> int:
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def leaderboard_page(
+    df: pd.DataFrame, page: int, page_size: int, by: str = "engagement"
+) -> pd.DataFrame:
+    """
+    One page (1-based) of the leaderboard: the rows ranked
+    [(page-1)*page_size, page*page_size) by `by`, descending, indexed by rank.
+    Values are left numeric; formatting is done by the table's column config.
+    """
+    start = (page - 1) * page_size
+    positions = ranked_positions(df[by].to_numpy(), start + page_size)[start:]
+    out = df.iloc[positions][LEADERBOARD_COLUMNS]
+    out.index = pd.RangeIndex(start + 1, start + 1 + len(out), name="Rank")
+    return out
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "llm_cache.sqlite3"
+DEFAULT_TTL_S = float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600
+DEFAULT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    params TEXT NOT NULL,
+    model TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    latency_s REAL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+def usage_of(response: Any) -> dict[str, int]:
+    """Prompt/completion token counts of an OpenAI response (0 when not reported)."""
+    usage = getattr(response, "usage", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of LLM analysis results, shared by all sessions and
+    processes using the same file (WAL mode, one short-lived connection per call).
+
+    Entries are keyed by (dataset hash, analysis type, parameters, model), expire
+    after `ttl_s` and are evicted least-recently-used beyond `max_entries`. Each
+    entry keeps the latency and token counts of the call that produced it, and its
+    hit count, so stats() can report what the cache saved.
+    """
+
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        ttl_s: float = DEFAULT_TTL_S,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def make_key(dataset: str, analysis: str, params: dict, model: str) -> str:
+        raw = json.dumps([dataset, analysis, params, model], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, dataset: str, analysis: str, params: dict, model: str) -> Any | None:
+        key = self.make_key(dataset, analysis, params, model)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_s:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            conn.execute(
+                "UPDATE entries SET accessed = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+        return json.loads(row[0])
+
+    def put(
+        self,
+        dataset: str,
+        analysis: str,
+        params: dict,
+        model: str,
+        value: Any,
+        latency_s: float | None = None,
+        usage: dict[str, int] | None = None,
+    ) -> None:
+        key = self.make_key(dataset, analysis, params, model)
+        usage = usage or {}
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, dataset, analysis, params, model, value,"
+                " created, accessed, hits, latency_s, prompt_tokens, completion_tokens)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?)",
+                (
+                    key, dataset, analysis,
+                    json.dumps(params, sort_keys=True, ensure_ascii=False), model,
+                    json.dumps(value, ensure_ascii=False), now, now, latency_s,
+                    usage.get("prompt_tokens"), usage.get("completion_tokens"),
+                ),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl_s,))
+        conn.execute(
+            "DELETE FROM entries WHERE key IN (SELECT key FROM entries"
+            " ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def stats(self) -> dict[str, float]:
+        """Entry count, hits, and the latency/tokens those hits did not have to spend."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0),"
+                " COALESCE(SUM(hits * COALESCE(latency_s, 0)), 0),"
+                " COALESCE(SUM(hits * (COALESCE(prompt_tokens, 0) + COALESCE(completion_tokens, 0))), 0)"
+                " FROM entries"
+            ).fetchone()
+        return {
+            "entries": row[0],
+            "hits": row[1],
+            "saved_latency_s": row[2],
+            "saved_tokens": row[3],
+        }
+
+    def clear(self) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM entries")
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+from newspaper import Article
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "articles"
+# Within this many seconds a cached article is reused without asking the server.
+FRESH_FOR_S = 15 * 60
+MIN_ARTICLE_CHARS = 50
+FETCH_WORKERS = 8
+USER_AGENT = "Mozilla/5.0 (compatible; StrategicTweetEngine/1.0)"
+
+URL_PATTERN = re.compile(
+    r'^https?://'  # http:// or https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+
+
+def parse_url_list(text: str) -> list[str]:
+    """URLs from a pasted list (one per line or whitespace-separated), duplicates dropped."""
+    out: list[str] = []
+    for url in (text or "").split():
+        if url not in out:
+            out.append(url)
+    return out
+
+
+def make_http_client(
+    transport: httpx.BaseTransport | None = None,
+    max_connections: int = 20,
+    timeout_s: float = 10.0,
+) -> httpx.Client:
+    """
+    Pooled HTTP client for article downloads (thread-safe; share one per process).
+    `transport` lets tests serve pages from an in-process stand-in such as
+    httpx.MockTransport instead of the network.
+    """
+    return httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(timeout_s, connect=5.0),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+def extract_text(html: str, url: str) -> str:
+    """Article body text from already-downloaded HTML (newspaper3k, no extra requests)."""
+    article = Article(url, fetch_images=False)
+    article.download(input_html=html)
+    article.parse()
+    return article.text or ""
+
+
+class ArticleCache:
+    """Extracted article text per URL, with the validators needed for conditional GETs."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, url: str) -> dict | None:
+        path = self._path(url)
+        if not path.is_file():
+            return None
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def put(self, entry: dict) -> None:
+        path = self._path(entry["url"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+def fetch_article(client: httpx.Client, url: str, cache: ArticleCache) -> dict:
+    """
+    Download and extract one article. Returns `{"url", "text", "source", "error"}`
+    where source is "cache" (fresh entry, no request), "not_modified" (server
+    answered 304 to If-None-Match / If-Modified-Since) or "fetched".
+    """
+    cached = cache.get(url)
+    if cached and time.time() - cached.get("checked", 0) < FRESH_FOR_S:
+        return {"url": url, "text": cached["text"], "source": "cache", "error": None}
+
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        resp = client.get(url, headers=headers)
+        if resp.status_code == 304 and cached:
+            cached["checked"] = time.time()
+            cache.put(cached)
+            return {"url": url, "text": cached["text"], "source": "not_modified", "error": None}
+        resp.raise_for_status()
+        text = extract_text(resp.text, str(resp.url))
+    except Exception as e:
+        if isinstance(e, httpx.HTTPStatusError):
+            e = f"HTTP {e.response.status_code}"
+        log.warning("Fetching %s failed: %s", url, e)
+        return {
+            "url": url,
+            "text": "",
+            "source": "fetched",
+            "error": f"Error scraping article: {e}. Please check the URL and try again.",
+        }
+
+    if len(text.strip()) < MIN_ARTICLE_CHARS:
+        return {
+            "url": url,
+            "text": "",
+            "source": "fetched",
+            "error": "Could not extract article content. The URL may not be accessible or may not contain a valid article.",
+        }
+    cache.put(
+        {
+            "url": url,
+            "text": text,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "checked": time.time(),
+        }
+    )
+    return {"url": url, "text": text, "source": "fetched", "error": None}
+
+
+def fetch_articles(
+    client: httpx.Client,
+    urls: list[str],
+    cache: ArticleCache | None = None,
+    max_workers: int = FETCH_WORKERS,
+) -> list[dict]:
+    """fetch_article for every URL concurrently over the shared client, in input order."""
+    if not urls:
+        return []
+    cache = cache or ArticleCache()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+        return list(pool.map(lambda url: fetch_article(client, url, cache), urls))
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import csv
+import logging
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tweet_engine.dataset import (
+    CACHE_DIR,
+    REQUIRED_COLUMNS,
+    DatasetError,
+    parquet_path,
+)
+from tweet_engine.leaderboard import LEADERBOARD_COLUMNS, leaderboard_page
+from tweet_engine.time_cube import N_DAYS, N_HOURS, build_time_cube
+
+log = logging.getLogger(__name__)
+
+# Twitter's own export format, e.g. "Wed Oct 10 20:19:24 +0000 2018".
+TWITTER_TIME_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+
+class TweetSource(ABC):
+    """
+    What the app reads from a loaded dataset. PandasSource keeps the frame in
+    memory; DuckDBSource answers the same calls with SQL over the dataset's Parquet
+    file, so nothing proportional to the dataset is held per session.
+    """
+
+    digest: str
+    # Query engine name; part of cache keys, since engines may not share results
+    engine: str
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def leaderboard_page(self, page: int, page_size: int) -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def time_cube(self, tz: str | None) -> dict[str, np.ndarray]:
+        ...
+
+    @abstractmethod
+    def texts(self) -> pd.Series:
+        """The whole text column (used once per dataset to build the vector index)."""
+
+    @abstractmethod
+    def texts_at(self, rows) -> list[str]:
+        """Tweet texts at the given row positions, in that order."""
+
+
+class PandasSource(TweetSource):
+    engine = "pandas"
+
+    def __init__(self, df: pd.DataFrame, digest: str):
+        self.df = df
+        self.digest = digest
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def leaderboard_page(self, page: int, page_size: int) -> pd.DataFrame:
+        return leaderboard_page(self.df, page, page_size)
+
+    def time_cube(self, tz: str | None) -> dict[str, np.ndarray]:
+        return build_time_cube(self.df["created_at"], self.df["engagement"], tz)
+
+    def texts(self) -> pd.Series:
+        return self.df["text"]
+
+    def texts_at(self, rows) -> list[str]:
+        return self.df["text"].iloc[np.asarray(rows, dtype=np.int64)].astype(str).tolist()
+
+
+def _import_duckdb():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise RuntimeError(
+            "The DuckDB engine requires the duckdb package (pip install duckdb)."
+        ) from e
+    return duckdb
+
+
+def _sql_str(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _check_header(data: bytes) -> None:
+    first_line = data[:65536].decode("utf-8-sig", errors="replace").splitlines()[:1]
+    header = next(csv.reader(first_line), []) if first_line else []
+    missing = [col for col in REQUIRED_COLUMNS if col not in [h.strip() for h in header]]
+    if missing:
+        raise DatasetError(f"Missing required columns: {', '.join(missing)}")
+
+
+def convert_csv_with_duckdb(conn, data: bytes, out: Path) -> None:
+    """
+    CSV -> Parquet with the same columns and types as load_tweet_dataset, streamed
+    through DuckDB so the rows never become a pandas DataFrame.
+    """
+    _check_header(data)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp_csv = out.with_name(out.name + f".{os.getpid()}.csv")
+    tmp_parquet = out.with_name(out.name + f".{os.getpid()}.tmp")
+    try:
+        tmp_csv.write_bytes(data)
+        cur = conn.cursor()
+        cur.execute("SET TimeZone = 'UTC'")
+        cur.execute(
+            f"""
+            COPY (
+                SELECT text, view_count, created_at, favorite_count,
+                       favorite_count / CASE WHEN view_count = 0 THEN 1 ELSE view_count END
+                           AS engagement
+                FROM (
+                    SELECT CAST(text AS VARCHAR) AS text,
+                           TRY_CAST(view_count AS DOUBLE) AS view_count,
+                           COALESCE(
+                               TRY_CAST(created_at AS TIMESTAMP),
+                               CAST(TRY_STRPTIME(created_at, {_sql_str(TWITTER_TIME_FORMAT)}) AS TIMESTAMP)
+                           ) AS created_at,
+                           TRY_CAST(favorite_count AS DOUBLE) AS favorite_count
+                    FROM read_csv({_sql_str(tmp_csv.as_posix())}, header = true, all_varchar = true)
+                )
+            ) TO {_sql_str(tmp_parquet.as_posix())} (FORMAT parquet)
+            """
+        )
+        n_rows, n_dates = cur.execute(
+            f"SELECT count(*), count(created_at) FROM read_parquet({_sql_str(tmp_parquet.as_posix())})"
+        ).fetchone()
+        if n_rows == 0:
+            raise DatasetError("CSV file is empty. Please upload a file with tweet data.")
+        if n_dates == 0:
+            raise DatasetError(
+                "Could not parse datetime from 'created_at' column. Please check the date format."
+            )
+        os.replace(tmp_parquet, out)
+    finally:
+        for tmp in (tmp_csv, tmp_parquet):
+            if tmp.exists():
+                tmp.unlink()
+
+
+class DuckDBSource(TweetSource):
+    """Queries one dataset's Parquet file through a shared DuckDB connection."""
+
+    engine = "duckdb"
+
+    def __init__(self, conn, path: Path, digest: str):
+        self._conn = conn
+        self.path = path
+        self.digest = digest
+        self._table = f"read_parquet({_sql_str(path.as_posix())})"
+        self._rows_table = f"read_parquet({_sql_str(path.as_posix())}, file_row_number = true)"
+        self._len = self._query(f"SELECT count(*) FROM {self._table}").fetchone()[0]
+
+    def _query(self, sql: str, params: list | None = None):
+        # One cursor per call: DuckDB cursors are safe to use from the thread that made them.
+        # Each gets the UTC session timezone, so TIMESTAMPTZ values never depend on the host's.
+        cur = self._conn.cursor()
+        cur.execute("SET TimeZone = 'UTC'")
+        return cur.execute(sql, params or [])
+
+    def __len__(self) -> int:
+        return self._len
+
+    def leaderboard_page(self, page: int, page_size: int) -> pd.DataFrame:
+        start = (page - 1) * page_size
+        out = self._query(
+            f"SELECT {', '.join(LEADERBOARD_COLUMNS)} FROM {self._table}"
+            " ORDER BY engagement DESC NULLS LAST LIMIT ? OFFSET ?",
+            [page_size, start],
+        ).df()
+        out.index = pd.RangeIndex(start + 1, start + 1 + len(out), name="Rank")
+        return out
+
+    def time_cube(self, tz: str | None) -> dict[str, np.ndarray]:
+        # The Parquet file may have been written by either engine: pandas stores tz-aware
+        # times as TIMESTAMPTZ, DuckDB as a naive UTC TIMESTAMP. Casting to TIMESTAMP under
+        # the UTC session timezone gives the UTC wall-clock time for both.
+        utc = "CAST(created_at AS TIMESTAMP)"
+        ts = utc if tz is None else f"timezone({_sql_str(tz)}, timezone('UTC', {utc}))"
+        rows = self._query(
+            f"""
+            SELECT isodow(ts) - 1 AS day, hour(ts) AS hour, count(*) AS n,
+                   coalesce(sum(engagement), 0) AS eng_sum, count(engagement) AS eng_n
+            FROM (SELECT {ts} AS ts, engagement FROM {self._table} WHERE created_at IS NOT NULL)
+            GROUP BY ALL
+            """
+        ).fetchnumpy()
+        shape = (N_DAYS, N_HOURS)
+        cube = {
+            "counts": np.zeros(shape, dtype=np.int64),
+            "engagement_sum": np.zeros(shape, dtype=np.float64),
+            "engagement_n": np.zeros(shape, dtype=np.int64),
+        }
+        day, hour = rows["day"].astype(np.int64), rows["hour"].astype(np.int64)
+        cube["counts"][day, hour] = rows["n"]
+        cube["engagement_sum"][day, hour] = rows["eng_sum"]
+        cube["engagement_n"][day, hour] = rows["eng_n"]
+        return cube
+
+    def texts(self) -> pd.Series:
+        # Read on demand and not kept: only index builds need the whole column.
+        return self._query(f"SELECT text FROM {self._table}").df()["text"]
+
+    def texts_at(self, rows) -> list[str]:
+        rows = [int(r) for r in rows]
+        if not rows:
+            return []
+        found = dict(
+            self._query(
+                f"SELECT file_row_number, text FROM {self._rows_table}"
+                " WHERE file_row_number IN (SELECT unnest(?))",
+                [rows],
+            ).fetchall()
+        )
+        return [str(found.get(r, "")) for r in rows]
+
+
+def open_duckdb_source(conn, data: bytes, digest: str, cache_dir: Path = CACHE_DIR) -> DuckDBSource:
+    """DuckDBSource for an upload, converting it to Parquet first unless already cached."""
+    path = parquet_path(digest, cache_dir)
+    if not path.is_file():
+        log.info("Converting dataset %s to Parquet with DuckDB", digest[:12])
+        convert_csv_with_duckdb(conn, data, path)
+    return DuckDBSource(conn, path, digest)
+
+
+def connect_duckdb():
+    duckdb = _import_duckdb()
+    return duckdb.connect(database=":memory:")
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Iterator
+
+from openai import OpenAI
+
+from tweet_engine.llm_cache import usage_of
+
+
+class CompletionStream:
+    """
+    A streamed chat completion. Iterating yields the text deltas as they arrive
+    (so it can be passed to st.write_stream); afterwards `text` holds the whole
+    reply, `usage` its token counts and `first_token_s` the time to first content.
+    """
+
+    def __init__(self, client: OpenAI, **kwargs: Any):
+        self._started = time.perf_counter()
+        self._stream = client.chat.completions.create(
+            stream=True, stream_options={"include_usage": True}, **kwargs
+        )
+        self.text = ""
+        self.usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        self.first_token_s: float | None = None
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self._stream:
+            if getattr(chunk, "usage", None):
+                self.usage = usage_of(chunk)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if self.first_token_s is None:
+                    self.first_token_s = time.perf_counter() - self._started
+                self.text += delta
+                yield delta
+
+
+def _close_json(prefix: str) -> str:
+    """`prefix` with any open string, array and object closed."""
+    closers: list[str] = []
+    in_string = escaped = False
+    for ch in prefix:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+        elif ch in "}]" and closers:
+            closers.pop()
+    if in_string:
+        prefix = (prefix[:-1] if escaped else prefix) + '"'
+    return prefix + "".join(reversed(closers))
+
+
+def _cut_points(prefix: str) -> list[int]:
+    """Offsets (latest first) where the prefix can be cut back to complete values only."""
+    points: list[int] = []
+    in_string = escaped = False
+    for i, ch in enumerate(prefix):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ",":
+            points.append(i)
+        elif ch in "{[":
+            points.append(i + 1)
+    return points[::-1]
+
+
+def parse_partial_json(prefix: str) -> Any | None:
+    """
+    Best-effort parse of an incomplete JSON document: open strings and containers
+    are closed, and a trailing key or value that cannot be completed is dropped.
+    Returns None when nothing parseable has arrived yet.
+    """
+    prefix = prefix.strip()
+    if not prefix:
+        return None
+    for cut in [len(prefix)] + _cut_points(prefix):
+        try:
+            return json.loads(_close_json(prefix[:cut].rstrip()))
+        except ValueError:
+            continue
+    return None
+
+
+def iter_partial_json(stream: CompletionStream) -> Iterator[Any]:
+    """Consume a JSON-mode stream, yielding the parsed partial document whenever it changes."""
+    last = None
+    for _ in stream:
+        parsed = parse_partial_json(stream.text)
+        if parsed is not None and parsed != last:
+            last = parsed
+            yield parsed
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+N_DAYS, N_HOURS = 7, 24
+
+
+def _local_times(created_at: pd.Series, tz: str | None) -> pd.Series:
+    """Timestamps as wall-clock times in `tz` (naive timestamps are taken as UTC)."""
+    if tz is None:
+        return created_at
+    if created_at.dt.tz is None:
+        created_at = created_at.dt.tz_localize("UTC")
+    return created_at.dt.tz_convert(tz)
+
+
+def build_time_cube(
+    created_at: pd.Series, engagement: pd.Series, tz: str | None = None
+) -> dict[str, np.ndarray]:
+    """
+    Weekday x hour aggregates for one dataset, as (7, 24) arrays indexed
+    [Monday..Sunday, 0..23]:
+
+    - `counts`: tweets posted in the bucket
+    - `engagement_sum`: sum of engagement over tweets with a value
+    - `engagement_n`: number of tweets contributing to `engagement_sum`
+
+    Rows without a parseable `created_at` are left out. With `tz`, times are
+    converted to that zone first; otherwise they are bucketed as recorded.
+    """
+    valid = created_at.notna().to_numpy()
+    times = _local_times(created_at[valid], tz)
+    bins = times.dt.dayofweek.to_numpy(dtype=np.int64) * N_HOURS + times.dt.hour.to_numpy(
+        dtype=np.int64
+    )
+    eng = engagement.to_numpy(dtype=np.float64)[valid]
+    has_eng = ~np.isnan(eng)
+    size = N_DAYS * N_HOURS
+    counts = np.bincount(bins, minlength=size)
+    eng_sum = np.bincount(bins[has_eng], weights=eng[has_eng], minlength=size)
+    eng_n = np.bincount(bins[has_eng], minlength=size)
+    shape = (N_DAYS, N_HOURS)
+    return {
+        "counts": counts.reshape(shape),
+        "engagement_sum": eng_sum.reshape(shape),
+        "engagement_n": eng_n.reshape(shape),
+    }
+
+
+def mean_engagement(cube: dict[str, np.ndarray]) -> np.ndarray:
+    """Average engagement rate per bucket (NaN where no tweet has one)."""
+    n = cube["engagement_n"]
+    return np.divide(
+        cube["engagement_sum"], n, out=np.full(n.shape, np.nan), where=n > 0
+    )
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+ASSIGN_CHUNK = 65536
+EXEMPLARS_PER_TOPIC = 12
+MAX_EXEMPLAR_CHARS = 280
+
+
+def assign_clusters(x: np.ndarray, centers: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Nearest center (by cosine similarity) and that similarity, for every row of `x`."""
+    labels = np.empty(len(x), dtype=np.int32)
+    sims = np.empty(len(x), dtype=np.float32)
+    for start in range(0, len(x), ASSIGN_CHUNK):
+        s = np.asarray(x[start : start + ASSIGN_CHUNK]) @ centers.T
+        labels[start : start + len(s)] = s.argmax(axis=1)
+        sims[start : start + len(s)] = s.max(axis=1)
+    return labels, sims
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    return m / np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+
+
+def _init_centers(x: np.ndarray, k: int, rng: np.random.Generator, sample: int) -> np.ndarray:
+    """k-means++ seeding on a random sample of rows."""
+    idx = np.sort(rng.choice(len(x), size=min(sample, len(x)), replace=False))
+    pts = np.asarray(x[idx], dtype=np.float32)
+    centers = [pts[rng.integers(len(pts))]]
+    d2 = np.full(len(pts), np.inf, dtype=np.float32)
+    for _ in range(1, k):
+        d2 = np.minimum(d2, np.maximum(2.0 - 2.0 * pts @ centers[-1], 0.0))
+        total = d2.sum()
+        nxt = rng.choice(len(pts), p=d2 / total) if total > 0 else rng.integers(len(pts))
+        centers.append(pts[nxt])
+    return np.stack(centers)
+
+
+def minibatch_kmeans(
+    x: np.ndarray,
+    k: int,
+    batch_size: int = 2048,
+    n_iter: int = 100,
+    seed: int = 42,
+) -> np.ndarray:
+    """
+    Spherical mini-batch k-means (Sculley, 2010) over unit-length rows of `x`.
+
+    Each step assigns a random batch to its nearest centers and moves each center
+    towards its batch members with a per-center learning rate of 1 / (points seen),
+    so the whole matrix (which may be a memory map) is never loaded at once.
+    Returns the (k, dim) unit-length centers.
+    """
+    n = len(x)
+    k = min(k, n)
+    rng = np.random.default_rng(seed)
+    centers = _init_centers(x, k, rng, sample=max(10 * batch_size, 20 * k))
+    seen = np.zeros(k, dtype=np.int64)
+    for _ in range(n_iter):
+        idx = np.sort(rng.choice(n, size=min(batch_size, n), replace=False))
+        batch = np.asarray(x[idx], dtype=np.float32)
+        labels = (batch @ centers.T).argmax(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, batch)
+        hit = counts > 0
+        seen[hit] += counts[hit]
+        # Sequential per-point updates with rate 1/seen, collapsed per batch.
+        rate = (counts[hit] / seen[hit])[:, None]
+        centers[hit] = (1 - rate) * centers[hit] + rate * (sums[hit] / counts[hit][:, None])
+        centers = _normalize(centers)
+    return centers
+
+
+def cluster_exemplars(
+    labels: np.ndarray, sims: np.ndarray, k: int, per_cluster: int = EXEMPLARS_PER_TOPIC
+) -> list[np.ndarray]:
+    """Row positions of the `per_cluster` members closest to each center, best first."""
+    out = []
+    for c in range(k):
+        members = np.flatnonzero(labels == c)
+        if len(members) > per_cluster:
+            members = members[np.argpartition(-sims[members], per_cluster - 1)[:per_cluster]]
+        out.append(members[np.argsort(-sims[members], kind="stable")])
+    return out
+
+
+def build_topic_naming_prompt(
+    exemplars: list[list[str]], sizes: list[int], total: int
+) -> str:
+    """Prompt asking the LLM to name clusters from their most representative tweets."""
+    sections = []
+    for i, (tweets, size) in enumerate(zip(exemplars, sizes), start=1):
+        lines = "\n".join(f"- {' '.join(t.split())[:MAX_EXEMPLAR_CHARS]}" for t in tweets)
+        sections.append(
+            f"Cluster {i} ({size} tweets, {size / total:.1%} of the account):\n{lines}"
+        )
+    clusters_text = "\n\n".join(sections)
+    return f"""The tweets of a Twitter account were grouped by meaning into {len(sizes)} clusters covering all {total} tweets. Below are the most representative tweets of each cluster.
+
+{clusters_text}
+
+For each cluster, in the same order, provide:
+1. A concise topic name (2-4 words)
+2. A brief description (1-2 sentences) explaining what this topic covers
+
+Return your response as a JSON object with this structure:
+{{
+    "topics": [
+        {{"cluster": 1, "name": "Topic Name", "description": "Description text"}}
+    ]
+}}"""
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from openai import OpenAI
+
+from tweet_engine.embeddings import (
+    EMBED_BATCH_SIZE,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_MODEL,
+    clean_text,
+    embed_batch,
+)
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "vector_index"
+SEARCH_CHUNK = 65536
+
+
+def index_dir(
+    digest: str,
+    model: str = EMBEDDING_MODEL,
+    dimensions: int = EMBEDDING_DIMENSIONS,
+    cache_dir: Path = CACHE_DIR,
+) -> Path:
+    return cache_dir / f"{digest}.{model}-{dimensions}"
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _save_npy(path: Path, arr: np.ndarray) -> None:
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp.npy")
+    np.save(tmp, arr)
+    os.replace(tmp, path)
+
+
+class TweetVectorIndex:
+    """
+    Embedding index over the distinct tweet texts of one dataset.
+
+    On disk (`<cache_dir>/<digest>.<model>-<dims>/`):
+
+    - `vectors.npy`: (n_unique, dims) float32 unit vectors, memory-mapped
+    - `codes.npy`: row -> unique text, for every row of the dataset
+    - `first_rows.npy`: unique text -> first dataset row with that text
+    - `progress.json`: how many unique texts are embedded so far
+
+    Vectors are filled in batch by batch and `progress.json` is updated after each
+    flushed batch, so an interrupted build resumes where it stopped.
+    """
+
+    def __init__(self, path: Path, texts: pd.Series, model: str, dimensions: int):
+        self.path = path
+        self.model = model
+        self.dimensions = dimensions
+        self._lock = threading.Lock()
+        path.mkdir(parents=True, exist_ok=True)
+        codes_path, first_path = path / "codes.npy", path / "first_rows.npy"
+        if codes_path.is_file() and first_path.is_file():
+            self.codes = np.load(codes_path, mmap_mode="r")
+            self.first_rows = np.load(first_path, mmap_mode="r")
+        else:
+            codes, _ = pd.factorize(texts.map(clean_text))
+            self.codes = codes.astype(np.int32)
+            # factorize numbers texts in order of appearance, so this is sorted by code.
+            _, self.first_rows = np.unique(self.codes, return_index=True)
+            _save_npy(first_path, self.first_rows)
+            _save_npy(codes_path, self.codes)
+        if len(self.codes) != len(texts):
+            raise ValueError(f"Vector index {path.name} does not match the dataset")
+
+        self.n_unique = len(self.first_rows)
+        vectors_path = path / "vectors.npy"
+        if not vectors_path.is_file():
+            np.lib.format.open_memmap(
+                vectors_path, mode="w+", dtype=np.float32, shape=(self.n_unique, dimensions)
+            ).flush()
+            _write_json(path / "progress.json", {"done": 0})
+        self.vectors = np.load(vectors_path, mmap_mode="r+")
+        self.done = int(json.loads((path / "progress.json").read_text())["done"])
+
+    @property
+    def complete(self) -> bool:
+        return self.done >= self.n_unique
+
+    def build(
+        self,
+        client: OpenAI,
+        texts: pd.Series,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> None:
+        """Embed the remaining unique texts (no-op once complete)."""
+        with self._lock:
+            if self.complete:
+                return
+            log.info(
+                "Embedding %s of %s unique texts with %s",
+                self.n_unique - self.done, self.n_unique, self.model,
+            )
+            for start in range(self.done, self.n_unique, EMBED_BATCH_SIZE):
+                rows = self.first_rows[start : start + EMBED_BATCH_SIZE]
+                batch = [clean_text(t) for t in texts.iloc[rows]]
+                self.vectors[start : start + len(batch)] = embed_batch(
+                    client, batch, self.model, self.dimensions
+                )
+                self.vectors.flush()
+                self.done = start + len(batch)
+                _write_json(self.path / "progress.json", {"done": self.done})
+                if progress:
+                    progress(self.done, self.n_unique)
+
+    def search(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Dataset rows of the k distinct texts most similar to `query` (cosine), best
+        first, and their similarities.
+        """
+        if not self.complete:
+            raise RuntimeError("Vector index is not built yet")
+        k = min(k, self.n_unique)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+        best_idx = np.empty(0, dtype=np.int64)
+        best_sim = np.empty(0, dtype=np.float32)
+        for start in range(0, self.n_unique, SEARCH_CHUNK):
+            sims = np.asarray(self.vectors[start : start + SEARCH_CHUNK]) @ query
+            top = np.argpartition(-sims, min(k, len(sims)) - 1)[:k]
+            best_idx = np.concatenate([best_idx, top + start])
+            best_sim = np.concatenate([best_sim, sims[top]])
+            if len(best_idx) > k:
+                keep = np.argpartition(-best_sim, k - 1)[:k]
+                best_idx, best_sim = best_idx[keep], best_sim[keep]
+        order = np.argsort(-best_sim, kind="stable")
+        return np.asarray(self.first_rows)[best_idx[order]], best_sim[order]
+
+
+def open_vector_index(
+    digest: str,
+    texts: pd.Series,
+    model: str = EMBEDDING_MODEL,
+    dimensions: int = EMBEDDING_DIMENSIONS,
+    cache_dir: Path = CACHE_DIR,
+) -> TweetVectorIndex:
+    return TweetVectorIndex(index_dir(digest, model, dimensions, cache_dir), texts, model, dimensions)
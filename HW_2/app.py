@@ -1,210 +1,254 @@
 import streamlit as st
-import cv2
 import os
-import glob
-import re
 import time
-import base64
-from datetime import datetime
+from typing import Iterator
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from reaction_study.capture import FrameCaptureWorker, parse_camera_source
+from reaction_study.conversation_memory import ConversationMemory, chat_lines, estimate_tokens, fit_text
+from reaction_study.events import log_event
+from reaction_study.frame_selection import FrameSelector
+from reaction_study.frame_store import FrameStore
+from reaction_study.openai_client import SHARED_CLIENT, latency_tracker, shared_openai_client
+from reaction_study.prompt_templates import TemplateStore, write_prompt_file
+from reaction_study.sessions import JobManager, cleanup_sessions, new_session_id, session_dir
+from reaction_study.timeline import TranscriptTimeline
+from reaction_study.windowed_eval import WINDOW_SECONDS, WindowedEvaluator, WindowSummary
+from reaction_study.youtube_fetch import NO_TRANSCRIPT, extract_video_id, load_video, parse_url_list, prefetch_videos
+
 load_dotenv()
 
 # --- CONFIG ---
 MODEL = "gpt-5-nano"
-IMAGES_DIR = "images"
 MAX_IMAGES = 20
-CAPTURE_INTERVAL_SECONDS = 10
+# Frames are sampled this often and scored for change; the MAX_IMAGES most informative are kept
+CAPTURE_INTERVAL_SECONDS = 1
+# Recording length when the video's duration is unknown
+DEFAULT_RECORDING_SECONDS = MAX_IMAGES * 10
+# Webcam index, or a video file to read instead of the webcam (e.g. for testing)
+CAMERA_SOURCE = parse_camera_source(os.getenv("CAMERA_SOURCE"))
+STATUS_REFRESH_SECONDS = 1
+# Raw frames kept for the live status; stored frames are JPEG-encoded in the FrameStore
+CAPTURE_RING_SIZE = 4
+# Frames are kept in memory only; set PERSIST_FRAMES=1 to also write each stored JPEG to the session's images/ folder
+PERSIST_FRAMES = os.getenv("PERSIST_FRAMES", "0") == "1"
 PROMPT_FILE = "prompt_reaction.txt"
+FINAL_TEMPLATE_FILE = "prompt_final.txt"
 FINAL_PROMPT_FILE = "final_prompt.txt"
+REACTION_PROMPT_FIELDS = ("video_title", "video_duration_seconds", "video_description", "video_transcript", "num_images")
+FINAL_PROMPT_FIELDS = ("title", "duration_seconds", "description", "transcript", "visual_evaluation", "chat_history")
+# Token budgets for the transcript sent with the evaluation and interview prompts
+# (snippets around the frames when the transcript is timed, otherwise its start)
+REACTION_TRANSCRIPT_TOKENS = 1500
+INTERVIEW_TRANSCRIPT_TOKENS = 750
+# Token budgets for the parts of the final synthesis prompt
+SYNTHESIS_DESCRIPTION_TOKENS = 400
+SYNTHESIS_TRANSCRIPT_TOKENS = 2500
+SYNTHESIS_CHAT_TOKENS = 3000
 DEFAULT_PROMPT_TEMPLATE = (
     "These are chronological snapshots of a person watching the YouTube video: "
     "'{video_title}'. Please summarize their emotional reaction and engagement "
     "level based on these images."
 )
-
-if not os.path.exists(IMAGES_DIR):
-    os.makedirs(IMAGES_DIR)
+DEFAULT_FINAL_TEMPLATE = (
+    "Write a final sentiment report on how the user felt about the YouTube video '{title}', "
+    "based on this visual reaction analysis:\n{visual_evaluation}\n\n"
+    "and this interview:\n{chat_history}"
+)
 
 
-def log_event(message: str) -> None:
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{ts}] {message}", flush=True)
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """Worker pool running evaluations and syntheses for every participant's session."""
+    cleanup_sessions()
+    return JobManager()
 
 
-def clear_images():
-    files = glob.glob(os.path.join(IMAGES_DIR, "*.png"))
-    for f in files:
-        try:
-            os.remove(f)
-        except OSError:
-            pass
+def stream_completion(client: OpenAI, **kwargs) -> Iterator[str]:
+    """Text deltas of a streamed chat completion, yielded as they arrive."""
+    stream = client.chat.completions.create(stream=True, **kwargs)
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
 
 
-# --- VIDEO ID & METADATA ---
-def extract_video_id(url: str) -> str | None:
-    if not url or not url.strip():
-        return None
-    url = url.strip()
-    # https://www.youtube.com/watch?v=VIDEO_ID
-    m = re.search(r"(?:youtube\.com/watch\?v=)([a-zA-Z0-9_-]{11})", url)
-    if m:
-        return m.group(1)
-    # https://youtu.be/VIDEO_ID
-    m = re.search(r"youtu\.be/([a-zA-Z0-9_-]{11})", url)
-    if m:
-        return m.group(1)
-    return None
+@st.cache_resource
+def get_template_store() -> TemplateStore:
+    """Compiled prompt templates, shared by all sessions (files are reloaded when they change)."""
+    return TemplateStore()
 
 
-def fetch_youtube_metadata(url: str) -> dict | None:
-    """Fetch title, duration, description via yt-dlp. Returns dict or None on error."""
-    try:
-        import yt_dlp
-        video_id = extract_video_id(url)
-        if not video_id:
-            return None
-        full_url = f"https://www.youtube.com/watch?v={video_id}"
-        ydl_opts = {
-            "quiet": True,
-            "no_warnings": True,
-            "extract_flat": False,
-            "skip_download": True,
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(full_url, download=False)
-        if not info:
-            return None
-        duration = info.get("duration")
-        if duration is None:
-            duration = 0
-        else:
-            duration = int(duration)
-        iframe_html = (
-            f'<iframe width="560" height="315" '
-            f'src="https://www.youtube.com/embed/{video_id}" '
-            f'title="YouTube video player" frameborder="0" '
-            f'allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture; web-share" '
-            f'referrerpolicy="strict-origin-when-cross-origin" allowfullscreen></iframe>'
-        )
-        return {
-            "video_id": video_id,
-            "title": info.get("title") or "Untitled",
-            "duration_seconds": duration,
-            "description": info.get("description") or "",
-            "iframe": iframe_html,
-        }
-    except Exception as e:
-        log_event(f"yt-dlp error: {e}")
-        return None
+# --- TRANSCRIPT CONTEXT ---
+def transcript_context(metadata: dict, frame_times: list[float] | None, max_tokens: int) -> str:
+    """
+    The transcript lines spoken around each frame time (seconds into the video)
+    when timed segments are available, otherwise the transcript cut to `max_tokens`.
+    """
+    segments = metadata.get("transcript_segments")
+    if segments and frame_times:
+        snippets = TranscriptTimeline(segments).snippets(frame_times)
+        if snippets:
+            return fit_text(snippets, max_tokens)
+    return fit_text(metadata.get("transcript") or NO_TRANSCRIPT, max_tokens)
 
 
-def fetch_transcript(video_id: str) -> str:
-    """Fetch transcript for video_id. Returns transcript text or placeholder."""
-    try:
-        from youtube_transcript_api import YouTubeTranscriptApi
-        segments = YouTubeTranscriptApi.get_transcript(video_id)
-        if not segments:
-            return "No transcript available."
-        return " ".join(s.get("text", "") for s in segments)
-    except Exception as e:
-        log_event(f"Transcript error: {e}")
-        return "No transcript available."
-
-
-def load_prompt_template() -> str:
-    try:
-        with open(PROMPT_FILE, "r", encoding="utf-8") as f:
-            template = f.read().strip()
-        return template if template else DEFAULT_PROMPT_TEMPLATE
-    except FileNotFoundError:
-        log_event(f"Prompt file '{PROMPT_FILE}' not found. Using default.")
-        return DEFAULT_PROMPT_TEMPLATE
-    except Exception as e:
-        log_event(f"Error reading '{PROMPT_FILE}': {e}. Using default.")
-        return DEFAULT_PROMPT_TEMPLATE
+# --- VISUAL EVALUATION ---
+def format_reaction_prompt(
+    video_title: str,
+    video_duration_seconds: int,
+    video_description: str,
+    video_transcript: str,
+    num_images_to_send: int,
+) -> str:
+    template = get_template_store().get(PROMPT_FILE, DEFAULT_PROMPT_TEMPLATE, REACTION_PROMPT_FIELDS)
+    return template.render(
+        video_title=video_title,
+        video_duration_seconds=video_duration_seconds,
+        video_description=video_description or "",
+        video_transcript=video_transcript or "",
+        num_images=num_images_to_send,
+    )
 
 
-# --- VISUAL EVALUATION ---
-def evaluate_reaction(
+def stream_reaction(
     video_title: str,
     video_duration_seconds: int,
     video_description: str = "",
     video_transcript: str = "",
-) -> str:
-    client = OpenAI()
-    image_files = sorted(glob.glob(os.path.join(IMAGES_DIR, "*.png")))
-
-    if not image_files:
+    image_urls: list[str] | None = None,
+    image_times: list[float] | None = None,
+    client: OpenAI | None = None,
+) -> Iterator[str]:
+    """
+    Visual evaluation of the captured frames, streamed as it is generated.
+    `image_urls` are ready-to-send data URLs of the session's kept frames.
+    `image_times` (seconds into the recording) label each image in the request.
+    """
+    client = client or shared_openai_client()
+    if not image_urls:
         log_event(f"Visual evaluation requested for '{video_title}' but no images found.")
-        return "No images found to analyze."
+        yield "No images found to analyze."
+        return
 
-    prompt_template = load_prompt_template()
-    num_images_to_send = min(len(image_files), MAX_IMAGES)
-    try:
-        prompt_text = prompt_template.format(
-            video_title=video_title,
-            video_duration_seconds=video_duration_seconds,
-            video_description=video_description or "",
-            video_transcript=video_transcript or "",
-            num_images=num_images_to_send,
-        )
-    except KeyError:
-        # Template may not have num_images
-        try:
-            prompt_text = prompt_template.format(
-                video_title=video_title,
-                video_duration_seconds=video_duration_seconds,
-                video_description=video_description or "",
-                video_transcript=video_transcript or "",
-            )
-        except Exception:
-            prompt_text = f"Video: {video_title}. Duration: {video_duration_seconds}s. Images: {num_images_to_send}."
-    except Exception as e:
-        log_event(f"Prompt format error: {e}. Using fallback.")
-        prompt_text = (
-            f"Video: {video_title}. Duration: {video_duration_seconds}s. "
-            f"Number of images: {num_images_to_send}. Summarize emotional reaction and engagement."
-        )
+    num_images_to_send = min(len(image_urls), MAX_IMAGES)
+    prompt_text = format_reaction_prompt(
+        video_title, video_duration_seconds, video_description, video_transcript, num_images_to_send
+    )
 
     content = [{"type": "text", "text": prompt_text}]
-    for img_path in image_files[:MAX_IMAGES]:
-        with open(img_path, "rb") as f:
-            img_b64 = base64.b64encode(f.read()).decode("utf-8")
+    for i, url in enumerate(image_urls[:MAX_IMAGES]):
+        if image_times is not None:
+            content.append({"type": "text", "text": f"Image {i + 1}, at {image_times[i]:.0f}s:"})
         content.append({
             "type": "image_url",
-            "image_url": {"url": f"data:image/png;base64,{img_b64}"},
+            "image_url": {"url": url},
         })
     content.append({"type": "text", "text": f"Number of images provided: {num_images_to_send}"})
 
     try:
         log_event(f"Calling AI for '{video_title}' with {num_images_to_send} image(s).")
+        received = 0
+        for delta in stream_completion(
+            client,
+            model=MODEL,
+            messages=[{"role": "user", "content": content}],
+        ):
+            received += len(delta)
+            yield delta
+        log_event(f"Visual evaluation received ({received} chars).")
+    except Exception as e:
+        log_event(f"AI Error: {e}")
+        yield f"AI Error: {e}"
+
+
+def evaluate_reaction(
+    video_title: str,
+    video_duration_seconds: int,
+    video_description: str = "",
+    video_transcript: str = "",
+    image_urls: list[str] | None = None,
+    image_times: list[float] | None = None,
+) -> str:
+    return "".join(
+        stream_reaction(
+            video_title, video_duration_seconds, video_description, video_transcript, image_urls, image_times
+        )
+    )
+
+
+def window_summarizer(video_title: str, client: OpenAI):
+    """Summarize one time window of frames (runs on the WindowedEvaluator's worker threads)."""
+
+    def summarize(frames, start: float, end: float) -> str:
+        content = [{
+            "type": "text",
+            "text": (
+                f"These are {len(frames)} snapshots of a person watching the YouTube video '{video_title}', "
+                f"taken between {start:.0f}s and {end:.0f}s. In 2-4 sentences, describe their emotional "
+                f"reaction and engagement in this window, and when their expression changes."
+            ),
+        }]
+        for frame in frames:
+            content.append({"type": "text", "text": f"At {frame.t:.0f}s:"})
+            content.append({"type": "image_url", "image_url": {"url": frame.data_url}})
         response = client.chat.completions.create(
             model=MODEL,
             messages=[{"role": "user", "content": content}],
         )
-        output = response.choices[0].message.content or ""
-        log_event(f"Visual evaluation received ({len(output)} chars).")
-        return output
+        return (response.choices[0].message.content or "").strip()
+
+    return summarize
+
+
+def stream_merged_reaction(
+    video_title: str,
+    video_duration_seconds: int,
+    video_description: str,
+    video_transcript: str,
+    summaries: list[WindowSummary],
+    client: OpenAI | None = None,
+) -> Iterator[str]:
+    """Visual evaluation merged from per-window summaries (text only), streamed as it is generated."""
+    num_images = sum(s.n_frames for s in summaries)
+    prompt_text = format_reaction_prompt(
+        video_title, video_duration_seconds, video_description, video_transcript, num_images
+    )
+    notes = "\n\n".join(
+        f"[{s.start:.0f}s-{s.end:.0f}s, {s.n_frames} image(s)] {s.text}" for s in summaries
+    )
+    prompt = (
+        f"{prompt_text}\n\n"
+        f"Instead of the images themselves, you are given notes written while the recording was running, "
+        f"one per time window, in order:\n\n{notes}"
+    )
+    try:
+        log_event(f"Merging {len(summaries)} window summaries for '{video_title}'.")
+        yield from stream_completion(
+            client or shared_openai_client(),
+            model=MODEL,
+            messages=[{"role": "user", "content": prompt}],
+        )
     except Exception as e:
         log_event(f"AI Error: {e}")
-        return f"AI Error: {e}"
+        yield f"AI Error: {e}"
 
 
 # --- INTERVIEW SYSTEM PROMPT ---
-def build_interview_system_prompt(metadata: dict, visual_evaluation: str) -> str:
+def build_interview_system_prompt(
+    metadata: dict, visual_evaluation: str, frame_times: list[float] | None = None
+) -> str:
     title = metadata.get("title", "Unknown")
     duration = metadata.get("duration_seconds", 0)
     description = (metadata.get("description") or "")[:1500]
-    transcript = (metadata.get("transcript") or "")[:3000]
+    transcript = transcript_context(metadata, frame_times, INTERVIEW_TRANSCRIPT_TOKENS)
     return f"""You are an interviewer following the user's viewing of a YouTube video. Your role is to ask what they liked and disliked and to reference their facial expressions and reactions from the visual analysis below.
 
 VIDEO METADATA:
 - Title: {title}
 - Duration (seconds): {duration}
 - Description (excerpt): {description}
-- Transcript (excerpt): {transcript}
+- Transcript (around the captured moments, [time] text): {transcript}
 
 VISUAL REACTION EVALUATION (from AI analysis of the user's face during the video):
 {visual_evaluation}
@@ -216,66 +260,102 @@ INSTRUCTIONS:
 - Do not repeat the full evaluation; use it to inform your questions."""
 
 
-# --- FINAL SYNTHESIS ---
-def build_final_synthesis_prompt(metadata: dict, visual_evaluation: str, messages: list) -> str:
-    title = metadata.get("title", "Unknown")
-    duration = metadata.get("duration_seconds", 0)
-    description = metadata.get("description") or "No description available."
-    transcript = metadata.get("transcript") or "No transcript available."
-
-    chat_blob = []
-    for m in messages:
-        role = m.get("role", "unknown")
-        content = m.get("content", "")
-        if isinstance(content, str):
-            chat_blob.append(f"{role.upper()}: {content}")
-        else:
-            chat_blob.append(f"{role.upper()}: [non-text content]")
-    chat_text = "\n\n".join(chat_blob)
-
-    return f"""Based on the video metadata, the visual reaction analysis, and the following interview, write a final comprehensive sentiment report on how the user truly felt about the content.
+# --- INTERVIEW MEMORY ---
+def summarize_interview(previous_summary: str, new_messages: list[dict]) -> str:
+    """Fold interview messages into the rolling summary (ConversationMemory's summarizer)."""
+    prompt = f"""You keep a running summary of an interview about how a viewer reacted to a YouTube video.
 
-Include: overall sentiment, alignment between facial expressions and stated opinions, key moments they mentioned, and any surprises or contradictions.
+Current summary:
+{previous_summary or "(empty)"}
 
-=== YOUTUBE VIDEO METADATA ===
-Title: {title}
-Duration (seconds): {duration}
-Description: {description}
-Transcript: {transcript}
-
-=== VISUAL REACTION EVALUATION ===
-{visual_evaluation}
+New messages:
+{chat_lines(new_messages)}
 
-=== INTERVIEW (CHAT HISTORY) ===
-{chat_text}
+Rewrite the summary to include the new messages, in under 150 words. Keep the viewer's concrete opinions, the moments they mentioned and anything that contradicts their facial reactions. Return only the summary."""
+    response = shared_openai_client().chat.completions.create(
+        model=MODEL,
+        messages=[{"role": "user", "content": prompt}],
+    )
+    return response.choices[0].message.content or previous_summary
 
-Write the final synthesis report now."""
 
-
-def run_final_synthesis(
+# --- FINAL SYNTHESIS ---
+def build_final_synthesis_prompt(
     metadata: dict,
     visual_evaluation: str,
     messages: list,
+    memory: ConversationMemory | None = None,
+    frame_times: list[float] | None = None,
 ) -> str:
-    prompt = build_final_synthesis_prompt(metadata, visual_evaluation, messages)
-    # Write exact prompt to file (Component 5)
-    try:
-        with open(FINAL_PROMPT_FILE, "w", encoding="utf-8") as f:
-            f.write(prompt)
-        log_event(f"Wrote exact final prompt to {FINAL_PROMPT_FILE}.")
-    except Exception as e:
-        log_event(f"Failed to write {FINAL_PROMPT_FILE}: {e}")
-
-    client = OpenAI()
+    """
+    The synthesis prompt, with description, transcript and interview cut to their
+    token budgets (the interview is summarized through `memory` when given, and the
+    transcript reduced to the snippets around `frame_times` when it is timed).
+    """
+    title = metadata.get("title", "Unknown")
+    duration = metadata.get("duration_seconds", 0)
+    full_description = metadata.get("description") or "No description available."
+    full_transcript = metadata.get("transcript") or "No transcript available."
+    description = fit_text(full_description, SYNTHESIS_DESCRIPTION_TOKENS)
+    transcript = transcript_context(metadata, frame_times, SYNTHESIS_TRANSCRIPT_TOKENS)
+    if memory is not None:
+        chat_text = memory.transcript(messages, SYNTHESIS_CHAT_TOKENS)
+    else:
+        chat_text = chat_lines(messages)
+    saved = sum(estimate_tokens(full) - estimate_tokens(cut) for full, cut in (
+        (full_description, description), (full_transcript, transcript), (chat_lines(messages), chat_text)
+    ))
+    if saved > 0:
+        log_event(f"Final synthesis prompt trimmed by ~{saved} tokens.")
+
+    template = get_template_store().get(FINAL_TEMPLATE_FILE, DEFAULT_FINAL_TEMPLATE, FINAL_PROMPT_FIELDS)
+    return template.render(
+        title=title,
+        duration_seconds=duration,
+        description=description,
+        transcript=transcript,
+        visual_evaluation=visual_evaluation,
+        chat_history=chat_text,
+    )
+
+
+def stream_final_synthesis(
+    metadata: dict,
+    visual_evaluation: str,
+    messages: list,
+    memory: ConversationMemory | None = None,
+    client: OpenAI | None = None,
+    prompt_file: str = FINAL_PROMPT_FILE,
+    frame_times: list[float] | None = None,
+) -> Iterator[str]:
+    """Final report, streamed as it is generated (the exact prompt is written to `prompt_file` alongside)."""
+    prompt = build_final_synthesis_prompt(metadata, visual_evaluation, messages, memory, frame_times)
+    # Write exact prompt to file (Component 5), without holding up the request
+    write_prompt_file(prompt_file, prompt)
+
+    client = client or shared_openai_client()
     try:
-        response = client.chat.completions.create(
+        yield from stream_completion(
+            client,
             model=MODEL,
             messages=[{"role": "user", "content": prompt}],
         )
-        return response.choices[0].message.content or "No report generated."
     except Exception as e:
         log_event(f"Final synthesis API error: {e}")
-        return f"Error generating report: {e}"
+        yield f"Error generating report: {e}"
+
+
+def run_final_synthesis(
+    metadata: dict,
+    visual_evaluation: str,
+    messages: list,
+    memory: ConversationMemory | None = None,
+    frame_times: list[float] | None = None,
+) -> str:
+    report = "".join(
+        stream_final_synthesis(metadata, visual_evaluation, messages, memory, frame_times=frame_times)
+    )
+    return report or "No report generated."
 
 
 # --- STREAMLIT UI ---
@@ -301,6 +381,56 @@ if "img_count" not in st.session_state:
     st.session_state.img_count = 0
 if "last_video_id" not in st.session_state:
     st.session_state.last_video_id = None
+if "capture_worker" not in st.session_state:
+    st.session_state.capture_worker = None
+if "session_id" not in st.session_state:
+    st.session_state.session_id = new_session_id()
+    log_event(f"New study session {st.session_state.session_id}.")
+if "eval_job_id" not in st.session_state:
+    st.session_state.eval_job_id = None
+if "synthesis_job_id" not in st.session_state:
+    st.session_state.synthesis_job_id = None
+SESSION_DIR = session_dir(st.session_state.session_id)
+if "frame_store" not in st.session_state:
+    st.session_state.frame_store = FrameStore(persist_dir=str(SESSION_DIR / "images") if PERSIST_FRAMES else None)
+if "frame_selector" not in st.session_state:
+    st.session_state.frame_selector = FrameSelector(st.session_state.frame_store, MAX_IMAGES)
+if "window_evaluator" not in st.session_state:
+    st.session_state.window_evaluator = None
+if "conversation_memory" not in st.session_state:
+    st.session_state.conversation_memory = None
+
+
+def stop_capture() -> None:
+    worker = st.session_state.capture_worker
+    if worker is not None:
+        worker.stop()
+        st.session_state.capture_worker = None
+
+
+def capture_panel() -> None:
+    """Capture count and status; re-run on a timer while recording, without rerunning the page."""
+    store = st.session_state.frame_store
+    st.session_state.img_count = len(store)
+    st.write(f"Images captured: **{len(store)}** / {MAX_IMAGES}")
+    if len(store):
+        st.caption(
+            f"Most informative of {st.session_state.frame_selector.offered} sampled frames; "
+            f"{store.total_bytes() // 1024} KB of JPEG ready to send"
+        )
+    evaluator = st.session_state.window_evaluator
+    if evaluator is not None and evaluator.submitted:
+        st.caption(f"Windows evaluated: {evaluator.submitted - evaluator.pending} / {evaluator.submitted}")
+    worker = st.session_state.capture_worker
+    if worker is None:
+        return
+    if worker.status == "error":
+        st.error(worker.error)
+    elif worker.status == "done":
+        st.info("Recording complete.")
+    elif worker.running:
+        latest = worker.ring.latest()
+        st.caption(f"Recording... last frame at {latest.t:.0f}s" if latest else "Recording...")
 
 # --- Component 1: YouTube URL input and fetch ---
 st.subheader("1. Load a YouTube video")
@@ -311,26 +441,44 @@ url_input = st.text_input(
 )
 fetch_clicked = st.button("Load video", type="primary")
 
+with st.expander("Prefetch study videos"):
+    prefetch_input = st.text_area(
+        "YouTube URLs (one per line)",
+        help="Metadata and transcripts are cached on disk, so loading these videos during the session is instant.",
+    )
+    if st.button("Prefetch"):
+        prefetch_urls = parse_url_list(prefetch_input)
+        with st.spinner(f"Fetching {len(prefetch_urls)} video(s)..."):
+            loaded = prefetch_videos(prefetch_urls)
+        failed = [url for url, ok in loaded.items() if not ok]
+        st.success(f"Cached {len(loaded) - len(failed)} of {len(loaded)} video(s).")
+        if failed:
+            st.warning("Could not fetch: " + ", ".join(failed))
+
 if fetch_clicked and url_input:
     video_id = extract_video_id(url_input)
     if not video_id:
         st.error("Could not parse a valid video ID from that URL. Use a standard YouTube watch or youtu.be link.")
     else:
-        with st.spinner("Fetching metadata..."):
-            meta = fetch_youtube_metadata(url_input)
+        with st.spinner("Fetching metadata and transcript..."):
+            meta = load_video(url_input)
         if meta is None:
             st.error("Could not fetch video (invalid URL, private video, or network error).")
         else:
-            with st.spinner("Fetching transcript..."):
-                meta["transcript"] = fetch_transcript(meta["video_id"])
             st.session_state.video_metadata = meta
             if st.session_state.last_video_id != meta["video_id"]:
-                clear_images()
+                stop_capture()
+                st.session_state.frame_store.clear()
+                st.session_state.frame_selector.reset()
+                if st.session_state.window_evaluator is not None:
+                    st.session_state.window_evaluator.close()
+                st.session_state.window_evaluator = None
                 st.session_state.last_video_id = meta["video_id"]
                 st.session_state.img_count = 0
                 st.session_state.start_time = None
                 st.session_state.visual_evaluation = None
                 st.session_state.messages = []
+                st.session_state.conversation_memory = None
                 st.session_state.interview_started = False
                 st.session_state.interview_ended = False
                 st.session_state.final_report = None
@@ -367,6 +515,13 @@ else:
 st.divider()
 st.subheader("2. Record your reaction")
 run_study = st.toggle("Start Recording Reaction", key="run_study", disabled=not video_ready)
+evaluate_live = st.toggle(
+    "Evaluate while recording",
+    value=True,
+    key="evaluate_live",
+    disabled=not video_ready,
+    help=f"Frames are analyzed in {WINDOW_SECONDS}-second windows as you watch, so the evaluation afterwards only merges them.",
+)
 if not video_ready:
     st.caption("Load a video first to enable recording.")
 
@@ -376,23 +531,108 @@ elif st.session_state.last_run_study != run_study:
     log_event(f"Recording toggled to {run_study} for '{metadata.get('title') if metadata else 'N/A'}'.")
     st.session_state.last_run_study = run_study
 
+# The capture worker lives in session state and owns the camera across reruns
+recording = run_study and video_ready
+if recording:
+    selector = st.session_state.frame_selector
+    recording_seconds = metadata.get("duration_seconds") or DEFAULT_RECORDING_SECONDS
+    total_samples = recording_seconds // CAPTURE_INTERVAL_SECONDS + 1
+    if st.session_state.capture_worker is None and selector.offered < total_samples:
+        if st.session_state.start_time is None:
+            st.session_state.start_time = time.time()
+        if evaluate_live:
+            if st.session_state.window_evaluator is None:
+                st.session_state.window_evaluator = WindowedEvaluator(
+                    st.session_state.frame_store, window_summarizer(metadata["title"], shared_openai_client())
+                )
+            evaluator = st.session_state.window_evaluator
+
+            def offer_and_observe(frame):
+                selector.offer(frame)
+                evaluator.observe(frame.t)
+
+            on_frame = offer_and_observe
+        else:
+            on_frame = selector.offer
+
+        worker = FrameCaptureWorker(
+            CAMERA_SOURCE,
+            interval_s=CAPTURE_INTERVAL_SECONDS,
+            max_frames=total_samples - selector.offered,
+            ring_size=CAPTURE_RING_SIZE,
+            on_frame=on_frame,
+            t_offset=selector.offered * CAPTURE_INTERVAL_SECONDS,
+        )
+        worker.start()
+        st.session_state.capture_worker = worker
+else:
+    stop_capture()
+
 col1, col2 = st.columns(2)
 with col1:
     eval_clicked = st.button("Run Visual Evaluation", type="primary", disabled=not video_ready)
-    if eval_clicked and video_ready:
-        with st.spinner("Analyzing frames..."):
-            summary = evaluate_reaction(
-                video_title=metadata["title"],
-                video_duration_seconds=metadata["duration_seconds"],
-                video_description=metadata.get("description", ""),
-                video_transcript=metadata.get("transcript", ""),
-            )
-            st.session_state.visual_evaluation = summary
-        st.rerun()
 with col2:
-    num_captured = len(glob.glob(os.path.join(IMAGES_DIR, "*.png")))
-    count_placeholder = st.empty()
-    count_placeholder.write(f"Images captured: **{num_captured}** / {MAX_IMAGES}")
+    st.fragment(capture_panel, run_every=STATUS_REFRESH_SECONDS if recording else None)()
+
+def job_panel(job_key: str, result_key: str, title: str) -> None:
+    """Progress of a queued job, polled on a timer; its text moves to `result_key` when it finishes."""
+    job = get_job_manager().get(st.session_state[job_key])
+    if job is None:
+        st.session_state[job_key] = None
+        return
+    if job.done:
+        if job.status == "error":
+            st.session_state[result_key] = f"AI Error: {job.error}"
+        else:
+            st.session_state[result_key] = job.text or "No response generated."
+        st.session_state[job_key] = None
+        st.rerun()
+    with st.expander(title, expanded=True):
+        if job.status == "queued":
+            st.info(f"Queued behind {max(0, get_job_manager().queued() - 1)} other job(s)...")
+        elif job.text:
+            st.markdown(job.text)
+        else:
+            st.caption("Working...")
+
+
+if eval_clicked and video_ready:
+    # Evaluate on the shared job pool; job_panel shows the text as it arrives
+    kept_frames = st.session_state.frame_store.frames()[:MAX_IMAGES]
+    evaluator = st.session_state.window_evaluator if evaluate_live else None
+    meta = dict(metadata)
+    client = shared_openai_client()
+    video_transcript = transcript_context(meta, [f.t for f in kept_frames], REACTION_TRANSCRIPT_TOKENS)
+
+    def evaluation_stream() -> Iterator[str]:
+        window_summaries = evaluator.finish() if evaluator is not None else []
+        if window_summaries:
+            yield from stream_merged_reaction(
+                meta["title"],
+                meta["duration_seconds"],
+                meta.get("description", ""),
+                video_transcript,
+                window_summaries,
+                client=client,
+            )
+        else:
+            yield from stream_reaction(
+                video_title=meta["title"],
+                video_duration_seconds=meta["duration_seconds"],
+                video_description=meta.get("description", ""),
+                video_transcript=video_transcript,
+                image_urls=[f.data_url for f in kept_frames],
+                image_times=[f.t for f in kept_frames],
+                client=client,
+            )
+
+    job = get_job_manager().submit_stream(st.session_state.session_id, "visual_evaluation", evaluation_stream)
+    st.session_state.eval_job_id = job.id
+    st.rerun()
+
+if st.session_state.eval_job_id:
+    st.divider()
+    st.fragment(job_panel, run_every=STATUS_REFRESH_SECONDS)("eval_job_id", "visual_evaluation", "**Visual Evaluation**")
 
 # Display visual evaluation in a nicely formatted way (Component 2)
 if st.session_state.visual_evaluation:
@@ -408,6 +648,7 @@ can_start_interview = video_ready and st.session_state.visual_evaluation is not
 if can_start_interview and not st.session_state.interview_started and not st.session_state.interview_ended:
     if st.button("Start Interview"):
         st.session_state.interview_started = True
+        st.session_state.conversation_memory = ConversationMemory(summarize_interview)
         st.session_state.messages = [
             {
                 "role": "assistant",
@@ -417,8 +658,12 @@ if can_start_interview and not st.session_state.interview_started and not st.ses
         st.rerun()
 
 if st.session_state.interview_started and not st.session_state.interview_ended:
-    system_prompt = build_interview_system_prompt(metadata, st.session_state.visual_evaluation)
-    client = OpenAI()
+    frame_times = [f.t for f in st.session_state.frame_store.frames()]
+    system_prompt = build_interview_system_prompt(metadata, st.session_state.visual_evaluation, frame_times)
+    client = shared_openai_client()
+    if st.session_state.conversation_memory is None:
+        st.session_state.conversation_memory = ConversationMemory(summarize_interview)
+    memory = st.session_state.conversation_memory
 
     for msg in st.session_state.messages:
         with st.chat_message(msg["role"]):
@@ -429,73 +674,61 @@ if st.session_state.interview_started and not st.session_state.interview_ended:
         with st.chat_message("user"):
             st.markdown(prompt)
 
+        # Recent turns verbatim, older ones as a rolling summary
         messages_for_api = [
             {"role": "system", "content": system_prompt},
-        ]
-        for m in st.session_state.messages:
-            if m["role"] in ("user", "assistant"):
-                messages_for_api.append({"role": m["role"], "content": m["content"]})
+        ] + memory.context(st.session_state.messages)
 
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    response = client.chat.completions.create(
-                        model=MODEL,
-                        messages=messages_for_api,
-                    )
-                    reply = response.choices[0].message.content or ""
-                except Exception as e:
-                    reply = f"Error: {e}"
+            try:
+                reply = st.write_stream(
+                    stream_completion(client, model=MODEL, messages=messages_for_api)
+                )
+                reply = reply if isinstance(reply, str) else ""
+            except Exception as e:
+                reply = f"Error: {e}"
                 st.markdown(reply)
         st.session_state.messages.append({"role": "assistant", "content": reply})
         st.rerun()
 
+    if memory.saved_tokens:
+        st.caption(
+            f"Chat history sent: ~{memory.sent_tokens:,} tokens; ~{memory.saved_tokens:,} saved by summarizing earlier turns."
+        )
+
     if st.button("End Chat", key="end_chat", type="primary"):
         st.session_state.interview_ended = True
-        with st.spinner("Generating final synthesis..."):
-            report = run_final_synthesis(
-                metadata,
-                st.session_state.visual_evaluation,
-                st.session_state.messages,
+        # Write the report on the shared job pool; job_panel shows it as it arrives
+        meta = dict(metadata)
+        evaluation = st.session_state.visual_evaluation
+        transcript = list(st.session_state.messages)
+        prompt_file = str(SESSION_DIR / FINAL_PROMPT_FILE)
+
+        def synthesis_stream() -> Iterator[str]:
+            return stream_final_synthesis(
+                meta, evaluation, transcript, memory, client, prompt_file=prompt_file, frame_times=frame_times
             )
-            st.session_state.final_report = report
+
+        job = get_job_manager().submit_stream(st.session_state.session_id, "final_synthesis", synthesis_stream)
+        st.session_state.synthesis_job_id = job.id
         st.rerun()
 
 # --- Component 4: Final synthesis display ---
+if st.session_state.synthesis_job_id:
+    st.divider()
+    st.subheader("4. Final Synthesis Report")
+    st.fragment(job_panel, run_every=STATUS_REFRESH_SECONDS)("synthesis_job_id", "final_report", "**Final Synthesis Report**")
 if st.session_state.final_report:
     st.divider()
     st.subheader("4. Final Synthesis Report")
     with st.expander("**Final Synthesis Report**", expanded=True):
         st.markdown(st.session_state.final_report)
 
-# --- Background capture loop ---
-if run_study and video_ready:
-    if st.session_state.start_time is None:
-        st.session_state.start_time = time.time()
-
-    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-    status_placeholder = st.empty()
-    try:
-        while run_study and st.session_state.img_count < MAX_IMAGES:
-            ret, frame = cap.read()
-            if not ret or frame is None:
-                status_placeholder.error("Could not read from webcam.")
-                log_event("ERROR: Could not read from webcam.")
-                break
-            st.session_state.img_count += 1
-            img_filename = f"screen_shot_{st.session_state.img_count:02d}.png"
-            img_path = os.path.join(IMAGES_DIR, img_filename)
-            ok = cv2.imwrite(img_path, frame)
-            if ok:
-                status_placeholder.success(f"Captured {img_filename}")
-                count_placeholder.write(f"Images captured: **{st.session_state.img_count}** / {MAX_IMAGES}")
-                log_event(f"Saved image: {img_filename}")
-            else:
-                status_placeholder.error(f"Failed to save {img_filename}")
-                break
-            time.sleep(CAPTURE_INTERVAL_SECONDS)
-            if st.session_state.img_count >= MAX_IMAGES:
-                status_placeholder.warning("Max images reached.")
-                break
-    finally:
-        cap.release()
+# --- OpenAI latency (rendered last so it includes this run's calls) ---
+ttfb = latency_tracker().summary()
+if ttfb["count"]:
+    with st.sidebar:
+        st.caption(
+            f"OpenAI time to first byte: median {ttfb['p50_ms']:.0f} ms, p95 {ttfb['p95_ms']:.0f} ms "
+            f"over {ttfb['count']} requests ({'pooled' if SHARED_CLIENT else 'unpooled'} connections)"
+        )
@@ -0,0 +1 @@
+# YouTube Content Reaction Study — capture and analysis helpers used by app.py
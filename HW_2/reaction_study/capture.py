@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+
+from reaction_study.events import log_event
+
+
+@dataclass
+class CapturedFrame:
+    index: int  # 1-based, in capture order
+    t: float  # seconds since recording started (position in the video for file sources)
+    image: np.ndarray  # BGR, as read from the capture
+
+
+def parse_camera_source(value: str | int | None) -> int | str:
+    """Webcam index for a number ("0"), otherwise the path of a video file to read instead."""
+    if value is None or str(value).strip() == "":
+        return 0
+    value = str(value).strip()
+    return int(value) if value.isdigit() else value
+
+
+def open_capture(source: int | str) -> Any:
+    if isinstance(source, int):
+        backend = cv2.CAP_DSHOW if os.name == "nt" else cv2.CAP_ANY
+        return cv2.VideoCapture(source, backend)
+    return cv2.VideoCapture(source)
+
+
+class FrameRing:
+    """The most recent captured frames (bounded); readers ask for what they have not seen yet."""
+
+    def __init__(self, maxlen: int):
+        self._frames: deque[CapturedFrame] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def push(self, frame: CapturedFrame) -> None:
+        with self._lock:
+            self._frames.append(frame)
+            self.total = frame.index
+
+    def since(self, index: int) -> list[CapturedFrame]:
+        """Buffered frames with an index above `index`, oldest first."""
+        with self._lock:
+            return [f for f in self._frames if f.index > index]
+
+    def latest(self) -> CapturedFrame | None:
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+
+class FrameCaptureWorker:
+    """
+    Samples a frame every `interval_s` on a background thread that owns the
+    capture handle, until `max_frames` are taken, the source ends or stop() is
+    called. Frames go into `ring`; the Streamlit script only reads from it, so
+    reruns never block on the camera.
+
+    Between samples the thread keeps grabbing (without decoding), so each sample
+    is the current camera frame rather than one left in the driver's buffer.
+    A video file can stand in for the webcam: its own timestamps drive the
+    schedule, played back in real time when `pace` is set. `on_frame` is called
+    with each sampled frame on the capture thread (e.g. to encode and store it).
+    `t_offset` is added to frame times, so a resumed recording continues the timeline.
+    """
+
+    def __init__(
+        self,
+        source: int | str,
+        interval_s: float,
+        max_frames: int,
+        ring_size: int | None = None,
+        opener: Callable[[int | str], Any] = open_capture,
+        pace: bool = True,
+        on_frame: Callable[[CapturedFrame], Any] | None = None,
+        t_offset: float = 0.0,
+    ):
+        self.source = source
+        self.interval_s = interval_s
+        self.max_frames = max_frames
+        self.ring = FrameRing(ring_size or max_frames)
+        self._opener = opener
+        self.pace = pace
+        self.on_frame = on_frame
+        self.t_offset = t_offset
+        self.status = "idle"
+        self.error: str | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def is_file(self) -> bool:
+        return not isinstance(self.source, int)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def count(self) -> int:
+        return self.ring.total
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self.status = "running"
+        self._thread = threading.Thread(target=self._run, name="frame-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _fail(self, message: str) -> None:
+        self.status = "error"
+        self.error = message
+        log_event(f"ERROR: {message}")
+
+    def _run(self) -> None:
+        cap = self._opener(self.source)
+        try:
+            if not cap.isOpened():
+                self._fail(f"Could not open capture source {self.source!r}.")
+                return
+            log_event(f"Capture started from {self.source!r} (every {self.interval_s}s, max {self.max_frames}).")
+            started = time.monotonic()
+            next_t = 0.0
+            while not self._stop.is_set() and self.ring.total < self.max_frames:
+                if not cap.grab():
+                    if self.is_file:
+                        break
+                    self._fail("Could not read from webcam.")
+                    return
+                if self.is_file:
+                    t = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                else:
+                    t = time.monotonic() - started
+                if t < next_t:
+                    continue
+                if self.is_file and self.pace and self._stop.wait(max(0.0, started + t - time.monotonic())):
+                    break
+                ok, frame = cap.retrieve()
+                if not ok or frame is None:
+                    self._fail("Could not decode frame from capture source.")
+                    return
+                captured = CapturedFrame(self.ring.total + 1, round(self.t_offset + t, 3), frame)
+                self.ring.push(captured)
+                if self.on_frame is not None:
+                    self.on_frame(captured)
+                # Stay on the original grid; if we fell behind, skip the missed slots.
+                while next_t <= t:
+                    next_t += self.interval_s
+            self.status = "stopped" if self._stop.is_set() else "done"
+            log_event(f"Capture {self.status} after {self.ring.total} frame(s).")
+        except Exception as e:
+            self._fail(f"Capture failed: {e}")
+        finally:
+            cap.release()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+from typing import Callable
+
+from reaction_study.events import log_event
+
+# Recent user/assistant exchanges sent verbatim on every interview call
+KEEP_TURNS = int(os.getenv("INTERVIEW_KEEP_TURNS", "4"))
+# Tokens allowed for the chat history (summary + recent turns) in one interview call
+HISTORY_BUDGET_TOKENS = int(os.getenv("INTERVIEW_HISTORY_TOKENS", "2000"))
+# ~4 characters per token for English text; good enough for budgeting
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+Summarizer = Callable[[str, list[dict]], str]
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def messages_tokens(messages: list[dict]) -> int:
+    return sum(estimate_tokens(str(m.get("content", ""))) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def fit_text(text: str, max_tokens: int) -> str:
+    """`text` cut to about `max_tokens` tokens (marked with an ellipsis when cut)."""
+    limit = max_tokens * CHARS_PER_TOKEN
+    return text if len(text) <= limit else text[:limit].rstrip() + "..."
+
+
+def chat_lines(messages: list[dict]) -> str:
+    lines = []
+    for m in messages:
+        content = m.get("content", "")
+        lines.append(f"{m.get('role', 'unknown').upper()}: {content if isinstance(content, str) else '[non-text content]'}")
+    return "\n\n".join(lines)
+
+
+def _chat_messages(messages: list[dict]) -> list[dict]:
+    return [{"role": m["role"], "content": m["content"]} for m in messages if m.get("role") in ("user", "assistant")]
+
+
+class ConversationMemory:
+    """
+    Interview history for the chat calls: the last `keep_turns` exchanges
+    verbatim, everything older folded into a rolling summary. Messages are folded
+    incrementally (`summarize(previous_summary, new_messages)` sees only the
+    messages leaving the verbatim window), and more are folded early when the
+    history would exceed `budget_tokens`. `saved_tokens` counts the history
+    tokens not sent compared with replaying the full conversation every time.
+    """
+
+    def __init__(
+        self,
+        summarize: Summarizer,
+        keep_turns: int = KEEP_TURNS,
+        budget_tokens: int = HISTORY_BUDGET_TOKENS,
+    ):
+        self.summarize = summarize
+        self.keep_turns = keep_turns
+        self.budget_tokens = budget_tokens
+        self.summary = ""
+        self.summarized = 0  # messages[:summarized] are covered by the summary
+        self.saved_tokens = 0
+        self.sent_tokens = 0
+
+    def _summary_message(self) -> list[dict]:
+        if not self.summary:
+            return []
+        return [{"role": "system", "content": f"Summary of the earlier part of the interview:\n{self.summary}"}]
+
+    def update(self, messages: list[dict]) -> None:
+        """Fold messages that left the verbatim window (or do not fit the budget) into the summary."""
+        fold_to = max(self.summarized, len(messages) - 2 * self.keep_turns)
+        # Always keep the latest message verbatim.
+        while fold_to < len(messages) - 1 and (
+            messages_tokens(messages[fold_to:]) + estimate_tokens(self.summary) > self.budget_tokens
+        ):
+            fold_to += 1
+        if fold_to <= self.summarized:
+            return
+        folding = _chat_messages(messages[self.summarized:fold_to])
+        try:
+            self.summary = self.summarize(self.summary, folding).strip()
+        except Exception as e:
+            # Keep going without the model: a clipped transcript of the folded messages.
+            log_event(f"Conversation summary error: {e}")
+            self.summary = fit_text(
+                (self.summary + "\n\n" + chat_lines(folding)).strip(), self.budget_tokens // 2
+            )
+        self.summarized = fold_to
+
+    def context(self, messages: list[dict]) -> list[dict]:
+        """Chat history to send with the next interview call (after any system prompt)."""
+        self.update(messages)
+        out = self._summary_message() + _chat_messages(messages[self.summarized:])
+        sent = messages_tokens(out)
+        self.sent_tokens += sent
+        self.saved_tokens += max(0, messages_tokens(_chat_messages(messages)) - sent)
+        return out
+
+    def transcript(self, messages: list[dict], max_tokens: int) -> str:
+        """
+        Interview text for the final synthesis: the full chat if it fits in
+        `max_tokens`, otherwise the rolling summary followed by as many of the
+        latest messages as fit.
+        """
+        full = chat_lines(messages)
+        if estimate_tokens(full) <= max_tokens:
+            return full
+        self.update(messages)
+        recent = messages[self.summarized:]
+        summary = f"SUMMARY OF EARLIER INTERVIEW: {self.summary}" if self.summary else ""
+        budget = max_tokens - estimate_tokens(summary)
+        while len(recent) > 1 and estimate_tokens(chat_lines(recent)) > budget:
+            recent = recent[1:]
+        text = "\n\n".join(part for part in (summary, fit_text(chat_lines(recent), max(budget, 1))) if part)
+        self.saved_tokens += max(0, estimate_tokens(full) - estimate_tokens(text))
+        return text
@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+
+def log_event(message: str) -> None:
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{ts}] {message}", flush=True)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import heapq
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from reaction_study.capture import CapturedFrame
+from reaction_study.frame_store import FrameStore
+
+THUMB_SIZE = (64, 48)
+HIST_BINS = 32
+# Score given to the first frame, so the baseline expression is always kept.
+FIRST_FRAME_SCORE = 2.0
+# With face detection on, frames where no face is found count this much less.
+NO_FACE_WEIGHT = 0.25
+FACE_DETECTION = os.getenv("FRAME_FACE_DETECTION", "0") == "1"
+FACE_DETECT_WIDTH = 320
+
+
+def thumbnail(image: np.ndarray) -> np.ndarray:
+    """Small grayscale copy used for scoring (float32, THUMB_SIZE)."""
+    small = cv2.resize(image, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return small.astype(np.float32)
+
+
+def change_score(prev: np.ndarray, cur: np.ndarray) -> float:
+    """
+    How different two thumbnails are, in [0, 2]: mean absolute pixel difference
+    (movement, expression changes) plus the total-variation distance between
+    their brightness histograms (lighting and scene changes).
+    """
+    diff = float(np.abs(cur - prev).mean()) / 255.0
+    h_prev = np.histogram(prev, bins=HIST_BINS, range=(0, 256))[0].astype(np.float64)
+    h_cur = np.histogram(cur, bins=HIST_BINS, range=(0, 256))[0].astype(np.float64)
+    hist = 0.5 * float(np.abs(h_prev / h_prev.sum() - h_cur / h_cur.sum()).sum())
+    return diff + hist
+
+
+class FaceDetector:
+    """OpenCV's frontal-face Haar cascade, run on a downscaled grayscale frame."""
+
+    def __init__(self, width: int = FACE_DETECT_WIDTH):
+        self.width = width
+        self._cascade = cv2.CascadeClassifier(
+            os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+        )
+
+    def has_face(self, image: np.ndarray) -> bool:
+        h, w = image.shape[:2]
+        if w > self.width:
+            image = cv2.resize(image, (self.width, max(1, round(h * self.width / w))), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        return len(self._cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=4)) > 0
+
+
+class FrameSelector:
+    """
+    Keeps the `max_frames` most informative of the frames offered to it. Each
+    frame is scored against the previous one (change_score on thumbnails,
+    optionally down-weighted when no face is visible); only frames that make the
+    current top N are encoded into `store`, and a frame pushed out of the top N
+    is removed from it. The kept frames stay in chronological order in the store.
+    """
+
+    def __init__(self, store: FrameStore, max_frames: int, detect_faces: bool = FACE_DETECTION):
+        self.store = store
+        self.max_frames = max_frames
+        self.face_detector = FaceDetector() if detect_faces else None
+        self.offered = 0
+        self._prev: np.ndarray | None = None
+        self._heap: list[tuple[float, int]] = []  # (score, store index), lowest score first
+        self._lock = threading.Lock()
+
+    def score(self, frame: CapturedFrame) -> float:
+        thumb = thumbnail(frame.image)
+        score = FIRST_FRAME_SCORE if self._prev is None else change_score(self._prev, thumb)
+        self._prev = thumb
+        if self.face_detector is not None and not self.face_detector.has_face(frame.image):
+            score *= NO_FACE_WEIGHT
+        return score
+
+    def offer(self, frame: CapturedFrame) -> bool:
+        """Score `frame` and keep it if it ranks in the top N; returns whether it was kept."""
+        with self._lock:
+            self.offered += 1
+            score = self.score(frame)
+            if len(self._heap) >= self.max_frames and score <= self._heap[0][0]:
+                return False
+            stored = self.store.add(frame)
+            if len(self._heap) >= self.max_frames:
+                _, dropped = heapq.heapreplace(self._heap, (score, stored.index))
+                self.store.remove(dropped)
+            else:
+                heapq.heappush(self._heap, (score, stored.index))
+            return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self.offered = 0
+            self._prev = None
+            self._heap.clear()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import base64
+import glob
+import os
+import threading
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+from reaction_study.capture import CapturedFrame
+from reaction_study.events import log_event
+
+# Longest side sent to the vision model; larger frames only add upload size.
+FRAME_MAX_SIDE = int(os.getenv("FRAME_MAX_SIDE", "512"))
+FRAME_JPEG_QUALITY = int(os.getenv("FRAME_JPEG_QUALITY", "80"))
+
+
+def encode_jpeg(
+    image: np.ndarray, max_side: int = FRAME_MAX_SIDE, quality: int = FRAME_JPEG_QUALITY
+) -> tuple[bytes, tuple[int, int]]:
+    """JPEG bytes of `image` downscaled to at most `max_side` pixels, and the encoded (width, height)."""
+    h, w = image.shape[:2]
+    scale = max_side / max(h, w)
+    if scale < 1:
+        w, h = max(1, round(w * scale)), max(1, round(h * scale))
+        image = cv2.resize(image, (w, h), interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return buf.tobytes(), (w, h)
+
+
+@dataclass
+class StoredFrame:
+    index: int
+    t: float
+    jpeg: bytes
+    size: tuple[int, int]
+    data_url: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.data_url = "data:image/jpeg;base64," + base64.b64encode(self.jpeg).decode("ascii")
+
+
+class FrameStore:
+    """
+    Captured frames kept in memory, downscaled and JPEG-encoded once when added
+    (on the capture thread), with their data URLs ready for the vision request.
+    With `persist_dir`, each JPEG is also written there for the study record.
+    """
+
+    def __init__(
+        self,
+        persist_dir: str | None = None,
+        max_side: int = FRAME_MAX_SIDE,
+        quality: int = FRAME_JPEG_QUALITY,
+    ):
+        self.persist_dir = persist_dir
+        self.max_side = max_side
+        self.quality = quality
+        self._frames: list[StoredFrame] = []
+        self._next_index = 1
+        self._lock = threading.Lock()
+
+    def _path(self, index: int) -> str:
+        return os.path.join(self.persist_dir, f"screen_shot_{index:04d}.jpg")
+
+    def add(self, frame: CapturedFrame) -> StoredFrame:
+        jpeg, size = encode_jpeg(frame.image, self.max_side, self.quality)
+        with self._lock:
+            stored = StoredFrame(self._next_index, frame.t, jpeg, size)
+            self._next_index += 1
+            self._frames.append(stored)
+        if self.persist_dir:
+            try:
+                with open(self._path(stored.index), "wb") as f:
+                    f.write(jpeg)
+            except OSError as e:
+                log_event(f"ERROR: Failed to save frame {stored.index}: {e}")
+        log_event(f"Stored frame {stored.index} (t={frame.t:.1f}s, {size[0]}x{size[1]}, {len(jpeg) // 1024} KB).")
+        return stored
+
+    def remove(self, index: int) -> None:
+        with self._lock:
+            self._frames = [f for f in self._frames if f.index != index]
+        if self.persist_dir:
+            try:
+                os.remove(self._path(index))
+            except OSError:
+                pass
+
+    def frames(self) -> list[StoredFrame]:
+        with self._lock:
+            return list(self._frames)
+
+    def data_urls(self, limit: int | None = None) -> list[str]:
+        return [f.data_url for f in self.frames()[:limit]]
+
+    def total_bytes(self) -> int:
+        return sum(len(f.jpeg) for f in self.frames())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self._next_index = 1
+        if self.persist_dir:
+            for path in glob.glob(os.path.join(self.persist_dir, "screen_shot_*.jpg")):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,161 @@
+# The same file is HW_1/tweet_engine/openai_client.py and HW_2/reaction_study/openai_client.py:
+# each homework is submitted and run on its own, so neither can import the other's.
+# Edit the HW_1 copy and copy it over unchanged.
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Awaitable, Callable
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY_S = 120.0
+CONNECT_TIMEOUT_S = 10.0
+# Long enough for a full (streamed) model answer
+READ_TIMEOUT_S = 120.0
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+# Set OPENAI_SHARED_CLIENT=0 to open a new connection per request (to compare TTFB against the pool)
+SHARED_CLIENT = os.getenv("OPENAI_SHARED_CLIENT", "1") != "0"
+
+
+class LatencyTracker:
+    """Time to first byte (request sent -> response headers) of recent API requests."""
+
+    def __init__(self, maxlen: int = 500):
+        self._samples: deque[float] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def on_request(self, request: httpx.Request) -> None:
+        request.extensions["ttfb_started"] = time.perf_counter()
+
+    def on_response(self, response: httpx.Response) -> None:
+        started = response.request.extensions.get("ttfb_started")
+        if started is not None:
+            with self._lock:
+                self._samples.append(time.perf_counter() - started)
+
+    async def on_request_async(self, request: httpx.Request) -> None:
+        self.on_request(request)
+
+    async def on_response_async(self, response: httpx.Response) -> None:
+        self.on_response(response)
+
+    def summary(self) -> dict[str, float]:
+        """Request count and median / 95th percentile TTFB in milliseconds."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0}
+        return {
+            "count": len(samples),
+            "p50_ms": statistics.median(samples) * 1000,
+            "p95_ms": samples[min(len(samples) - 1, int(0.95 * len(samples)))] * 1000,
+        }
+
+
+def make_openai_client(
+    api_key: str | None = None,
+    tracker: LatencyTracker | None = None,
+    max_connections: int = MAX_CONNECTIONS,
+    max_retries: int = MAX_RETRIES,
+    keepalive: bool = True,
+) -> OpenAI:
+    """
+    OpenAI client over a pooled keep-alive HTTP client (thread-safe; share one per
+    process so requests reuse connections instead of a new TLS handshake each).
+    With `keepalive=False` every request opens its own connection, closed once the
+    response is read, so nothing is left open between requests.
+    Retries with backoff on connection errors, 429 and 5xx come from the SDK.
+    """
+    hooks = {"request": [tracker.on_request], "response": [tracker.on_response]} if tracker else {}
+    http_client = httpx.Client(event_hooks=hooks, **_http_settings(max_connections, keepalive))
+    return OpenAI(api_key=api_key, http_client=http_client, max_retries=max_retries)
+
+
+def make_async_openai_client(
+    api_key: str | None = None,
+    tracker: LatencyTracker | None = None,
+    max_connections: int = MAX_CONNECTIONS,
+    max_retries: int = MAX_RETRIES,
+    keepalive: bool = True,
+) -> AsyncOpenAI:
+    """AsyncOpenAI with the same pool, timeouts, retries and TTFB hooks as make_openai_client."""
+    hooks = (
+        {"request": [tracker.on_request_async], "response": [tracker.on_response_async]} if tracker else {}
+    )
+    http_client = httpx.AsyncClient(event_hooks=hooks, **_http_settings(max_connections, keepalive))
+    return AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=max_retries)
+
+
+def _http_settings(max_connections: int, keepalive: bool) -> dict:
+    return {
+        "timeout": httpx.Timeout(READ_TIMEOUT_S, connect=CONNECT_TIMEOUT_S),
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections if keepalive else 0,
+            keepalive_expiry=KEEPALIVE_EXPIRY_S,
+        ),
+        "follow_redirects": True,
+    }
+
+
+class AsyncClientRunner:
+    """
+    An AsyncOpenAI client living on its own event-loop thread. Async connections
+    belong to the loop that opened them, and asyncio.run() makes a new loop per
+    call, so a client shared across batches needs one long-lived loop to keep its
+    pool. Coroutines are submitted from any thread with `submit`.
+    """
+
+    def __init__(self, make_client: Callable[[], AsyncOpenAI]):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="openai-async", daemon=True)
+        self._thread.start()
+        self.client = make_client()
+
+    def submit(self, coro: Awaitable) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+
+# One tracker, and one client per API key, for the whole process (all sessions and reruns)
+_TRACKER = LatencyTracker()
+_clients: dict[tuple[str, str | None], object] = {}
+_clients_lock = threading.Lock()
+
+
+def latency_tracker() -> LatencyTracker:
+    """Time-to-first-byte samples of all OpenAI requests made by this process."""
+    return _TRACKER
+
+
+def _process_wide(kind: str, api_key: str | None, make: Callable[[], object]):
+    with _clients_lock:
+        if (kind, api_key) not in _clients:
+            _clients[kind, api_key] = make()
+        return _clients[kind, api_key]
+
+
+def shared_openai_client(api_key: str | None = None) -> OpenAI:
+    """
+    The process-wide client for `api_key`: pooled keep-alive connections, or a
+    new connection per request with OPENAI_SHARED_CLIENT=0 (for TTFB comparison).
+    """
+    return _process_wide(
+        "sync", api_key, lambda: make_openai_client(api_key, _TRACKER, keepalive=SHARED_CLIENT)
+    )
+
+
+def shared_async_runner(api_key: str | None = None) -> AsyncClientRunner:
+    """The process-wide async client for `api_key`, on its own event loop (same connection settings)."""
+    return _process_wide(
+        "async",
+        api_key,
+        lambda: AsyncClientRunner(lambda: make_async_openai_client(api_key, _TRACKER, keepalive=SHARED_CLIENT)),
+    )
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import os
+import string
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from reaction_study.events import log_event
+
+_FORMATTER = string.Formatter()
+# One writer thread, so prompt files are written in the order they were requested
+_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prompt-writer")
+
+
+class TemplateError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    text: str
+    fields: frozenset[str]
+    source: str
+
+    @classmethod
+    def compile(cls, text: str, source: str, allowed: Iterable[str] | None = None) -> "PromptTemplate":
+        """
+        Parse `text` once and record its placeholders. Raises TemplateError for
+        malformed braces, positional or nested fields, and (when `allowed` is
+        given) placeholders the caller cannot fill.
+        """
+        try:
+            parsed = list(_FORMATTER.parse(text))
+        except ValueError as e:
+            raise TemplateError(f"{source}: {e}") from None
+        fields = set()
+        for _, field, spec, _ in parsed:
+            if field is None:
+                continue
+            name = field.split(".", 1)[0].split("[", 1)[0]
+            if not name or name.isdigit():
+                raise TemplateError(f"{source}: positional placeholder '{{{field}}}' is not supported")
+            if spec and "{" in spec:
+                raise TemplateError(f"{source}: nested placeholder in '{{{field}:{spec}}}'")
+            fields.add(name)
+        if allowed is not None:
+            unknown = fields - set(allowed)
+            if unknown:
+                raise TemplateError(f"{source}: unknown placeholder(s) {', '.join(sorted(unknown))}")
+        return cls(text, frozenset(fields), source)
+
+    def render(self, **values) -> str:
+        """The template with its placeholders filled; values it does not use are ignored, missing ones are empty."""
+        return self.text.format_map({name: values.get(name, "") for name in self.fields})
+
+
+class TemplateStore:
+    """
+    Compiled prompt templates keyed by file path, reloaded only when the file's
+    mtime or size changes (so edits apply without a restart). A missing, empty
+    or invalid file falls back to the last good version, or to the default.
+    """
+
+    def __init__(self):
+        self._cache: dict[tuple[str, str], tuple[tuple[int, int] | None, PromptTemplate]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str, default: str, allowed: Iterable[str] | None = None) -> PromptTemplate:
+        allowed = frozenset(allowed) if allowed is not None else None
+        key = (os.path.abspath(path), default)
+        try:
+            st = os.stat(path)
+            version = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            version = None
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        template = self._load(path, version, default, allowed, cached[1] if cached else None)
+        with self._lock:
+            self._cache[key] = (version, template)
+        return template
+
+    def _load(
+        self,
+        path: str,
+        version: tuple[int, int] | None,
+        default: str,
+        allowed: frozenset[str] | None,
+        previous: PromptTemplate | None,
+    ) -> PromptTemplate:
+        fallback = previous or PromptTemplate.compile(default, "<default>", allowed)
+        if version is None:
+            log_event(f"Prompt file '{path}' not found. Using {'last loaded' if previous else 'default'} template.")
+            return fallback
+        try:
+            text = Path(path).read_text(encoding="utf-8").strip()
+        except Exception as e:
+            log_event(f"Error reading '{path}': {e}. Using {'last loaded' if previous else 'default'} template.")
+            return fallback
+        if not text:
+            return fallback
+        try:
+            template = PromptTemplate.compile(text, path, allowed)
+        except TemplateError as e:
+            log_event(f"Invalid prompt template {e}. Using {'last loaded' if previous else 'default'} template.")
+            return fallback
+        log_event(f"Loaded prompt template '{path}' (placeholders: {', '.join(sorted(template.fields)) or 'none'}).")
+        return template
+
+
+def _write(path: str, text: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        log_event(f"Wrote prompt to {path}.")
+    except Exception as e:
+        log_event(f"Failed to write {path}: {e}")
+
+
+def write_prompt_file(path: str, text: str) -> Future:
+    """Write `text` to `path` on the background writer thread (atomically, via a temp file)."""
+    return _WRITER.submit(_write, path, text)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+from reaction_study.events import log_event
+
+SESSIONS_DIR = Path(__file__).resolve().parent.parent / "sessions"
+# Session folders untouched for this long are removed at startup
+SESSION_MAX_AGE_S = float(os.getenv("SESSION_MAX_AGE_HOURS", "48")) * 3600
+# Evaluations and syntheses running at once across all participants (the rest queue)
+JOB_WORKERS = int(os.getenv("STUDY_JOB_WORKERS", "8"))
+JOB_MAX_AGE_S = 3600
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def session_dir(session_id: str, root: Path = SESSIONS_DIR) -> Path:
+    """Folder for one participant's files (frames under images/, final_prompt.txt)."""
+    path = root / session_id
+    (path / "images").mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cleanup_sessions(max_age_s: float = SESSION_MAX_AGE_S, root: Path = SESSIONS_DIR) -> int:
+    """Delete session folders not modified for `max_age_s`; returns how many were removed."""
+    if not root.is_dir():
+        return 0
+    cutoff = time.time() - max_age_s
+    removed = 0
+    for path in root.iterdir():
+        if path.is_dir() and path.stat().st_mtime < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    if removed:
+        log_event(f"Removed {removed} expired session folder(s).")
+    return removed
+
+
+@dataclass
+class Job:
+    id: str
+    session_id: str
+    kind: str
+    status: str = "queued"  # queued -> running -> done | error
+    text: str = ""  # output so far (streamed jobs fill it as chunks arrive)
+    error: str | None = None
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "error")
+
+
+class JobManager:
+    """
+    Runs study jobs (visual evaluation, final synthesis) for all sessions on one
+    shared thread pool, so a participant's page never blocks on a model call and
+    the number of calls in flight stays bounded however many participants there
+    are. Sessions keep only the job ID and poll the job's progress.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="study-job")
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit_stream(self, session_id: str, kind: str, make_stream: Callable[[], Iterator[str]]) -> Job:
+        """Queue a job whose output is the text chunks yielded by `make_stream()`."""
+        job = Job(uuid.uuid4().hex, session_id, kind)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, make_stream)
+        return job
+
+    def _run(self, job: Job, make_stream: Callable[[], Iterator[str]]) -> None:
+        job.status = "running"
+        job.started = time.time()
+        try:
+            for chunk in make_stream():
+                job.text += chunk
+            job.status = "done"
+        except Exception as e:
+            log_event(f"Job {job.kind} for session {job.session_id} failed: {e}")
+            job.error = str(e)
+            job.status = "error"
+        job.finished = time.time()
+        log_event(
+            f"Job {job.kind} for session {job.session_id} {job.status} "
+            f"(queued {job.started - job.submitted:.1f}s, ran {job.finished - job.started:.1f}s)."
+        )
+
+    def get(self, job_id: str | None) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id) if job_id else None
+
+    def queued(self) -> int:
+        with self._lock:
+            return sum(job.status == "queued" for job in self._jobs.values())
+
+    def _prune(self) -> None:
+        cutoff = time.time() - JOB_MAX_AGE_S
+        for job_id in [j.id for j in self._jobs.values() if j.done and (j.finished or 0) < cutoff]:
+            del self._jobs[job_id]
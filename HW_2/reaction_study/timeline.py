@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import numpy as np
+
+# Transcript sent around each frame: reactions lag the content that caused them,
+# so look further back than ahead.
+SNIPPET_BEFORE_S = 12.0
+SNIPPET_AFTER_S = 3.0
+SNIPPET_MAX_CHARS = 400
+
+
+class TranscriptTimeline:
+    """
+    Timed transcript segments ({"start", "duration", "text"}, as returned by
+    youtube-transcript-api) indexed by time. Frames are aligned to segments with
+    binary searches over the sorted start times and running maximum end times,
+    vectorized over all frame times at once.
+    """
+
+    def __init__(self, segments: list[dict]):
+        segments = sorted(
+            (s for s in segments if str(s.get("text", "")).strip()), key=lambda s: float(s.get("start", 0))
+        )
+        self.texts = [" ".join(str(s["text"]).split()) for s in segments]
+        self.starts = np.array([float(s.get("start", 0)) for s in segments], dtype=np.float64)
+        durations = np.array([float(s.get("duration", 0)) for s in segments], dtype=np.float64)
+        self.ends = self.starts + np.maximum(durations, 0)
+        # Segments can overlap; the running maximum keeps the end times searchable.
+        self._max_ends = np.maximum.accumulate(self.ends) if len(segments) else self.ends
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def align(self, times) -> np.ndarray:
+        """Index of the segment playing (or last started) at each time; -1 before the first one."""
+        return np.searchsorted(self.starts, np.asarray(times, dtype=np.float64), side="right") - 1
+
+    def spans(self, times, before_s: float = SNIPPET_BEFORE_S, after_s: float = SNIPPET_AFTER_S) -> np.ndarray:
+        """
+        [lo, hi) segment index ranges overlapping [t - before_s, t + after_s] for
+        each time, as an (n, 2) array.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        lo = np.searchsorted(self._max_ends, times - before_s, side="right")
+        hi = np.searchsorted(self.starts, times + after_s, side="right")
+        return np.stack([lo, np.maximum(hi, lo)], axis=-1)
+
+    def text(self, lo: int, hi: int, max_chars: int = SNIPPET_MAX_CHARS) -> str:
+        text = " ".join(self.texts[lo:hi])
+        return text if len(text) <= max_chars else "..." + text[-max_chars:].lstrip()
+
+    def snippets(
+        self,
+        times,
+        before_s: float = SNIPPET_BEFORE_S,
+        after_s: float = SNIPPET_AFTER_S,
+        max_chars: int = SNIPPET_MAX_CHARS,
+    ) -> str:
+        """
+        Transcript around each time, one "[12s] ..." line per distinct snippet
+        (frames that share a snippet are listed together), or "" when none of the
+        times fall near a segment.
+        """
+        times = list(times)
+        if not times or not len(self):
+            return ""
+        lines: list[tuple[list[float], tuple[int, int]]] = []
+        for t, (lo, hi) in zip(times, self.spans(times, before_s, after_s).tolist()):
+            if lo >= hi:
+                continue
+            if lines and lines[-1][1] == (lo, hi):
+                lines[-1][0].append(t)
+            else:
+                lines.append(([t], (lo, hi)))
+        return "\n".join(
+            f"[{', '.join(f'{t:.0f}s' for t in ts)}] {self.text(lo, hi, max_chars)}" for ts, (lo, hi) in lines
+        )
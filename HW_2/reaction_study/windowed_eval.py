@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+from reaction_study.events import log_event
+from reaction_study.frame_store import FrameStore, StoredFrame
+
+WINDOW_SECONDS = 60
+WINDOW_WORKERS = 2
+
+
+@dataclass
+class WindowSummary:
+    index: int
+    start: float
+    end: float
+    n_frames: int
+    text: str
+    error: str | None = None
+    latency_s: float = 0.0
+
+
+class WindowedEvaluator:
+    """
+    Evaluates the recording in fixed time windows while it is still running.
+    observe(t) is called with each new frame time (on the capture thread); every
+    window that has ended by then is summarized in the background from the
+    frames the store holds for it, using `summarize(frames, start, end)`.
+    finish() closes the last, partial window and waits for all summaries, so
+    after recording only the cheap merge of the summaries remains. close() drops
+    pending summaries and shuts the worker threads down.
+    """
+
+    def __init__(
+        self,
+        store: FrameStore,
+        summarize: Callable[[list[StoredFrame], float, float], str],
+        window_s: float = WINDOW_SECONDS,
+        max_workers: int = WINDOW_WORKERS,
+    ):
+        self.store = store
+        self.summarize = summarize
+        self.window_s = window_s
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="window-eval")
+        self._futures: dict[int, Future] = {}
+        self._closed = 0  # windows [0, _closed) have been submitted (or skipped as empty)
+        self._lock = threading.Lock()
+        self._shut = False
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return sum(not f.done() for f in self._futures.values())
+
+    @property
+    def submitted(self) -> int:
+        with self._lock:
+            return len(self._futures)
+
+    def _run(self, index: int, frames: list[StoredFrame]) -> WindowSummary:
+        start, end = index * self.window_s, (index + 1) * self.window_s
+        started = time.perf_counter()
+        try:
+            text = self.summarize(frames, start, end)
+            error = None
+        except Exception as e:
+            log_event(f"Window {index} evaluation error: {e}")
+            text, error = "", str(e)
+        latency = time.perf_counter() - started
+        log_event(f"Window {index} ({start:.0f}-{end:.0f}s, {len(frames)} image(s)) evaluated in {latency:.1f}s.")
+        return WindowSummary(index, start, end, len(frames), text, error, latency)
+
+    def _close_until(self, n_windows: int) -> None:
+        with self._lock:
+            if self._shut or n_windows <= self._closed:
+                return
+            frames = self.store.frames()
+            for index in range(self._closed, n_windows):
+                start, end = index * self.window_s, (index + 1) * self.window_s
+                in_window = [f for f in frames if start <= f.t < end]
+                if in_window:
+                    self._futures[index] = self._pool.submit(self._run, index, in_window)
+            self._closed = n_windows
+
+    def observe(self, t: float) -> None:
+        """Start summaries for every window that ended at or before `t`."""
+        self._close_until(int(t // self.window_s))
+
+    def finish(self, timeout: float | None = None) -> list[WindowSummary]:
+        """Summarize the remaining windows and return all summaries that succeeded, in time order."""
+        frames = self.store.frames()
+        if frames:
+            self._close_until(math.floor(max(f.t for f in frames) / self.window_s) + 1)
+        with self._lock:
+            futures = [self._futures[i] for i in sorted(self._futures)]
+        results = [f.result(timeout) for f in futures if not f.cancelled()]
+        return [r for r in results if r.error is None and r.text]
+
+    def reset(self) -> None:
+        """Cancel summaries that have not started and start again from window 0."""
+        with self._lock:
+            for f in self._futures.values():
+                f.cancel()
+            self._futures.clear()
+            self._closed = 0
+
+    def close(self) -> None:
+        """Cancel summaries that have not started and shut the worker threads down (without waiting)."""
+        with self._lock:
+            self._shut = True
+            for f in self._futures.values():
+                f.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from reaction_study.events import log_event
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "youtube"
+CACHE_TTL_S = float(os.getenv("YOUTUBE_CACHE_TTL_HOURS", "24")) * 3600
+NO_TRANSCRIPT = "No transcript available."
+PREFETCH_WORKERS = 4
+
+MetadataFetcher = Callable[[str], "dict | None"]
+TranscriptFetcher = Callable[[str], "list[dict] | None"]
+
+
+# --- VIDEO ID & METADATA ---
+def extract_video_id(url: str) -> str | None:
+    if not url or not url.strip():
+        return None
+    url = url.strip()
+    # https://www.youtube.com/watch?v=VIDEO_ID
+    m = re.search(r"(?:youtube\.com/watch\?v=)([a-zA-Z0-9_-]{11})", url)
+    if m:
+        return m.group(1)
+    # https://youtu.be/VIDEO_ID
+    m = re.search(r"youtu\.be/([a-zA-Z0-9_-]{11})", url)
+    if m:
+        return m.group(1)
+    return None
+
+
+def fetch_youtube_metadata(url: str) -> dict | None:
+    """Fetch title, duration, description via yt-dlp. Returns dict or None on error."""
+    try:
+        import yt_dlp
+        video_id = extract_video_id(url)
+        if not video_id:
+            return None
+        full_url = f"https://www.youtube.com/watch?v={video_id}"
+        ydl_opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "extract_flat": False,
+            "skip_download": True,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(full_url, download=False)
+        if not info:
+            return None
+        duration = info.get("duration")
+        if duration is None:
+            duration = 0
+        else:
+            duration = int(duration)
+        iframe_html = (
+            f'<iframe width="560" height="315" '
+            f'src="https://www.youtube.com/embed/{video_id}" '
+            f'title="YouTube video player" frameborder="0" '
+            f'allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture; web-share" '
+            f'referrerpolicy="strict-origin-when-cross-origin" allowfullscreen></iframe>'
+        )
+        return {
+            "video_id": video_id,
+            "title": info.get("title") or "Untitled",
+            "duration_seconds": duration,
+            "description": info.get("description") or "",
+            "iframe": iframe_html,
+        }
+    except Exception as e:
+        log_event(f"yt-dlp error: {e}")
+        return None
+
+
+def fetch_transcript(video_id: str) -> list[dict] | None:
+    """
+    Fetch timed transcript segments ({"start", "duration", "text"}) for video_id.
+    [] when the video has no transcript, None on any other error.
+    """
+    try:
+        from youtube_transcript_api import (
+            NoTranscriptFound,
+            TranscriptsDisabled,
+            VideoUnavailable,
+            YouTubeTranscriptApi,
+        )
+    except ImportError as e:
+        log_event(f"Transcript error: {e}")
+        return None
+    try:
+        segments = YouTubeTranscriptApi.get_transcript(video_id)
+    except (NoTranscriptFound, TranscriptsDisabled, VideoUnavailable) as e:
+        log_event(f"No transcript for {video_id}: {type(e).__name__}")
+        return []
+    except Exception as e:
+        log_event(f"Transcript error: {e}")
+        return None
+    return [
+        {"start": float(s.get("start", 0)), "duration": float(s.get("duration", 0)), "text": s.get("text", "")}
+        for s in segments or []
+    ]
+
+
+def transcript_text(segments: list[dict]) -> str:
+    """The transcript as one string, or the NO_TRANSCRIPT placeholder."""
+    text = " ".join(s.get("text", "") for s in segments or []).strip()
+    return text or NO_TRANSCRIPT
+
+
+# Same as HW_1's news_fetch.parse_url_list; each homework is submitted and run on
+# its own, so HW_2 cannot import it. Keep the two in sync.
+def parse_url_list(text: str) -> list[str]:
+    """URLs from a pasted list (one per line or whitespace-separated), duplicates dropped."""
+    out: list[str] = []
+    for url in (text or "").split():
+        if url not in out:
+            out.append(url)
+    return out
+
+
+class VideoCache:
+    """Metadata and transcripts on disk, one JSON file per video and kind, valid for `ttl_s`."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, ttl_s: float = CACHE_TTL_S):
+        self.cache_dir = cache_dir
+        self.ttl_s = ttl_s
+
+    def _path(self, video_id: str, kind: str) -> Path:
+        return self.cache_dir / f"{video_id}.{kind}.json"
+
+    def get(self, video_id: str, kind: str):
+        path = self._path(video_id, kind)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("fetched", 0) > self.ttl_s:
+            return None
+        return entry.get("value")
+
+    def put(self, video_id: str, kind: str, value) -> None:
+        path = self._path(video_id, kind)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"fetched": time.time(), "value": value}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+def _cached(cache: VideoCache, video_id: str, kind: str, fetch: Callable[[], object], ok: Callable[[object], bool]):
+    value = cache.get(video_id, kind)
+    if value is not None:
+        return value
+    value = fetch()
+    # Failures are not cached, so the next load tries again; an empty result (a
+    # video without a transcript) is, so it is not asked for again within the TTL.
+    if ok(value):
+        cache.put(video_id, kind, value)
+    return value
+
+
+def load_video(
+    url: str,
+    cache: VideoCache | None = None,
+    metadata_fetcher: MetadataFetcher = fetch_youtube_metadata,
+    transcript_fetcher: TranscriptFetcher = fetch_transcript,
+) -> dict | None:
+    """
+    Metadata for a YouTube URL with its `transcript` (text) and timed
+    `transcript_segments` added, or None if the video cannot be fetched. Both
+    parts come from `cache` when fresh; otherwise they are fetched concurrently
+    (the transcript only needs the video ID). The fetchers can be replaced, e.g.
+    with local stubs in tests.
+    """
+    video_id = extract_video_id(url)
+    if not video_id:
+        return None
+    cache = cache or VideoCache()
+    full_url = f"https://www.youtube.com/watch?v={video_id}"
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        meta_future = pool.submit(
+            _cached, cache, video_id, "metadata", lambda: metadata_fetcher(full_url), lambda v: v is not None
+        )
+        transcript_future = pool.submit(
+            _cached, cache, video_id, "segments", lambda: transcript_fetcher(video_id), lambda v: v is not None
+        )
+        meta = meta_future.result()
+        segments = transcript_future.result() or []
+    if meta is None:
+        return None
+    return {**meta, "transcript": transcript_text(segments), "transcript_segments": segments}
+
+
+def prefetch_videos(
+    urls: list[str],
+    cache: VideoCache | None = None,
+    max_workers: int = PREFETCH_WORKERS,
+    **fetchers,
+) -> dict[str, bool]:
+    """Warm the cache for several videos at once; returns whether each URL could be loaded."""
+    if not urls:
+        return {}
+    cache = cache or VideoCache()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+        loaded = list(pool.map(lambda url: load_video(url, cache, **fetchers) is not None, urls))
+    log_event(f"Prefetched {sum(loaded)} of {len(urls)} video(s).")
+    return dict(zip(urls, loaded))
@@ -42,6 +42,28 @@ def run_ffmpeg(args: list[str]) -> None:
         raise RuntimeError(f"ffmpeg failed (exit {p.returncode}): {err[:4000]}")
 
 
+def probe_duration_seconds(media: Path) -> float:
+    """Container duration via ffprobe (installed alongside ffmpeg)."""
+    p = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            media.as_posix(),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if p.returncode != 0:
+        err = (p.stderr or p.stdout or "").strip()
+        raise RuntimeError(f"ffprobe failed for {media.name}: {err[:2000]}")
+    return float(p.stdout.strip())
+
+
 def concat_wavs_to_wav(wav_paths: list[Path], wav_out: Path) -> None:
     if not wav_paths:
         raise ValueError("No WAV inputs")
@@ -43,6 +43,8 @@ class GeminiClient:
             )
         self._client = genai.Client(api_key=key)
         self.model = os.getenv("GEMINI_MODEL", "gemini-2.5-flash").strip()
+        # Cheaper model for text-only calls (tiered slide descriptions).
+        self.text_model = os.getenv("GEMINI_TEXT_MODEL", "gemini-2.5-flash-lite").strip()
 
     def generate_json(
         self,
@@ -50,6 +52,7 @@ class GeminiClient:
         *,
         system_instruction: str | None = None,
         image_png: Path | None = None,
+        model: str | None = None,
         max_retries: int = 4,
     ) -> dict[str, Any]:
         parts: list[Any] = [types.Part.from_text(text=user_prompt)]
@@ -66,7 +69,7 @@ class GeminiClient:
         for attempt in range(max_retries):
             try:
                 resp = self._client.models.generate_content(
-                    model=self.model,
+                    model=model or self.model,
                     contents=[types.Content(role="user", parts=parts)],
                     config=cfg,
                 )
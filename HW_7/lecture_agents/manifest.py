@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any
+
+from lecture_agents.util_io import atomic_write_json, read_json
+
+log = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+
+def manifest_path(project_dir: Path) -> Path:
+    return project_dir / MANIFEST_NAME
+
+
+def load_manifest(project_dir: Path) -> dict[str, Any]:
+    path = manifest_path(project_dir)
+    if not path.is_file():
+        return {}
+    data = read_json(path)
+    return data if isinstance(data, dict) else {}
+
+
+def update_manifest(project_dir: Path, section: str, value: Any) -> dict[str, Any]:
+    """Replace one top-level section of the project manifest, keeping the others."""
+    data = load_manifest(project_dir)
+    data[section] = value
+    atomic_write_json(manifest_path(project_dir), data)
+    log.info("Updated %s [%s]", MANIFEST_NAME, section)
+    return data
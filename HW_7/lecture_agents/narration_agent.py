@@ -6,7 +6,16 @@ from pathlib import Path
 from typing import Any
 
 from lecture_agents.llm_client import GeminiClient
-from lecture_agents.util_io import atomic_write_json, read_json
+from lecture_agents.page_index import (
+    added_text_lines,
+    compact_page_text,
+)
+from lecture_agents.slide_store import (
+    DEFAULT_CONTEXT_WINDOW,
+    iter_slide_records,
+    open_slide_records,
+    open_slide_store,
+)
 
 log = logging.getLogger(__name__)
 
@@ -39,7 +48,18 @@ def narrate_one_slide(
     arc: dict[str, Any],
     all_slide_descriptions: list[dict[str, Any]],
     prior_narrations: list[dict[str, Any]],
+    page_text: str | None = None,
+    repeat_of: int | None = None,
+    builds_on: int | None = None,
+    added_lines: list[str] | None = None,
 ) -> str:
+    """
+    `page_text` is the slide's extracted text (from the page index). When the slide
+    repeats an earlier one (`repeat_of`), the image is not sent again: the text and
+    description carry the content, and the narration is steered towards a short
+    callback instead of a second full explanation. When it is an incremental build
+    of the previous slide (`builds_on`), the narration covers only `added_lines`.
+    """
     title_extra = ""
     if slide_index == 1:
         title_extra = """
@@ -55,23 +75,52 @@ This is the TITLE / opening slide. The narration MUST:
         "all_slide_descriptions": all_slide_descriptions,
     }
     ctx_json = json.dumps(ctx, ensure_ascii=False, indent=2)
+    scope = "all slide descriptions"
+    if all_slide_descriptions and len(all_slide_descriptions) < total_slides:
+        first = all_slide_descriptions[0].get("slide_index")
+        last = all_slide_descriptions[-1].get("slide_index")
+        scope = f"slide descriptions for slides {first}-{last}"
+
+    text_layer = ""
+    if page_text:
+        text_layer = f"""
+Current slide's text, extracted from the PDF:
+{page_text}
+"""
+    repeat_note = ""
+    if repeat_of is not None:
+        repeat_note = f"""
+This slide repeats slide {repeat_of} (same content). Do not explain it again from scratch: briefly signal that we are coming back to it and connect it to what was just covered.
+"""
+
+    if builds_on is not None:
+        added = "\n".join(f"- {ln}" for ln in added_lines or []) or "(a visual change only)"
+        repeat_note = f"""
+This slide is an incremental build of slide {builds_on}, which was just narrated. Continue from that narration: talk only about what this slide adds, without re-explaining what is already on screen.
+Added content:
+{added}
+"""
 
     prompt = f"""Slide {slide_index} of {total_slides}.
 {title_extra}
 
-style.json + premise.json + arc.json + all slide descriptions (for global context):
+style.json + premise.json + arc.json + {scope} (for global context):
 {ctx_json}
 
 Current slide's description (also include this content faithfully in spirit):
 {description_for_slide}
-
+{text_layer}{repeat_note}
 Prior narrations (do not repeat verbatim; maintain continuity):
 {_prior_narrations_block(prior_narrations)}
 
-Write narration for THIS slide only, informed by the slide IMAGE plus the context above.
+Write narration for THIS slide only, informed by the slide {"text" if repeat_of else "IMAGE"} plus the context above.
 Return JSON: {{"narration": "..."}}"""
 
-    out = client.generate_json(prompt, system_instruction=NARRATION_SYSTEM, image_png=image_png)
+    out = client.generate_json(
+        prompt,
+        system_instruction=NARRATION_SYSTEM,
+        image_png=None if repeat_of is not None else image_png,
+    )
     nar = out.get("narration")
     if not isinstance(nar, str) or not nar.strip():
         raise RuntimeError(f"Bad narration JSON for slide {slide_index}: {out!r}")
@@ -80,42 +129,71 @@ Return JSON: {{"narration": "..."}}"""
 
 def run_narration_agent(
     slide_images: list[Path],
-    slide_description_doc: dict[str, Any],
+    desc_path: Path,
     style: dict[str, Any],
     premise: dict[str, Any],
     arc: dict[str, Any],
     out_path: Path,
     *,
     force: bool = False,
+    context_window: int | None = DEFAULT_CONTEXT_WINDOW,
+    pages: list[dict[str, Any]] | None = None,
+    duplicates: dict[int, int] | None = None,
+    builds_on: dict[int, int] | None = None,
 ) -> list[dict[str, Any]]:
+    """
+    Narrate every slide, appending each result to the streaming store next to
+    `out_path` (resumable), then export `slide_description_narration.json` once.
+
+    Slide descriptions are read per slide from `desc_path` (the description
+    stage's output), not loaded as a whole. `context_window` limits both the
+    neighbouring descriptions and the prior narrations sent with each slide;
+    None sends the whole deck.
+    `pages` (the page index) adds each slide's extracted text to its prompt.
+    `duplicates` / `builds_on` (from the dedup plan in the manifest; see
+    `slide_dedup`) let repeated slides be narrated from text alone and make build
+    slides narrate only what they add; None disables both.
+    """
     if out_path.exists() and not force:
         log.info("Skipping narration: %s exists", out_path)
-        data = read_json(out_path)
-        slides = data.get("slides")
-        if not isinstance(slides, list):
-            raise RuntimeError(f"Invalid narration json in {out_path}")
-        return slides
-
-    slides_in = slide_description_doc.get("slides")
-    if not isinstance(slides_in, list) or len(slides_in) != len(slide_images):
+        return list(iter_slide_records(out_path))
+
+    descriptions = open_slide_records(desc_path)
+    if len(descriptions) != len(slide_images):
         raise RuntimeError("slide_description slides[] must match slide image count")
 
-    by_index: dict[int, str] = {}
-    for item in slides_in:
-        if not isinstance(item, dict):
-            continue
-        idx = int(item.get("slide_index", -1))
-        desc = item.get("description", "")
-        if isinstance(desc, str):
-            by_index[idx] = desc
+    if pages is not None and len(pages) != len(slide_images):
+        log.warning("Page index does not match slide images; ignoring it")
+        pages = None
+    duplicates = duplicates or {}
+    builds_on = builds_on or {}
+
+    store = open_slide_store(out_path)
+    store.start([p.name for p in slide_images], force=force)
+    if len(store):
+        log.info(
+            "Resuming narration: %s/%s already in %s",
+            len(store),
+            len(slide_images),
+            store.path.name,
+        )
 
-    client = GeminiClient()
+    client: GeminiClient | None = None
     total = len(slide_images)
-    slides_out: list[dict[str, Any]] = []
 
     for i, png in enumerate(slide_images, start=1):
-        desc = by_index.get(i, "")
+        if i in store:
+            continue
+        if client is None:
+            client = GeminiClient()
+        desc = (descriptions.get(i) or {}).get("description", "")
+        desc = desc if isinstance(desc, str) else ""
         log.info("Narration %s/%s (%s)", i, total, png.name)
+        if context_window is None:
+            first_prior, nearby = 1, descriptions.get_range(1, total + 1)
+        else:
+            first_prior = max(1, i - context_window)
+            nearby = descriptions.get_range(first_prior, i + context_window + 1)
         nar = narrate_one_slide(
             client,
             png,
@@ -125,10 +203,18 @@ def run_narration_agent(
             style,
             premise,
             arc,
-            slides_in,
-            slides_out,
+            nearby,
+            store.get_range(first_prior, i),
+            page_text=compact_page_text(pages[i - 1]) if pages else None,
+            repeat_of=duplicates.get(i),
+            builds_on=builds_on.get(i),
+            added_lines=(
+                added_text_lines(pages[i - 1], pages[builds_on[i] - 1])
+                if pages and i in builds_on
+                else None
+            ),
         )
-        slides_out.append(
+        store.append(
             {
                 "slide_index": i,
                 "description": desc,
@@ -136,6 +222,6 @@ def run_narration_agent(
             }
         )
 
-    atomic_write_json(out_path, {"slides": slides_out})
-    log.info("Wrote %s (%s slides)", out_path, len(slides_out))
-    return slides_out
+    store.export_json(out_path)
+    log.info("Wrote %s (%s slides)", out_path, len(store))
+    return list(store.iter_slides())
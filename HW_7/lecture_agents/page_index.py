@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import Any
+
+import fitz
+
+from lecture_agents.pdf_text import analyze_page
+from lecture_agents.util_io import atomic_write_json, read_json
+
+log = logging.getLogger(__name__)
+
+PAGE_INDEX_NAME = "page_index.json"
+
+_BULLET_RE = re.compile(r"^\s*([•◦▪▫●○■□‣⁃➢►–—*\-]|\d{1,2}[.)])\s+")
+
+
+def page_index_path(slide_images_dir: Path) -> Path:
+    """The index lives next to `slide_images/` in the project folder."""
+    return slide_images_dir.parent / PAGE_INDEX_NAME
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(_normalize_text(text).encode("utf-8")).hexdigest()[:16]
+
+
+def _text_structure(page: fitz.Page) -> tuple[list[dict[str, Any]], str, list[dict[str, Any]]]:
+    """Text blocks, the title and bullet items (with indent levels) for one page."""
+    blocks: list[dict[str, Any]] = []
+    lines: list[dict[str, Any]] = []
+    bullet_lines: list[dict[str, Any]] = []
+    for b in page.get_text("dict").get("blocks", []):
+        if b.get("type") != 0:
+            continue
+        block_lines = []
+        last_bullet: dict[str, Any] | None = None
+        for ln in b.get("lines", []):
+            spans = ln.get("spans", [])
+            text = "".join(s.get("text", "") for s in spans).strip()
+            if not text:
+                continue
+            size = max((s.get("size", 0.0) for s in spans), default=0.0)
+            bbox = ln.get("bbox", (0, 0, 0, 0))
+            line = {"text": text, "size": size, "x0": bbox[0], "y0": bbox[1]}
+            lines.append(line)
+            block_lines.append(text)
+            m = _BULLET_RE.match(text)
+            if m:
+                last_bullet = {"text": text[m.end():].strip(), "x0": bbox[0]}
+                bullet_lines.append(last_bullet)
+            elif last_bullet is not None and bbox[0] > last_bullet["x0"] + 2:
+                # Wrapped continuation of the bullet above (indented past its glyph).
+                last_bullet["text"] += " " + text
+            else:
+                last_bullet = None
+        if block_lines:
+            blocks.append(
+                {
+                    "bbox": [round(v, 1) for v in b.get("bbox", (0, 0, 0, 0))],
+                    "text": "\n".join(block_lines),
+                }
+            )
+
+    title_lines: list[str] = []
+    top = page.rect.y0 + 0.4 * page.rect.height
+    candidates = [ln for ln in lines if ln["y0"] <= top] or lines
+    if candidates:
+        biggest = max(ln["size"] for ln in candidates)
+        title_lines = [ln["text"] for ln in candidates if ln["size"] >= biggest - 0.5]
+
+    # Indent levels: distinct left edges (rounded to 4pt) from left to right.
+    edges = sorted({round(b["x0"] / 4) for b in bullet_lines})
+    bullets = [
+        {"level": edges.index(round(b["x0"] / 4)), "text": b["text"]} for b in bullet_lines
+    ]
+    return blocks, " ".join(title_lines).strip(), bullets
+
+
+def index_page(page: fitz.Page) -> dict[str, Any]:
+    entry = analyze_page(page)
+    blocks, title, bullets = _text_structure(page)
+    entry.update(
+        {
+            "title": title,
+            "bullets": bullets,
+            "text_blocks": blocks,
+            "image_regions": [
+                [round(v, 1) for v in info.get("bbox", (0, 0, 0, 0))]
+                for info in page.get_image_info()
+            ],
+            "text_hash": _text_hash(entry["text"]),
+        }
+    )
+    return entry
+
+
+def build_page_index(pdf_path: Path) -> list[dict[str, Any]]:
+    """Index a PDF without rasterizing it (for projects rendered before the index existed)."""
+    doc = fitz.open(pdf_path)
+    try:
+        return [index_page(doc.load_page(i)) for i in range(doc.page_count)]
+    finally:
+        doc.close()
+
+
+def write_page_index(path: Path, pages: list[dict[str, Any]]) -> None:
+    atomic_write_json(path, {"pages": pages})
+    log.info("Wrote %s (%s pages)", path.name, len(pages))
+
+
+def load_page_index(path: Path) -> list[dict[str, Any]] | None:
+    if not path.is_file():
+        return None
+    pages = read_json(path).get("pages")
+    return pages if isinstance(pages, list) else None
+
+
+def compact_page_text(entry: dict[str, Any]) -> str:
+    """Title, bullet outline and remaining text of a page, for prompts."""
+    out = []
+    if entry.get("title"):
+        out.append(f"Title: {entry['title']}")
+    bullets = entry.get("bullets") or []
+    for b in bullets:
+        out.append(f"{'  ' * int(b.get('level', 0))}- {b.get('text', '')}")
+    # Anything not already covered by the title or a bullet (a bullet's wrapped
+    # continuation lines are substrings of its text).
+    covered = _normalize_text(
+        " ".join([entry.get("title", "")] + [b.get("text", "") for b in bullets])
+    )
+    rest = []
+    for blk in entry.get("text_blocks") or []:
+        for ln in blk.get("text", "").splitlines():
+            m = _BULLET_RE.match(ln)
+            body = _normalize_text(ln[m.end():] if m else ln)
+            if body and body not in covered:
+                rest.append(ln.strip())
+    if rest:
+        out.append("Other text: " + " / ".join(rest))
+    if entry.get("image_regions"):
+        out.append(f"[{len(entry['image_regions'])} picture(s) on the slide]")
+    return "\n".join(out)
+
+
+def added_text_lines(entry: dict[str, Any], base: dict[str, Any]) -> list[str]:
+    """Lines of `entry`'s text that are not on `base` (what a build slide added)."""
+    seen = {_normalize_text(ln) for ln in base.get("text", "").splitlines()}
+    return [
+        ln.strip()
+        for ln in entry.get("text", "").splitlines()
+        if ln.strip() and _normalize_text(ln) not in seen
+    ]
@@ -5,12 +5,16 @@ from pathlib import Path
 
 import fitz
 
+from lecture_agents.page_index import index_page, page_index_path, write_page_index
+
 log = logging.getLogger(__name__)
 
 
 def rasterize_pdf(pdf_path: Path, slide_images_dir: Path, zoom: float = 2.0) -> int:
     """
     Render each PDF page to slide_images/slide_001.png ...
+    and, in the same pass, write the per-page text/structure index
+    (`page_index.json`, next to slide_images/).
     Returns page count.
     """
     slide_images_dir.mkdir(parents=True, exist_ok=True)
@@ -18,12 +22,15 @@ def rasterize_pdf(pdf_path: Path, slide_images_dir: Path, zoom: float = 2.0) ->
     try:
         matrix = fitz.Matrix(zoom, zoom)
         n = doc.page_count
+        pages = []
         for i in range(n):
             page = doc.load_page(i)
             pix = page.get_pixmap(matrix=matrix, alpha=False)
             out = slide_images_dir / f"slide_{i + 1:03d}.png"
             pix.save(out.as_posix())
             log.info("Wrote %s", out.name)
+            pages.append(index_page(page))
+        write_page_index(page_index_path(slide_images_dir), pages)
         return n
     finally:
         doc.close()
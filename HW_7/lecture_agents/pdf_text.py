@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import fitz
+
+log = logging.getLogger(__name__)
+
+# A slide is "text-only" when it carries real text and little else: pictures cover
+# at most MAX_IMAGE_AREA of the page and there are few vector shapes (charts and
+# diagrams are drawn as many small paths).
+MIN_TEXT_CHARS = 40
+MAX_IMAGE_AREA = 0.15
+MAX_DRAWINGS = 30
+
+
+def _image_area_ratio(page: fitz.Page) -> float:
+    page_area = abs(page.rect) or 1.0
+    covered = 0.0
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info.get("bbox", (0, 0, 0, 0))) & page.rect
+        covered += abs(bbox)
+    return min(covered / page_area, 1.0)
+
+
+def _drawing_count(page: fitz.Page) -> int:
+    """Vector paths, ignoring page-sized background fills."""
+    page_area = abs(page.rect) or 1.0
+    n = 0
+    for d in page.get_drawings():
+        rect = d.get("rect")
+        if rect is not None and abs(fitz.Rect(rect)) >= 0.9 * page_area:
+            continue
+        n += 1
+    return n
+
+
+def analyze_page(page: fitz.Page) -> dict[str, Any]:
+    text = page.get_text("text").strip()
+    return {
+        "slide_index": page.number + 1,
+        "text": text,
+        "text_chars": len("".join(text.split())),
+        "image_area_ratio": round(_image_area_ratio(page), 4),
+        "drawing_count": _drawing_count(page),
+    }
+
+
+def is_text_slide(page_info: dict[str, Any]) -> bool:
+    return (
+        page_info.get("text_chars", 0) >= MIN_TEXT_CHARS
+        and page_info.get("image_area_ratio", 1.0) <= MAX_IMAGE_AREA
+        and page_info.get("drawing_count", MAX_DRAWINGS + 1) <= MAX_DRAWINGS
+    )
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any
+
+import fitz
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+THUMB_SIZE = 32
+HASH_SIZE = 8
+# Hamming distances on the 64-bit DCT hash.
+IDENTICAL_MAX_DISTANCE = 2
+BUILD_MAX_DISTANCE = 12
+# Mean absolute difference (0-255 gray levels) between 32x32 thumbnails below which
+# two slides render the same.
+IDENTICAL_MAX_PIXEL_DIFF = 1.5
+
+
+def _gray_thumbnail(png: Path, size: int = THUMB_SIZE) -> np.ndarray:
+    """Area-averaged `size`x`size` grayscale thumbnail of a slide PNG."""
+    pix = fitz.Pixmap(png.as_posix())
+    if pix.n - pix.alpha != 1:
+        pix = fitz.Pixmap(fitz.csGRAY, pix)
+    # Cheap power-of-two shrink first; keep at least 4 source pixels per output pixel.
+    shrink = 0
+    while min(pix.width, pix.height) >> (shrink + 1) >= 4 * size:
+        shrink += 1
+    if shrink:
+        pix.shrink(shrink)
+    h, w, stride, n = pix.height, pix.width, pix.stride, pix.n
+    a = np.frombuffer(pix.samples, dtype=np.uint8).reshape(h, stride)[:, : w * n : n]
+    ys = np.arange(h) * size // h
+    xs = np.arange(w) * size // w
+    bins = (ys[:, None] * size + xs[None, :]).ravel()
+    sums = np.bincount(bins, weights=a.ravel().astype(np.float64), minlength=size * size)
+    counts = np.bincount(bins, minlength=size * size)
+    return (sums / np.maximum(counts, 1)).reshape(size, size).astype(np.float32)
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m
+
+
+def perceptual_hashes(thumbs: np.ndarray) -> np.ndarray:
+    """(N, S, S) thumbnails -> (N, 64) boolean DCT perceptual hashes."""
+    d = _dct_matrix(thumbs.shape[-1]).astype(np.float32)
+    coeffs = np.einsum("ij,njk,lk->nil", d, thumbs, d)
+    low = coeffs[:, :HASH_SIZE, :HASH_SIZE].reshape(len(thumbs), -1)
+    med = np.median(low[:, 1:], axis=1, keepdims=True)
+    return low > med
+
+
+def hamming_matrix(bits: np.ndarray) -> np.ndarray:
+    b = bits.astype(np.int32)
+    return b @ (1 - b).T + (1 - b) @ b.T
+
+
+def _hex(bits: np.ndarray) -> str:
+    return f"{int(''.join('1' if v else '0' for v in bits), 2):016x}"
+
+
+def build_dedup_plan(
+    slide_images: list[Path],
+    pages: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """
+    Decide, per slide, whether it is identical to an earlier slide (reuse its
+    description and encoded video frames) or an incremental build of the slide
+    right before it (prompt with the difference only).
+
+    Identical means a perceptual-hash distance <= IDENTICAL_MAX_DISTANCE, nearly
+    equal thumbnails and, when the page index is available, the same text. A build
+    is a slide within BUILD_MAX_DISTANCE of the previous one whose text contains all
+    of the previous slide's lines.
+    """
+    if not slide_images:
+        return {"method": "dct-phash-64", "slides": []}
+    thumbs = np.stack([_gray_thumbnail(p) for p in slide_images])
+    bits = perceptual_hashes(thumbs)
+    dist = hamming_matrix(bits)
+    n = len(slide_images)
+    flat = thumbs.reshape(n, -1)
+
+    text_hash = [None] * n
+    text_lines: list[set[str]] = [set() for _ in range(n)]
+    if pages is not None and len(pages) == n:
+        text_hash = [p.get("text_hash") for p in pages]
+        text_lines = [
+            {ln.strip().lower() for ln in p.get("text", "").splitlines() if ln.strip()}
+            for p in pages
+        ]
+
+    slides: list[dict[str, Any]] = []
+    duplicate_of: list[int | None] = [None] * n
+    for i in range(n):
+        entry: dict[str, Any] = {
+            "slide_index": i + 1,
+            "phash": _hex(bits[i]),
+            "duplicate_of": None,
+            "builds_on": None,
+            "distance": None,
+            "reuse": [],
+        }
+        # Identical: earliest earlier slide that is itself not a duplicate.
+        cands = np.flatnonzero(dist[i, :i] <= IDENTICAL_MAX_DISTANCE)
+        for j in cands:
+            if duplicate_of[j] is not None or text_hash[i] != text_hash[j]:
+                continue
+            if np.abs(flat[i] - flat[j]).mean() <= IDENTICAL_MAX_PIXEL_DIFF:
+                duplicate_of[i] = int(j)
+                entry["duplicate_of"] = int(j) + 1
+                entry["distance"] = int(dist[i, j])
+                entry["reuse"] = ["description", "text_only_narration", "video_frames"]
+                break
+        if duplicate_of[i] is None and i > 0 and dist[i, i - 1] <= BUILD_MAX_DISTANCE:
+            prev_lines, cur_lines = text_lines[i - 1], text_lines[i]
+            if cur_lines >= prev_lines:
+                entry["builds_on"] = i
+                entry["distance"] = int(dist[i, i - 1])
+                entry["reuse"] = ["diff_prompt"]
+        slides.append(entry)
+
+    n_dupes = sum(1 for s in slides if s["duplicate_of"])
+    n_builds = sum(1 for s in slides if s["builds_on"])
+    log.info(
+        "Dedup: %s identical slide(s), %s incremental build(s) of %s", n_dupes, n_builds, n
+    )
+    return {
+        "method": "dct-phash-64",
+        "identical_max_distance": IDENTICAL_MAX_DISTANCE,
+        "build_max_distance": BUILD_MAX_DISTANCE,
+        "slides": slides,
+    }
+
+
+def duplicates_from_plan(plan: dict[str, Any]) -> dict[int, int]:
+    return {
+        int(s["slide_index"]): int(s["duplicate_of"])
+        for s in plan.get("slides", [])
+        if s.get("duplicate_of")
+    }
+
+
+def builds_from_plan(plan: dict[str, Any]) -> dict[int, int]:
+    return {
+        int(s["slide_index"]): int(s["builds_on"])
+        for s in plan.get("slides", [])
+        if s.get("builds_on")
+    }
@@ -5,7 +5,17 @@ from pathlib import Path
 from typing import Any
 
 from lecture_agents.llm_client import GeminiClient
-from lecture_agents.util_io import atomic_write_json, read_json
+from lecture_agents.page_index import (
+    added_text_lines,
+    compact_page_text,
+)
+from lecture_agents.pdf_text import is_text_slide
+from lecture_agents.slide_store import (
+    DEFAULT_CONTEXT_WINDOW,
+    SlideDocStore,
+    iter_slide_records,
+    open_slide_store,
+)
 
 log = logging.getLogger(__name__)
 
@@ -14,6 +24,14 @@ Return only valid JSON with a single key "description" whose value is a string.
 Build on prior slide descriptions when relevant (themes, definitions, running examples)."""
 
 
+def _prior_window(
+    store: SlideDocStore, slide_index: int, context_window: int | None
+) -> list[dict[str, Any]]:
+    """Prior records read back from the store, limited to the last `context_window` slides."""
+    first = 1 if context_window is None else max(1, slide_index - context_window)
+    return store.get_range(first, slide_index)
+
+
 def _prior_block(prior: list[dict[str, Any]]) -> str:
     if not prior:
         return "(No prior slides yet.)"
@@ -31,12 +49,22 @@ def describe_one_slide(
     slide_index: int,
     total_slides: int,
     prior_descriptions: list[dict[str, Any]],
+    page_text: str | None = None,
+    build_note: str = "",
 ) -> str:
+    text_layer = ""
+    if page_text:
+        text_layer = f"""
+Text extracted from the PDF for this slide (use it for exact wording; the image is authoritative for layout and visuals):
+---
+{page_text}
+---
+"""
     prompt = f"""You are on slide {slide_index} of {total_slides}.
 
 Here are descriptions of all previous slides, in order:
 {_prior_block(prior_descriptions)}
-
+{text_layer}{build_note}
 Describe ONLY what is visible on the current slide image: titles, bullets, diagrams, code, photos, and how they relate to prior slides when relevant.
 Be concrete; do not invent content not shown.
 
@@ -49,28 +77,169 @@ Return JSON: {{"description": "..."}}"""
     return desc.strip()
 
 
+def describe_text_slide(
+    client: GeminiClient,
+    slide_text: str,
+    slide_index: int,
+    total_slides: int,
+    prior_descriptions: list[dict[str, Any]],
+    build_note: str = "",
+) -> str:
+    """First-pass description from the PDF text layer only, on the cheap text model."""
+    prompt = f"""You are on slide {slide_index} of {total_slides}.
+
+Here are descriptions of all previous slides, in order:
+{_prior_block(prior_descriptions)}
+
+The current slide is a text slide (no significant pictures or diagrams). Its text, extracted from the PDF in reading order:
+---
+{slide_text}
+---
+{build_note}
+Describe the slide: its title, its bullets (keep their hierarchy), and how they relate to prior slides when relevant.
+Be concrete; do not invent content not in the text.
+
+Return JSON: {{"description": "..."}}"""
+
+    out = client.generate_json(
+        prompt, system_instruction=SLIDE_DESC_SYSTEM, model=client.text_model
+    )
+    desc = out.get("description")
+    if not isinstance(desc, str) or not desc.strip():
+        raise RuntimeError(f"Bad slide description JSON for slide {slide_index}: {out!r}")
+    return desc.strip()
+
+
+def _build_note(base_index: int, base_description: str, added: list[str]) -> str:
+    """Prompt section for an incremental build of the previous slide."""
+    added_block = "\n".join(f"- {ln}" for ln in added)
+    if not added:
+        added_block = "(no new text; the change is visual)"
+    return f"""
+This slide is an incremental build of slide {base_index}, whose description is:
+{base_description}
+
+Content added since slide {base_index}:
+{added_block}
+
+Reuse the wording of slide {base_index}'s description for unchanged content and describe the additions precisely.
+"""
+
+
+def _needs_refinement(desc: str, page_info: dict[str, Any]) -> bool:
+    """A text-tier answer much shorter than the slide's own text probably dropped content."""
+    return len(desc) < min(80, page_info.get("text_chars", 0))
+
+
 def run_slide_description_agent(
     slide_images: list[Path],
     out_path: Path,
     *,
     force: bool = False,
+    context_window: int | None = DEFAULT_CONTEXT_WINDOW,
+    pages: list[dict[str, Any]] | None = None,
+    tiered: bool = False,
+    duplicates: dict[int, int] | None = None,
+    builds_on: dict[int, int] | None = None,
 ) -> list[dict[str, Any]]:
+    """
+    Describe every slide, appending each result to the streaming store next to
+    `out_path` as soon as it is generated (an interrupted run resumes where it
+    stopped), then export the legacy `slide_description.json` once at the end.
+
+    `context_window` limits how many preceding descriptions go into each prompt;
+    None keeps the full history.
+
+    `pages` is the page index written during rasterization (`page_index.json`).
+    When given, each vision prompt also carries the slide's extracted text.
+
+    `duplicates` / `builds_on` (slide_index -> earlier slide_index, from the dedup
+    plan in the manifest; see `slide_dedup`): a duplicate slide reuses the earlier
+    slide's description instead of being generated again, and a slide that builds
+    on the previous one is prompted with that slide's description and the added
+    text. None disables both.
+
+    With `tiered=True` (requires `pages`), slides that are plain text according to
+    `pdf_text.is_text_slide` are described from their compact text on
+    `GEMINI_TEXT_MODEL`; image or diagram heavy slides, and text-tier answers that
+    fail or look truncated, go to the vision model.
+    """
     if out_path.exists() and not force:
         log.info("Skipping slide descriptions: %s exists", out_path)
-        data = read_json(out_path)
-        slides = data.get("slides")
-        if not isinstance(slides, list):
-            raise RuntimeError(f"Invalid slide_description.json: missing slides[] in {out_path}")
-        return slides
-
-    client = GeminiClient()
-    slides_out: list[dict[str, Any]] = []
+        return list(iter_slide_records(out_path))
+
+    store = open_slide_store(out_path)
+    store.start([p.name for p in slide_images], force=force)
+    if len(store):
+        log.info(
+            "Resuming slide descriptions: %s/%s already in %s",
+            len(store),
+            len(slide_images),
+            store.path.name,
+        )
+
+    if tiered and pages is None:
+        raise RuntimeError("Tiered slide descriptions need the page index (page_index.json)")
+    if pages is not None and len(pages) != len(slide_images):
+        log.warning(
+            "Page index has %s pages but there are %s slide images; ignoring it",
+            len(pages),
+            len(slide_images),
+        )
+        pages = None
+    duplicates = duplicates or {}
+    builds_on = builds_on or {}
+
+    client: GeminiClient | None = None
     total = len(slide_images)
+    text_tier = vision_tier = reused = 0
     for i, png in enumerate(slide_images, start=1):
-        log.info("Slide description %s/%s (%s)", i, total, png.name)
-        desc = describe_one_slide(client, png, i, total, slides_out)
-        slides_out.append({"slide_index": i, "description": desc})
-
-    atomic_write_json(out_path, {"slides": slides_out})
-    log.info("Wrote %s (%s slides)", out_path, len(slides_out))
-    return slides_out
+        if i in store:
+            continue
+        source = store.get(duplicates[i]) if i in duplicates else None
+        if source is not None:
+            log.info(
+                "Slide description %s/%s: duplicate of slide %s, reusing", i, total, duplicates[i]
+            )
+            store.append({"slide_index": i, "description": source["description"]})
+            reused += 1
+            continue
+        if client is None:
+            client = GeminiClient()
+        prior = _prior_window(store, i, context_window)
+        page_text = compact_page_text(pages[i - 1]) if pages else None
+        build_note = ""
+        base = store.get(builds_on[i]) if i in builds_on else None
+        if base is not None:
+            added = added_text_lines(pages[i - 1], pages[builds_on[i] - 1]) if pages else []
+            build_note = _build_note(builds_on[i], base["description"], added)
+        desc = None
+        if tiered and pages and is_text_slide(pages[i - 1]):
+            log.info("Slide description %s/%s (%s, text tier)", i, total, png.name)
+            try:
+                desc = describe_text_slide(
+                    client, page_text or "", i, total, prior, build_note
+                )
+            except Exception as e:
+                # Any failure of the cheap model (API, network, bad JSON) falls back to vision.
+                log.warning("Text tier failed for slide %s (%s: %s); using vision", i, type(e).__name__, e)
+            if desc is not None and _needs_refinement(desc, pages[i - 1]):
+                log.info("Text-tier description for slide %s looks truncated; refining", i)
+                desc = None
+        if desc is None:
+            log.info("Slide description %s/%s (%s)", i, total, png.name)
+            desc = describe_one_slide(client, png, i, total, prior, page_text, build_note)
+            vision_tier += 1
+        else:
+            text_tier += 1
+        store.append({"slide_index": i, "description": desc})
+
+    store.export_json(out_path)
+    log.info("Wrote %s (%s slides)", out_path, len(store))
+    log.info(
+        "Descriptions generated: %s vision, %s text-only; %s duplicates reused",
+        vision_tier,
+        text_tier,
+        reused,
+    )
+    return list(store.iter_slides())
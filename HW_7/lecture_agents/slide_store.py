@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import Any, Iterator
+
+from lecture_agents.util_io import read_json
+
+log = logging.getLogger(__name__)
+
+# One fixed-size index record per slide: slide_index, byte offset, byte length.
+_INDEX_RECORD = struct.Struct("<IQI")
+
+# Slides on each side of the current one whose records go into a per-slide prompt,
+# so prompt size stays constant per slide instead of growing with the deck.
+DEFAULT_CONTEXT_WINDOW = 3
+
+
+def store_path_for(json_path: Path) -> Path:
+    """`slide_description.json` -> `slide_description.jsonl` (the streaming sidecar)."""
+    return json_path.with_suffix(".jsonl")
+
+
+class SlideDocStore:
+    """
+    Append-only JSONL store of per-slide records with a binary offset index.
+
+    Each slide is one line in `<name>.jsonl`; `<name>.jsonl.idx` holds a fixed-size
+    (slide_index, offset, length) record per line, so a slide can be read with one
+    seek and appending a slide costs one line plus one index record regardless of
+    deck size. Records are only loaded when asked for. `<name>.jsonl.deck` lists the
+    slide image names the records were written for (see `start`).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.index_path = path.with_name(path.name + ".idx")
+        self.deck_path = path.with_name(path.name + ".deck")
+        self._offsets: dict[int, tuple[int, int]] = {}
+        self._order: list[int] = []
+        self._load_index()
+
+    # -- index maintenance -------------------------------------------------
+
+    def _load_index(self) -> None:
+        self._offsets.clear()
+        self._order.clear()
+        if not self.path.exists():
+            return
+        data_size = self.path.stat().st_size
+        indexed_end = 0
+        if self.index_path.exists():
+            raw = self.index_path.read_bytes()
+            usable = len(raw) - len(raw) % _INDEX_RECORD.size
+            for slide_index, offset, length in _INDEX_RECORD.iter_unpack(raw[:usable]):
+                if offset + length > data_size:
+                    break
+                self._remember(slide_index, offset, length)
+                indexed_end = max(indexed_end, offset + length)
+        if indexed_end < data_size:
+            self._recover_tail(indexed_end)
+
+    def _remember(self, slide_index: int, offset: int, length: int) -> None:
+        if slide_index not in self._offsets:
+            self._order.append(slide_index)
+        self._offsets[slide_index] = (offset, length)
+
+    def _recover_tail(self, start: int) -> None:
+        """Index lines written after the last index record; drop a torn final line."""
+        log.info("Rebuilding index tail of %s from byte %s", self.path.name, start)
+        good_end = start
+        with self.path.open("rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    rec = json.loads(line)
+                    slide_index = int(rec["slide_index"])
+                except (ValueError, KeyError, TypeError):
+                    break
+                self._remember(slide_index, offset, len(line))
+                offset += len(line)
+                good_end = offset
+        if good_end < self.path.stat().st_size:
+            log.warning("Truncating partial record at end of %s", self.path.name)
+            with self.path.open("r+b") as f:
+                f.truncate(good_end)
+        self._rewrite_index()
+
+    def _rewrite_index(self) -> None:
+        payload = b"".join(
+            _INDEX_RECORD.pack(i, *self._offsets[i]) for i in self._order
+        )
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, self.index_path)
+
+    # -- reading -----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, slide_index: object) -> bool:
+        return slide_index in self._offsets
+
+    def slide_indices(self) -> list[int]:
+        return list(self._order)
+
+    def get(self, slide_index: int) -> dict[str, Any] | None:
+        loc = self._offsets.get(slide_index)
+        if loc is None:
+            return None
+        offset, length = loc
+        with self.path.open("rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def get_range(self, first: int, stop: int) -> list[dict[str, Any]]:
+        """Records for slide indices first..stop-1 that exist, read with one open."""
+        wanted = [i for i in range(first, stop) if i in self._offsets]
+        if not wanted:
+            return []
+        out = []
+        with self.path.open("rb") as f:
+            for i in wanted:
+                offset, length = self._offsets[i]
+                f.seek(offset)
+                out.append(json.loads(f.read(length)))
+        return out
+
+    def iter_slides(self) -> Iterator[dict[str, Any]]:
+        """Yield records in slide order (the latest record wins for a repeated index)."""
+        if not self._order:
+            return
+        with self.path.open("rb") as f:
+            for slide_index in sorted(self._offsets):
+                offset, length = self._offsets[slide_index]
+                f.seek(offset)
+                yield json.loads(f.read(length))
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self.iter_slides()
+
+    # -- writing -----------------------------------------------------------
+
+    def _read_deck(self) -> list[str] | None:
+        try:
+            names = json.loads(self.deck_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return names if isinstance(names, list) else None
+
+    def start(self, image_names: list[str], *, force: bool = False) -> None:
+        """
+        Prepare the store for a run over the slide images `image_names`. Existing
+        records are kept for resuming only if they were written for the same images
+        and do not already cover the whole deck (a complete store whose JSON export
+        is missing means the export was deleted to regenerate it); otherwise the
+        store is reset.
+        """
+        names = list(image_names)
+        reason = "--force" if force else None
+        if reason is None and len(self):
+            if self._read_deck() != names:
+                reason = "slide images changed"
+            elif any(not 1 <= i <= len(names) for i in self._order):
+                reason = "records outside the deck"
+            elif len(self) >= len(names):
+                reason = "already complete"
+        if reason is not None:
+            if len(self):
+                log.info("Discarding %s records in %s (%s)", len(self), self.path.name, reason)
+            self.reset()
+        if self._read_deck() != names:
+            self.deck_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.deck_path.with_name(self.deck_path.name + ".tmp")
+            tmp.write_text(json.dumps(names, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.deck_path)
+
+    def append(self, record: dict[str, Any]) -> None:
+        """Durably append one slide record (a single write of one complete line)."""
+        slide_index = int(record["slide_index"])
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            offset = os.fstat(fd).st_size
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        with self.index_path.open("ab") as f:
+            f.write(_INDEX_RECORD.pack(slide_index, offset, len(line)))
+            f.flush()
+            os.fsync(f.fileno())
+        self._remember(slide_index, offset, len(line))
+
+    def reset(self) -> None:
+        for p in (self.path, self.index_path, self.deck_path):
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+        self._offsets.clear()
+        self._order.clear()
+
+    def export_json(self, json_path: Path) -> None:
+        """
+        Stream the store into the legacy `{"slides": [...]}` document, one record at a
+        time, and atomically replace `json_path`.
+        """
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = json_path.with_name(json_path.name + ".tmp")
+        try:
+            with tmp.open("w", encoding="utf-8") as f:
+                f.write('{\n  "slides": [')
+                for n, rec in enumerate(self.iter_slides()):
+                    body = json.dumps(rec, indent=2, ensure_ascii=False)
+                    body = body.replace("\n", "\n    ")
+                    f.write(("," if n else "") + "\n    " + body)
+                f.write("\n  ]\n}\n" if self._order else "]\n}\n")
+            os.replace(tmp, json_path)
+            # Same mtime as the export, so readers keep using the (seekable) store
+            # until the JSON is edited by hand.
+            st = json_path.stat()
+            os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        except Exception:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            raise
+
+
+def open_slide_store(json_path: Path) -> SlideDocStore:
+    return SlideDocStore(store_path_for(json_path))
+
+
+def _current_store(path: Path) -> SlideDocStore | None:
+    """The streaming store for `path`, unless the JSON document is newer (or it does not exist)."""
+    store_path = path if path.suffix == ".jsonl" else store_path_for(path)
+    json_path = path.with_suffix(".json")
+    if store_path.exists() and (
+        not json_path.exists() or store_path.stat().st_mtime >= json_path.stat().st_mtime
+    ):
+        return SlideDocStore(store_path)
+    return None
+
+
+def _json_slides(path: Path) -> list[dict[str, Any]]:
+    json_path = path.with_suffix(".json")
+    data = read_json(json_path)
+    slides = data.get("slides") if isinstance(data, dict) else None
+    if not isinstance(slides, list):
+        raise RuntimeError(f"Invalid slide document: missing slides[] in {json_path}")
+    return slides
+
+
+def iter_slide_records(path: Path) -> Iterator[dict[str, Any]]:
+    """
+    Compatibility reader: yield slide records from either the streaming store or a
+    legacy `{"slides": [...]}` JSON document (`path` may name either).
+    """
+    store = _current_store(path)
+    if store is not None:
+        yield from store.iter_slides()
+        return
+    yield from _json_slides(path)
+
+
+class JsonSlideRecords:
+    """The read side of SlideDocStore over a legacy JSON document (loaded once)."""
+
+    def __init__(self, slides: list[dict[str, Any]]) -> None:
+        self._by_index = {
+            int(s["slide_index"]): s for s in slides if isinstance(s, dict) and "slide_index" in s
+        }
+
+    def __len__(self) -> int:
+        return len(self._by_index)
+
+    def get(self, slide_index: int) -> dict[str, Any] | None:
+        return self._by_index.get(slide_index)
+
+    def get_range(self, first: int, stop: int) -> list[dict[str, Any]]:
+        return [self._by_index[i] for i in range(first, stop) if i in self._by_index]
+
+
+def open_slide_records(path: Path) -> SlideDocStore | JsonSlideRecords:
+    """
+    Per-slide read access to a stage's output: seeks into the streaming store when
+    it is current, so only the records asked for are loaded; projects with only
+    the JSON document fall back to loading it.
+    """
+    store = _current_store(path)
+    return store if store is not None else JsonSlideRecords(_json_slides(path))
+
+
+def read_slides_doc(path: Path) -> dict[str, Any]:
+    """Materialize `{"slides": [...]}` for consumers that need the whole document."""
+    return {"slides": list(iter_slide_records(path))}
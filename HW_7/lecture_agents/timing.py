@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import logging
+import re
+from pathlib import Path
+from typing import Any
+
+from lecture_agents.util_io import atomic_write_json, atomic_write_text, read_json
+
+log = logging.getLogger(__name__)
+
+TIMING_MAP_NAME = "timing_map.json"
+
+# A sentence runs up to terminal punctuation followed by whitespace (or the end).
+_SENTENCE_RE = re.compile(r"\S.*?(?:[.!?]+[\"')\]]*(?=\s)|$)", re.DOTALL)
+
+
+def split_sentences(text: str) -> list[str]:
+    return _SENTENCE_RE.findall(text)
+
+
+def timing_map_path(project_dir: Path) -> Path:
+    return project_dir / TIMING_MAP_NAME
+
+
+def load_timing_map(path: Path) -> dict[str, Any]:
+    """`{"slides": {"<slide_index>": {"duration_s", "sample_rate", "chunks": [...]}}}`"""
+    if not path.is_file():
+        return {"slides": {}}
+    data = read_json(path)
+    if not isinstance(data, dict) or not isinstance(data.get("slides"), dict):
+        return {"slides": {}}
+    return data
+
+
+def save_timing_map(path: Path, timing: dict[str, Any]) -> None:
+    atomic_write_json(path, timing)
+
+
+def slide_durations(timing: dict[str, Any]) -> dict[int, float]:
+    return {
+        int(idx): float(entry["duration_s"])
+        for idx, entry in timing.get("slides", {}).items()
+        if isinstance(entry, dict) and "duration_s" in entry
+    }
+
+
+def _srt_time(seconds: float) -> str:
+    ms = int(round(seconds * 1000))
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+
+def write_srt(timing: dict[str, Any], n_slides: int, out_srt: Path) -> None:
+    """
+    One cue per sentence. Each chunk's measured duration is spread over its
+    sentences by character count, and slides follow each other back to back, so
+    cue times line up with the assembled video without probing any media.
+    """
+    slides = timing.get("slides", {})
+    cues: list[str] = []
+    slide_start = 0.0
+    for idx in range(1, n_slides + 1):
+        entry = slides.get(str(idx))
+        if not isinstance(entry, dict):
+            raise RuntimeError(f"No timing for slide {idx} in {TIMING_MAP_NAME}")
+        t = slide_start
+        for chunk in entry.get("chunks", []):
+            sentences = split_sentences(chunk.get("text", "")) or [chunk.get("text", "")]
+            total_chars = sum(len(s) for s in sentences) or 1
+            for sentence in sentences:
+                dur = float(chunk["duration_s"]) * len(sentence) / total_chars
+                cues.append(
+                    f"{len(cues) + 1}\n{_srt_time(t)} --> {_srt_time(t + dur)}\n{sentence}\n"
+                )
+                t += dur
+        slide_start += float(entry["duration_s"])
+    atomic_write_text(out_srt, "\n".join(cues))
+    log.info("Wrote %s (%s cues, %.1fs)", out_srt.name, len(cues), slide_start)
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import logging
+import math
 import os
 import re
+import shutil
 import tempfile
+import wave
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -11,35 +15,63 @@ from google import genai
 from google.genai import types
 
 from lecture_agents.ffmpeg_util import concat_wavs_to_mp3, concat_wavs_to_wav, pcm16le_mono_to_wav
+from lecture_agents.timing import split_sentences
 
 log = logging.getLogger(__name__)
 
 _DEFAULT_CHUNK = 2800
+_DEFAULT_SAMPLE_RATE = 24000
+
+_CLAUSE_RE = re.compile(r"\S.*?(?:[;,:](?=\s)|$)", re.DOTALL)
+
+
+def _pieces(text: str, max_chars: int) -> list[str]:
+    """Sentences; any sentence longer than max_chars is split at clauses, then words."""
+    out: list[str] = []
+    for sentence in split_sentences(text):
+        if len(sentence) <= max_chars:
+            out.append(sentence)
+            continue
+        for clause in _CLAUSE_RE.findall(sentence):
+            if len(clause) <= max_chars:
+                out.append(clause)
+                continue
+            # No usable boundary: hand over single words so the chunking below can
+            # balance the split instead of filling each chunk to max_chars.
+            for word in clause.split():
+                step = math.ceil(len(word) / math.ceil(len(word) / max_chars))
+                out.extend(word[i:i + step] for i in range(0, len(word), step))
+    return out
 
 
 def _split_tts_chunks(text: str, max_chars: int = _DEFAULT_CHUNK) -> list[str]:
+    """
+    Sentence-aligned chunks of at most `max_chars`, sized to be roughly equal so the
+    chunks of one slide take about the same time when synthesized in parallel.
+    """
     t = " ".join(text.split())
     if len(t) <= max_chars:
         return [t]
+    pieces = _pieces(t, max_chars)
+    n_chunks = math.ceil(len(t) / max_chars)
+    target = len(t) / n_chunks
     parts: list[str] = []
-    cursor = 0
-    while cursor < len(t):
-        end = min(cursor + max_chars, len(t))
-        chunk = t[cursor:end]
-        if end < len(t):
-            cut = None
-            for sep in [". ", "? ", "! ", "; ", ", "]:
-                idx = chunk.rfind(sep)
-                if idx > max_chars // 2:
-                    cut = idx + len(sep)
-                    break
-            if cut is not None:
-                chunk = t[cursor : cursor + cut]
-                end = cursor + cut
-        chunk = chunk.strip()
-        if chunk:
-            parts.append(chunk)
-        cursor = end if end > cursor else len(t)
+    current: list[str] = []
+    size = 0
+    for piece in pieces:
+        extra = len(piece) + (1 if current else 0)
+        # Close the chunk when this piece would overflow, or would take it further
+        # past the balanced target than stopping short of it.
+        if current and (
+            size + extra > max_chars or (size + extra - target > target - size)
+        ):
+            parts.append(" ".join(current))
+            current, size = [], 0
+            extra = len(piece)
+        current.append(piece)
+        size += extra
+    if current:
+        parts.append(" ".join(current))
     return parts if parts else [t]
 
 
@@ -61,75 +93,114 @@ def _collect_audio_parts(response: Any) -> list[tuple[bytes, str | None]]:
     return out
 
 
-def _parts_to_wav_files(parts: list[tuple[bytes, str | None]], tmpdir: Path) -> list[Path]:
+def _parts_to_wav_files(
+    parts: list[tuple[bytes, str | None]], tmpdir: Path
+) -> tuple[list[Path], float, int]:
+    """Write parts as WAV files; also return their total duration (from the PCM length)."""
     wavs: list[Path] = []
+    duration = 0.0
+    sr = _DEFAULT_SAMPLE_RATE
     for i, (data, mime) in enumerate(parts):
         mime_l = (mime or "").lower()
         path = tmpdir / f"part_{i:03d}.wav"
         if "wav" in mime_l:
             path.write_bytes(data)
-        elif "l16" in mime_l or "pcm" in mime_l:
-            sr = 24000
-            m = re.search(r"rate=(\d+)", mime_l)
-            if m:
-                sr = int(m.group(1))
-            pcm16le_mono_to_wav(data, path, sample_rate_hz=sr)
+            with wave.open(path.as_posix(), "rb") as wf:
+                sr = wf.getframerate()
+                duration += wf.getnframes() / sr
         else:
-            log.warning("Unknown audio mime %r; assuming raw s16le mono @24kHz", mime)
-            pcm16le_mono_to_wav(data, path, sample_rate_hz=24000)
+            if "l16" in mime_l or "pcm" in mime_l:
+                m = re.search(r"rate=(\d+)", mime_l)
+                if m:
+                    sr = int(m.group(1))
+            else:
+                log.warning("Unknown audio mime %r; assuming raw s16le mono @24kHz", mime)
+                sr = _DEFAULT_SAMPLE_RATE
+            pcm16le_mono_to_wav(data, path, sample_rate_hz=sr)
+            duration += len(data) / (2 * sr)
         wavs.append(path)
-    return wavs
-
-
-def synthesize_slide_to_mp3(text: str, mp3_out: Path) -> None:
+    return wavs, duration, sr
+
+
+def _synthesize_chunk(
+    client: genai.Client,
+    model: str,
+    voice: str,
+    chunk: str,
+    ci: int,
+    n_chunks: int,
+    tmpdir: Path,
+) -> tuple[Path, float, int]:
+    log.info("TTS chunk %s/%s (%s chars)", ci, n_chunks, len(chunk))
+    prompt = (
+        "Read the following lecture narration aloud in one continuous take. "
+        "Use natural pacing and intonation suitable for a classroom lecture.\n\n"
+        f"{chunk}"
+    )
+    resp = client.models.generate_content(
+        model=model,
+        contents=[types.Content(role="user", parts=[types.Part.from_text(text=prompt)])],
+        config=types.GenerateContentConfig(
+            response_modalities=["AUDIO"],
+            speech_config=types.SpeechConfig(
+                voice_config=types.VoiceConfig(
+                    prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name=voice)
+                )
+            ),
+        ),
+    )
+    parts = _collect_audio_parts(resp)
+    if not parts:
+        raise RuntimeError(
+            f"TTS returned no audio parts (chunk {ci}). Response may be blocked or empty."
+        )
+    chunk_dir = tmpdir / f"c_{ci:03d}"
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+    wav_files, duration, sr = _parts_to_wav_files(parts, chunk_dir)
+    merged = tmpdir / f"chunk_{ci:03d}.wav"
+    if len(wav_files) == 1:
+        shutil.copyfile(wav_files[0], merged)
+    else:
+        concat_wavs_to_wav(wav_files, merged)
+    return merged, duration, sr
+
+
+def synthesize_slide_to_mp3(text: str, mp3_out: Path) -> dict[str, Any]:
+    """
+    Synthesize one slide's narration to MP3, with its chunks requested in parallel
+    (up to TTS_CONCURRENCY at a time).
+
+    Returns the slide's timing entry: total duration and per-chunk text and
+    duration in seconds, computed from the returned PCM length.
+    """
     key = os.environ.get("GOOGLE_API_KEY", "").strip()
     if not key:
         raise RuntimeError("GOOGLE_API_KEY is required for TTS")
     model = os.getenv("GEMINI_TTS_MODEL", "gemini-2.5-flash-preview-tts").strip()
     voice = os.getenv("TTS_VOICE", "Kore").strip()
+    workers = max(1, int(os.getenv("TTS_CONCURRENCY", "4")))
 
     client = genai.Client(api_key=key)
     text_chunks = _split_tts_chunks(text)
-    per_chunk_wavs: list[Path] = []
 
     with tempfile.TemporaryDirectory(prefix="hw7_tts_") as td:
         tmpdir = Path(td)
-        for ci, chunk in enumerate(text_chunks, start=1):
-            log.info("TTS chunk %s/%s (%s chars)", ci, len(text_chunks), len(chunk))
-            prompt = (
-                "Read the following lecture narration aloud in one continuous take. "
-                "Use natural pacing and intonation suitable for a classroom lecture.\n\n"
-                f"{chunk}"
-            )
-            resp = client.models.generate_content(
-                model=model,
-                contents=[types.Content(role="user", parts=[types.Part.from_text(text=prompt)])],
-                config=types.GenerateContentConfig(
-                    response_modalities=["AUDIO"],
-                    speech_config=types.SpeechConfig(
-                        voice_config=types.VoiceConfig(
-                            prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                voice_name=voice
-                            )
-                        )
-                    ),
-                ),
-            )
-            parts = _collect_audio_parts(resp)
-            if not parts:
-                raise RuntimeError(
-                    f"TTS returned no audio parts (chunk {ci}). Response may be blocked or empty."
-                )
-            chunk_dir = tmpdir / f"c_{ci:03d}"
-            chunk_dir.mkdir(parents=True, exist_ok=True)
-            wav_files = _parts_to_wav_files(parts, chunk_dir)
-            merged = tmpdir / f"chunk_{ci:03d}.wav"
-            if len(wav_files) == 1:
-                import shutil
-
-                shutil.copyfile(wav_files[0], merged)
-            else:
-                concat_wavs_to_wav(wav_files, merged)
-            per_chunk_wavs.append(merged)
-
-        concat_wavs_to_mp3(per_chunk_wavs, mp3_out)
+        n = len(text_chunks)
+        with ThreadPoolExecutor(max_workers=min(workers, n)) as pool:
+            futures = [
+                pool.submit(_synthesize_chunk, client, model, voice, chunk, ci, n, tmpdir)
+                for ci, chunk in enumerate(text_chunks, start=1)
+            ]
+            results = [f.result() for f in futures]
+
+        concat_wavs_to_mp3([wav for wav, _, _ in results], mp3_out)
+
+    chunks = [
+        {"text": chunk, "duration_s": round(duration, 3)}
+        for chunk, (_, duration, _) in zip(text_chunks, results)
+    ]
+    return {
+        "duration_s": round(sum(duration for _, duration, _ in results), 3),
+        "sample_rate": results[0][2],
+        "chunks": chunks,
+    }
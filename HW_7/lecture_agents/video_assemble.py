@@ -4,7 +4,7 @@ import logging
 import tempfile
 from pathlib import Path
 
-from lecture_agents.ffmpeg_util import run_ffmpeg
+from lecture_agents.ffmpeg_util import probe_duration_seconds, run_ffmpeg
 
 log = logging.getLogger(__name__)
 
@@ -13,8 +13,14 @@ def mux_still_image_with_audio(
     png_path: Path,
     mp3_path: Path,
     segment_mp4: Path,
+    duration_s: float | None = None,
 ) -> None:
+    """
+    With a known narration length (`duration_s`, from the timing map) the segment is
+    cut to exactly that length; otherwise ffmpeg stops at the shorter stream.
+    """
     segment_mp4.parent.mkdir(parents=True, exist_ok=True)
+    length = ["-t", f"{duration_s:.3f}"] if duration_s else ["-shortest"]
     run_ffmpeg(
         [
             "-y",
@@ -32,7 +38,7 @@ def mux_still_image_with_audio(
             "aac",
             "-b:a",
             "192k",
-            "-shortest",
+            *length,
             "-pix_fmt",
             "yuv420p",
             segment_mp4.as_posix(),
@@ -40,6 +46,62 @@ def mux_still_image_with_audio(
     )
 
 
+def encode_still_clip(png_path: Path, duration_s: float, clip_mp4: Path) -> None:
+    """Video-only still-image clip, encoded like a regular segment's video stream."""
+    clip_mp4.parent.mkdir(parents=True, exist_ok=True)
+    run_ffmpeg(
+        [
+            "-y",
+            "-loop",
+            "1",
+            "-i",
+            png_path.as_posix(),
+            "-t",
+            f"{duration_s:.3f}",
+            "-c:v",
+            "libx264",
+            "-tune",
+            "stillimage",
+            "-pix_fmt",
+            "yuv420p",
+            "-an",
+            clip_mp4.as_posix(),
+        ]
+    )
+
+
+def mux_clip_with_audio(
+    clip_mp4: Path,
+    mp3_path: Path,
+    segment_mp4: Path,
+    duration_s: float | None = None,
+) -> None:
+    """Reuse an already-encoded still clip (stream copy) under a new narration track."""
+    segment_mp4.parent.mkdir(parents=True, exist_ok=True)
+    length = ["-t", f"{duration_s:.3f}"] if duration_s else ["-shortest"]
+    run_ffmpeg(
+        [
+            "-y",
+            "-i",
+            clip_mp4.as_posix(),
+            "-i",
+            mp3_path.as_posix(),
+            "-map",
+            "0:v",
+            "-map",
+            "1:a",
+            "-c:v",
+            "copy",
+            "-c:a",
+            "aac",
+            "-b:a",
+            "192k",
+            *length,
+            segment_mp4.as_posix(),
+        ]
+    )
+
+
 def concat_segments(segment_mp4s: list[Path], out_mp4: Path) -> None:
     out_mp4.parent.mkdir(parents=True, exist_ok=True)
     if not segment_mp4s:
@@ -86,19 +148,57 @@ def assemble_lecture_video(
     slide_images: list[Path],
     audio_mp3s: list[Path],
     out_mp4: Path,
+    *,
+    duplicates: dict[int, int] | None = None,
+    durations: dict[int, float] | None = None,
 ) -> None:
+    """
+    `duplicates` maps a slide_index to the earlier slide it is identical to. Each
+    such group's still image is encoded once, as a clip as long as the group's
+    longest narration, and every slide in the group stream-copies that clip.
+
+    `durations` (slide_index -> seconds, from the TTS timing map) sets each
+    segment's exact length; slides missing from it fall back to `-shortest` and,
+    for shared clips, to probing the MP3.
+    """
+    durations = durations or {}
+
+    def audio_length(idx: int) -> float:
+        return durations.get(idx) or probe_duration_seconds(audio_mp3s[idx - 1])
+
     if len(slide_images) != len(audio_mp3s):
         raise RuntimeError(
             f"Slide/audio count mismatch: {len(slide_images)} PNG vs {len(audio_mp3s)} MP3"
         )
+    groups: dict[int, list[int]] = {}
+    for idx, rep in (duplicates or {}).items():
+        groups.setdefault(rep, [rep]).append(idx)
+    group_of = {idx: rep for rep, members in groups.items() for idx in members}
 
     with tempfile.TemporaryDirectory(prefix="hw7_vid_") as td:
         tmp = Path(td)
+        clips: dict[int, Path] = {}
         segments: list[Path] = []
         for i, (img, aud) in enumerate(zip(slide_images, audio_mp3s), start=1):
             seg = tmp / f"seg_{i:03d}.mp4"
-            log.info("Mux segment %s/%s", i, len(slide_images))
-            mux_still_image_with_audio(img, aud, seg)
+            rep = group_of.get(i)
+            if rep is None:
+                log.info("Mux segment %s/%s", i, len(slide_images))
+                mux_still_image_with_audio(img, aud, seg, durations.get(i))
+            else:
+                if rep not in clips:
+                    longest = max(audio_length(m) for m in groups[rep])
+                    clips[rep] = tmp / f"clip_{rep:03d}.mp4"
+                    log.info(
+                        "Encode shared frames for slides %s (%.1fs)",
+                        ", ".join(map(str, sorted(groups[rep]))),
+                        longest,
+                    )
+                    encode_still_clip(slide_images[rep - 1], longest + 0.5, clips[rep])
+                log.info(
+                    "Mux segment %s/%s (reusing frames of slide %s)", i, len(slide_images), rep
+                )
+                mux_clip_with_audio(clips[rep], aud, seg, durations.get(i))
             segments.append(seg)
         log.info("Concatenating %s segments -> %s", len(segments), out_mp4.name)
         concat_segments(segments, out_mp4)
@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import argparse
 import logging
+import shutil
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -16,12 +17,32 @@ from dotenv import load_dotenv
 
 from lecture_agents.arc_agent import run_arc_agent
 from lecture_agents.ffmpeg_util import require_ffmpeg
+from lecture_agents.manifest import load_manifest, update_manifest
 from lecture_agents.narration_agent import run_narration_agent
+from lecture_agents.page_index import (
+    build_page_index,
+    load_page_index,
+    page_index_path,
+    write_page_index,
+)
 from lecture_agents.paths import default_pdf_path, default_transcript_path, repo_root
 from lecture_agents.pdf_raster import list_slide_images, rasterize_pdf
 from lecture_agents.premise_agent import run_premise_agent
+from lecture_agents.slide_dedup import (
+    build_dedup_plan,
+    builds_from_plan,
+    duplicates_from_plan,
+)
 from lecture_agents.slide_description_agent import run_slide_description_agent
+from lecture_agents.slide_store import DEFAULT_CONTEXT_WINDOW, read_slides_doc
 from lecture_agents.style_agent import load_style, run_style_agent
+from lecture_agents.timing import (
+    load_timing_map,
+    save_timing_map,
+    slide_durations,
+    timing_map_path,
+    write_srt,
+)
 from lecture_agents.tts import synthesize_slide_to_mp3
 from lecture_agents.util_io import read_json
 from lecture_agents.video_assemble import assemble_lecture_video
@@ -98,6 +119,29 @@ def main(argv: list[str] | None = None) -> int:
         action="store_true",
         help="Regenerate outputs even if they already exist",
     )
+    parser.add_argument(
+        "--context-window",
+        type=int,
+        default=DEFAULT_CONTEXT_WINDOW,
+        metavar="N",
+        help=(
+            "Only send the N neighbouring slides' descriptions/narrations with each "
+            f"description and narration call (default: {DEFAULT_CONTEXT_WINDOW})"
+        ),
+    )
+    parser.add_argument(
+        "--tiered-descriptions",
+        action="store_true",
+        help=(
+            "Describe plain-text slides from the PDF text layer with GEMINI_TEXT_MODEL; "
+            "only image/diagram-heavy slides use the vision model"
+        ),
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Treat every slide as unique (no reuse of descriptions, audio or video frames)",
+    )
     parser.add_argument(
         "--skip-tts",
         action="store_true",
@@ -157,6 +201,8 @@ def main(argv: list[str] | None = None) -> int:
     narr_path = project_dir / "slide_description_narration.json"
     pdf_stem = pdf_path.stem
     out_mp4 = project_dir / f"{pdf_stem}.mp4"
+    out_srt = project_dir / f"{pdf_stem}.srt"
+    timing_path = timing_map_path(project_dir)
 
     try:
         if _should_run("style", from_stage):
@@ -170,25 +216,52 @@ def main(argv: list[str] | None = None) -> int:
         if not slide_images:
             raise RuntimeError(f"No slide PNGs in {slide_images_dir}")
 
-        slide_description_doc: dict | None = None
+        index_path = page_index_path(slide_images_dir)
+        pages = load_page_index(index_path)
+        if pages is None:
+            log.info("No %s yet; indexing %s", index_path.name, pdf_path.name)
+            pages = build_page_index(pdf_path)
+            write_page_index(index_path, pages)
+
+        duplicates: dict[int, int] = {}
+        builds_on: dict[int, int] = {}
+        dedup_plan: dict | None = None
+        if not args.no_dedup:
+            dedup_plan = load_manifest(project_dir).get("dedup")
+            stale = (
+                not isinstance(dedup_plan, dict)
+                or len(dedup_plan.get("slides", [])) != len(slide_images)
+            )
+            if stale or args.force or _should_run("raster", from_stage):
+                dedup_plan = build_dedup_plan(slide_images, pages)
+                update_manifest(project_dir, "dedup", dedup_plan)
+            duplicates = duplicates_from_plan(dedup_plan)
+            builds_on = builds_from_plan(dedup_plan)
+
         if _should_run("descriptions", from_stage):
-            slides = run_slide_description_agent(
-                slide_images, desc_path, force=args.force
+            run_slide_description_agent(
+                slide_images,
+                desc_path,
+                force=args.force,
+                context_window=args.context_window,
+                pages=pages,
+                tiered=args.tiered_descriptions,
+                duplicates=duplicates,
+                builds_on=builds_on,
             )
-            slide_description_doc = {"slides": slides}
-        else:
-            slide_description_doc = read_json(desc_path)
 
+        # Premise and arc summarize the whole deck, so only they load every description
+        # (and only when they actually run); narration reads descriptions per slide.
         if _should_run("premise", from_stage):
             premise = run_premise_agent(
-                slide_description_doc, premise_path, force=args.force
+                read_slides_doc(desc_path), premise_path, force=args.force
             )
         else:
             premise = read_json(premise_path)
 
         if _should_run("arc", from_stage):
             arc = run_arc_agent(
-                premise, slide_description_doc, arc_path, force=args.force
+                premise, read_slides_doc(desc_path), arc_path, force=args.force
             )
         else:
             arc = read_json(arc_path)
@@ -198,12 +271,16 @@ def main(argv: list[str] | None = None) -> int:
         if _should_run("narration", from_stage):
             run_narration_agent(
                 slide_images,
-                slide_description_doc,
+                desc_path,
                 style,
                 premise,
                 arc,
                 narr_path,
                 force=args.force,
+                context_window=args.context_window,
+                pages=pages,
+                duplicates=duplicates,
+                builds_on=builds_on,
             )
 
         if args.skip_tts:
@@ -213,7 +290,7 @@ def main(argv: list[str] | None = None) -> int:
         if _should_run("tts", from_stage) or _should_run("video", from_stage):
             require_ffmpeg()
 
-        narr_doc = read_json(narr_path)
+        narr_doc = read_slides_doc(narr_path)
         narr_slides = narr_doc.get("slides")
         if not isinstance(narr_slides, list) or len(narr_slides) != len(slide_images):
             raise RuntimeError(
@@ -223,25 +300,64 @@ def main(argv: list[str] | None = None) -> int:
 
         if _should_run("tts", from_stage):
             audio_dir.mkdir(parents=True, exist_ok=True)
+            timing = load_timing_map(timing_path)
+            spoken: dict[str, int] = {}
+            audio_reuse: dict[int, int] = {}
             for item in narr_slides:
                 idx = int(item["slide_index"])
                 text = str(item.get("narration", "")).strip()
                 if not text:
                     raise RuntimeError(f"Empty narration for slide {idx}")
                 mp3 = audio_dir / f"slide_{idx:03d}.mp3"
+                key = " ".join(text.split())
+                source = spoken.setdefault(key, idx)
                 if mp3.is_file() and not args.force:
                     log.info("Skipping existing %s", mp3.name)
                     continue
+                if source != idx and not args.no_dedup:
+                    log.info("Slide %s narration matches slide %s; reusing its audio", idx, source)
+                    shutil.copyfile(audio_dir / f"slide_{source:03d}.mp3", mp3)
+                    audio_reuse[idx] = source
+                    if str(source) in timing["slides"]:
+                        timing["slides"][str(idx)] = timing["slides"][str(source)]
+                        save_timing_map(timing_path, timing)
+                    continue
                 log.info("TTS slide %s/%s -> %s", idx, len(narr_slides), mp3.name)
-                synthesize_slide_to_mp3(text, mp3)
+                timing["slides"][str(idx)] = synthesize_slide_to_mp3(text, mp3)
+                save_timing_map(timing_path, timing)
+            if dedup_plan is not None and audio_reuse:
+                for entry in dedup_plan.get("slides", []):
+                    src = audio_reuse.get(int(entry["slide_index"]))
+                    if src is not None:
+                        entry["audio_from"] = src
+                        if "audio" not in entry.setdefault("reuse", []):
+                            entry["reuse"].append("audio")
+                update_manifest(project_dir, "dedup", dedup_plan)
 
         if _should_run("video", from_stage):
             mp3s = [audio_dir / f"slide_{i:03d}.mp3" for i in range(1, len(slide_images) + 1)]
             missing = [p for p in mp3s if not p.is_file()]
             if missing:
                 raise RuntimeError(f"Missing audio files: {missing[:3]}...")
-            assemble_lecture_video(slide_images, mp3s, out_mp4)
+            durations = slide_durations(load_timing_map(timing_path))
+            if len(durations) < len(slide_images):
+                log.info(
+                    "Timing map covers %s/%s slides; the rest are cut at the audio end",
+                    len(durations),
+                    len(slide_images),
+                )
+            assemble_lecture_video(
+                slide_images,
+                mp3s,
+                out_mp4,
+                duplicates=duplicates,
+                durations=durations,
+            )
             log.info("Final video: %s", out_mp4)
+            if len(durations) >= len(slide_images):
+                write_srt(load_timing_map(timing_path), len(slide_images), out_srt)
+            else:
+                log.info("Skipping subtitles: timing map is incomplete (rerun TTS with --force)")
 
     except RuntimeError as e:
         log.error("%s", e)